@@ -1,54 +1,28 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash, current_app
 from config import Config
 from models import db, Group, Book, Student, BookRequest, BookCopy
 from datetime import datetime, timedelta
 from functools import wraps
-from sqlalchemy import or_, func
-import string
+from search_index import matching_ids
+from catalog_cache import init_cache, groups, find_group, books_for, invalidate_book_lists, cache_stats
+from etags import versions_etag, conditional_json
+from db_profiles import init_db_profile
+from precompiled_templates import use_precompiled_templates
+from journal import journal_query, apply_filters, status_counts, paginate, export_rows, EXPORT_HEADERS
+from circulation import (parse_codes, check_copies, check_request_copies, requested_codes,
+                         reserve_copies, release_copies, change_status,
+                         check_codes_count, create_request, create_requests, confirm_requests,
+                         return_requests, CirculationError, InvalidRequest)
+from submission_queue import init_queue, queue_enabled, enqueue, find_submission
+from group_issue import issue_to_group
+from overdue import loans_page, digest_page, scan as overdue_scan
+from reports import (DIMENSIONS as REPORT_DIMENSIONS, summary_query, summary_headers, summary_rows,
+                     rebuild as rebuild_reports)
+from exports import export_response, FORMATS as EXPORT_FORMATS
 
 # Пароль админа
 ADMIN_PASSWORD = "KitRulit"
 
-def contains_full_word(text, search_word):
-    """
-    Проверяет, начинается ли какое-то слово в тексте с введенного запроса (префиксный поиск).
-    Поиск без учета регистра. Можно вводить начало слова, но нельзя пропускать буквы в начале.
-    
-    Примеры:
-    - contains_full_word("Алгебра и геометрия", "а") -> True (слово начинается с "а")
-    - contains_full_word("Алгебра и геометрия", "ал") -> True
-    - contains_full_word("Алгебра и геометрия", "алгебра") -> True
-    - contains_full_word("Алгебра и геометрия", "лгебра") -> False (пропущена первая буква)
-    - contains_full_word("әскери және технологиялық", "ә") -> True
-    - contains_full_word("әскери және технологиялық", "әскери") -> True
-    - contains_full_word("әскери және технологиялық", "лғашқы") -> False (пропущены буквы в начале)
-    """
-    if not text or not search_word:
-        return False
-    
-    text_str = str(text)
-    search_str = str(search_word)
-    
-    # Приводим к нижнему регистру для сравнения
-    text_lower = text_str.lower()
-    search_lower = search_str.lower()
-    
-    # Разбиваем текст на слова
-    # Заменяем знаки препинания и специальные символы на пробелы
-    punctuation_chars = string.punctuation + '.,;:!?()[]{}'
-    # Добавляем специальные кавычки отдельно
-    special_chars = ['«', '»', '"', '"', "'", "'", '„', '"', '‚', "'"]
-    for punct in punctuation_chars:
-        text_lower = text_lower.replace(punct, ' ')
-    for char in special_chars:
-        text_lower = text_lower.replace(char, ' ')
-    
-    # Разбиваем на слова по пробелам
-    words = text_lower.split()
-    
-    # Проверяем, начинается ли какое-то слово с введенного запроса (префиксный поиск)
-    return any(word.startswith(search_lower) for word in words)
-
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -57,48 +31,62 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-app = Flask(__name__)
-app.config.from_object(Config)
-app.secret_key = 'ваш-секретный-ключ-для-сессий-12345'
+# Маршруты собираются здесь и регистрируются в create_app();
+# имя endpoint — имя функции, как у @app.route
+_routes = []
 
-db.init_app(app)
+def route(rule, **options):
+    def decorator(view):
+        _routes.append((rule, view, options))
+        return view
+    return decorator
 
-@app.route('/')
+def create_app(config=Config):
+    """
+    Создаёт приложение. Необязательные части подключаются только при
+    включённых настройках: metrics импортируется лишь при METRICS_ENABLED,
+    шаблоны берутся скомпилированными (precompiled_templates.py), если они
+    не устарели.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.secret_key = 'ваш-секретный-ключ-для-сессий-12345'
+
+    db.init_app(app)
+    init_db_profile(app, db)
+    init_cache(app)
+    if app.config['METRICS_ENABLED']:
+        from metrics import init_metrics
+        init_metrics(app)
+    init_queue(app)
+    if app.config['PRECOMPILED_TEMPLATES']:
+        use_precompiled_templates(app)
+
+    for rule, view, options in _routes:
+        app.add_url_rule(rule, view_func=view, **options)
+    return app
+
+@route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/get-groups')
+@route('/get-groups')
 def get_groups():
-    groups = Group.query.all()
-    groups_list = [{'id': g.id, 'name': g.name} for g in groups]
-    return jsonify(groups_list)
+    etag = versions_etag('groups')
+    return conditional_json(etag, lambda: [{'id': g['id'], 'name': g['name']} for g in groups(etag)])
 
-@app.route('/get-books/<int:group_id>')
+@route('/get-books/<int:group_id>')
 def get_books(group_id):
-    group = Group.query.get_or_404(group_id)
+    etag = versions_etag('groups', 'catalogue')
     
-    # Включаем книги для языка группы и книги для обеих языков ("both")
-    books = Book.query.filter(
-        or_(
-            Book.language == group.language,
-            Book.language == 'both'
-        ),
-        Book.course == group.course
-    ).all()
+    def build():
+        group = find_group(group_id, etag)
+        # Список книг общий для всех групп с тем же языком и курсом — берём из кэша
+        return books_for(group['language'], group['course'], etag)
     
-    books_list = []
-    for book in books:
-        available = book.available_quantity
-        if available > 0:
-            books_list.append({
-                'id': book.id,
-                'name': f"{book.name} ({book.author}, {book.year})",
-                'available': available
-            })
-    
-    return jsonify(books_list)
+    return conditional_json(etag, build)
 
-@app.route('/search-students')
+@route('/search-students')
 def search_students():
     query = request.args.get('q', '').strip()
     group_id = request.args.get('group_id', '')
@@ -106,35 +94,64 @@ def search_students():
     if not query:
         return jsonify([])
     
-    students_query = Student.query
+    students_query = Student.query.filter(Student.id.in_(matching_ids('student', query)))
     if group_id and group_id != 'null' and group_id != '':
         students_query = students_query.filter_by(group_id=int(group_id))
     
-    # Поиск по полным словам, нечувствительный к регистру
-    # Используем регулярное выражение для поиска целых слов
-    # Экранируем специальные символы в запросе
-    import re
-    escaped_query = re.escape(query.lower())
-    # Создаем паттерн для поиска целого слова (с границами слов)
-    # Используем \b для границ слов, но в SQLite нужно использовать другой подход
-    # Для SQLite используем проверку на наличие слова с пробелами/знаками препинания вокруг
-    
-    # Получаем всех студентов и фильтруем в Python для более точного поиска
-    all_students = students_query.all()
-    
-    # Фильтруем по полным словам
-    filtered_students = [s for s in all_students if contains_full_word(s.full_name, query)]
+    # Префиксный поиск по словам ФИО идёт по индексу search_tokens прямо в SQL
+    students = students_query.order_by(Student.id).limit(current_app.config['SEARCH_STUDENTS_LIMIT']).all()
     
-    students_list = [{'id': s.id, 'name': s.full_name} for s in filtered_students[:20]]
+    students_list = [{'id': s.id, 'name': s.full_name} for s in students]
     return jsonify(students_list)
 
-@app.route('/get-students/<int:group_id>')
+@route('/get-students/<int:group_id>')
 def get_students(group_id):
-    students = Student.query.filter_by(group_id=group_id).all()
-    students_list = [{'id': s.id, 'name': s.full_name} for s in students]
-    return jsonify(students_list)
+    def build():
+        students = Student.query.filter_by(group_id=group_id).all()
+        return [{'id': s.id, 'name': s.full_name} for s in students]
+    
+    return conditional_json(versions_etag(f'group:{group_id}'), build)
+
+def _parse_id(value):
+    """id из формы или JSON: целое число или строка из цифр; иначе None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return None
 
-@app.route('/request-book', methods=['POST'])
+def _request_items(items):
+    """
+    items из /request-books — список объектов {"book_id": ..., "copy_codes": "001,002" или ["001", ...]}.
+    Возвращает [(book_id, строка кодов)]; ошибки формата — InvalidRequest (400), а не 500.
+    """
+    if items is None:
+        return []
+    if not isinstance(items, list):
+        raise InvalidRequest("items: ожидается список книг")
+    parsed, errors = [], []
+    for position, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            errors.append(f"Книга №{position}: ожидается объект с book_id и copy_codes")
+            continue
+        book_id = _parse_id(item.get('book_id'))
+        if book_id is None:
+            errors.append(f"Книга №{position}: некорректный book_id")
+            continue
+        codes = item.get('copy_codes') or ''
+        if isinstance(codes, list):
+            codes = ', '.join(str(code) for code in codes)
+        elif not isinstance(codes, (str, int)):
+            errors.append(f"Книга №{position}: copy_codes — строка или список кодов")
+            continue
+        parsed.append((book_id, str(codes).strip()))
+    if errors:
+        raise InvalidRequest("\n".join(errors))
+    return parsed
+
+@route('/request-book', methods=['POST'])
 def request_book():
     try:
         student_id = request.form.get('student_id')
@@ -142,77 +159,60 @@ def request_book():
         quantity = int(request.form.get('quantity', 1))
         copy_codes_str = request.form.get('copy_codes', '').strip()
         
-        # Базовые проверки (как было)
-        student = Student.query.get(student_id)
-        if not student:
-            return "Ошибка: Студент не найден", 400
-        
-        book = Book.query.get(book_id)
-        if not book:
-            return "Ошибка: Книга не найдена", 400
-        
-        # Проверяем язык: книга должна быть для языка группы или для обеих языков
-        if book.language not in [student.group.language, 'both'] or book.course != student.group.course:
-            return "Ошибка: Эта книга не для вашей группы", 400
-        
-        # Проверка кодов экземпляров
-        if not copy_codes_str:
-            return "Ошибка: Не прикреплены экземпляры", 400
-        
-        codes_list = [c.strip() for c in copy_codes_str.split(',') if c.strip()]
-        if len(codes_list) != quantity:
-            return f"Ошибка: Прикреплено {len(codes_list)} экземпляров, ожидалось {quantity}", 400
-        
-        # === НОВАЯ ПРОВЕРКА: все экземпляры должны быть свободны ===
-        conflicts = []
-        for code in codes_list:
-            copy = BookCopy.query.filter_by(copy_code=code, book_id=book.id).first()
-            if not copy:
-                conflicts.append(f"{code} (не найден)")
-                continue
-            if not copy.is_available:
-                # Находим, кому выдан (если есть запрос)
-                if not copy.is_available:
-                    conflicts.append(f"{code} (экземпляр уже выдан)")
-                    continue
-        
-        if conflicts:
-            conflict_msg = "; ".join(conflicts)
-            return f"Ошибка: Невозможно прикрепить: {conflict_msg}", 400
-        
-        # Генерация номера запроса (как было)
-        today = datetime.now().strftime('%d%m%y')
-        last_request = BookRequest.query.filter(
-            BookRequest.request_number.like(f'{today}-%')
-        ).order_by(BookRequest.id.desc()).first()
-        
-        next_number = 1
-        if last_request and last_request.request_number:
-            last_number = int(last_request.request_number.split('-')[1])
-            next_number = last_number + 1
-        
-        request_number = f'{today}-{next_number:03d}'
-        
-        # Создаём запрос
-        new_request = BookRequest(
-            student_id=student_id,
-            book_id=book_id,
-            quantity=quantity,
-            status='ожидание',
-            request_date=datetime.now(),
-            request_number=request_number,
-            requested_copy_codes=','.join(codes_list)  # сохраняем коды
-        )
-        db.session.add(new_request)
+        if queue_enabled():
+            # Очередь отправки: сразу отвечаем номером, в базу запишет фоновый обработчик
+            # Те же ответы, что у create_request: нечисловой id — 400, а не 500
+            queued_student_id = _parse_id(student_id)
+            if queued_student_id is None:
+                raise InvalidRequest("Студент не найден")
+            queued_book_id = _parse_id(book_id)
+            if queued_book_id is None:
+                raise InvalidRequest("Книга не найдена")
+            check_codes_count(copy_codes_str, quantity)
+            ticket = enqueue(queued_student_id, queued_book_id, quantity, copy_codes_str)
+            return (f"⏳ Запрос принят, номер {ticket}. Через несколько секунд он появится у библиотекаря — "
+                    f"статус можно проверить по этому номеру.")
+        
+        new_request = create_request(student_id, book_id, quantity, copy_codes_str)
         db.session.commit()
         
         return f"✅ Запрос #{new_request.id} отправлен! Ожидайте подтверждения библиотекаря."
         
+    except InvalidRequest as e:
+        db.session.rollback()
+        return f"Ошибка: {e}", 400
     except Exception as e:
         db.session.rollback()
         return f"Ошибка: {str(e)}", 500
 
-@app.route('/admin/login', methods=['GET', 'POST'])
+@route('/request-books', methods=['POST'])
+def request_books():
+    """
+    Комплект учебников одной отправкой (JSON):
+    {"student_id": 1, "items": [{"book_id": 5, "copy_codes": "001,002"}, ...]}
+    Все запросы создаются вместе или ни один.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        student_id = _parse_id(data.get('student_id'))
+        if student_id is None:
+            raise InvalidRequest("Студент не найден")
+        created = create_requests(student_id, _request_items(data.get('items')))
+        db.session.flush()
+        result = [{'id': r.id, 'request_number': r.request_number, 'book_id': r.book_id} for r in created]
+        db.session.commit()
+        
+        return jsonify({'success': True, 'requests': result,
+                        'message': f"✅ Отправлено запросов: {len(result)}. Ожидайте подтверждения библиотекаря."})
+        
+    except InvalidRequest as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@route('/admin/login', methods=['GET', 'POST'])
 def admin_login():
     if request.method == 'POST':
         password = request.form.get('password', '')
@@ -223,23 +223,40 @@ def admin_login():
             flash('Неверный пароль')
     return render_template('admin_login.html')
 
-@app.route('/admin/logout')
+@route('/admin/logout')
 def admin_logout():
     session.pop('admin_logged_in', None)
     return redirect(url_for('index'))
 
-@app.route('/admin')
-@admin_required
-def admin_dashboard():
-    requests = BookRequest.query.order_by(BookRequest.request_date.desc()).all()
+def render_journal(status_filter='all', date_filter='all', search_query='', custom_date=''):
+    """Страница журнала запросов: фильтры, счётчики по статусам и одна страница строк"""
+    query = apply_filters(BookRequest.query, status_filter, date_filter, custom_date, search_query)
+    counts = status_counts(query)
+    
+    cursor = request.args.get('cursor', '')
+    requests, next_cursor = paginate(journal_query(query), cursor, current_app.config['ADMIN_PAGE_SIZE'])
+    
+    args = request.args.to_dict()
+    args.pop('cursor', None)
+    next_url = url_for(request.endpoint, **args, cursor=next_cursor) if next_cursor else None
+    first_url = url_for(request.endpoint, **args) if cursor else None
+    
     return render_template('admin.html',
                          requests=requests,
-                         current_status='all',
-                         current_date='all',
-                         search_query='',
-                         custom_date='')
+                         status_counts=counts,
+                         next_url=next_url,
+                         first_url=first_url,
+                         current_status=status_filter,
+                         current_date=date_filter,
+                         search_query=search_query,
+                         custom_date=custom_date)
 
-@app.route('/admin/assign-copy-ids/<int:request_id>', methods=['POST'])
+@route('/admin')
+@admin_required
+def admin_dashboard():
+    return render_journal()
+
+@route('/admin/assign-copy-ids/<int:request_id>', methods=['POST'])
 @admin_required
 def assign_copy_ids(request_id):
     """Привязка конкретных экземпляров (по QR-кодам) к запросу"""
@@ -255,35 +272,37 @@ def assign_copy_ids(request_id):
         if not copy_codes_str:
             return jsonify({'success': False, 'error': 'Не указаны коды экземпляров'}), 400
         
-        codes_list = [code.strip() for code in copy_codes_str.split(',') if code.strip()]
+        codes_list = parse_codes(copy_codes_str)
         
         if len(codes_list) != book_request.quantity:
             return jsonify({'success': False, 'error': f'Количество кодов ({len(codes_list)}) не совпадает с запрошенным ({book_request.quantity})'}), 400
         
-        # Проверяем каждый код
-        copies_to_assign = []
-        for code in codes_list:
-            copy = BookCopy.query.filter_by(copy_code=code, book_id=book_request.book_id).first()
-            if not copy:
-                return jsonify({'success': False, 'error': f'Экземпляр {code} не принадлежит этой книге'}), 400
-            if not copy.is_available:
-                return jsonify({'success': False, 'error': f'Экземпляр {code} уже выдан'}), 400
-            copies_to_assign.append(copy)
-        
-        # Временно привязываем (но ещё не выдаём)
-        for copy in copies_to_assign:
-            copy.current_request_id = book_request.id
-            copy.is_available = False
-        
+        # Проверяем все коды одним запросом
+        copies_to_assign, conflicts = check_copies(book_request.book_id, codes_list)
+        if conflicts:
+            conflict = conflicts[0]
+            if not conflict.found:
+                return jsonify({'success': False, 'error': f'Экземпляр {conflict.code} не принадлежит этой книге'}), 400
+            return jsonify({'success': False, 'error': f'Экземпляр {conflict.code} уже выдан'}), 400
+        
+        # Временно привязываем (но ещё не выдаём): отсканированные библиотекарем
+        # экземпляры заменяют выбранные студентом
+        release_copies(book_request)
+        reserve_copies(copies_to_assign, book_request)
+        book_request.requested_copies = copies_to_assign
         db.session.commit()
+        invalidate_book_lists(book_request.book_id)
         
         return jsonify({'success': True, 'message': 'Экземпляры успешно привязаны'})
         
+    except CirculationError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/admin/confirm-issue/<int:request_id>', methods=['POST'])
+@route('/admin/confirm-issue/<int:request_id>', methods=['POST'])
 @admin_required
 def confirm_issue(request_id):
     try:
@@ -292,57 +311,46 @@ def confirm_issue(request_id):
         if book_request.status != 'ожидание':
             return jsonify({'success': False, 'error': 'Запрос уже обработан'}), 400
         
-        # Получаем запрошенные студентом коды
-        codes_str = book_request.requested_copy_codes or ''
-        if not codes_str:
+        # Запрошенные студентом экземпляры и их занятость — одним JOIN через request_copies;
+        # уже привязанные к этому запросу — не конфликт
+        reserved_copies, conflicts = check_request_copies(book_request)
+        
+        requested_count = len(reserved_copies) + len(conflicts)
+        if not requested_count:
             return jsonify({'success': False, 'error': 'У запроса нет прикреплённых экземпляров. Отсканируйте QR-коды заново.'}), 400
         
-        codes_list = [c.strip() for c in codes_str.split(',') if c.strip()]
-        if len(codes_list) != book_request.quantity:
-            return jsonify({'success': False, 'error': f'Количество кодов ({len(codes_list)}) не совпадает с запросом ({book_request.quantity})'}), 400
-        
-        # Пытаемся зарезервировать каждый экземпляр
-        reserved_copies = []
-        conflicts = []
-        for code in codes_list:
-            copy = BookCopy.query.filter_by(copy_code=code, book_id=book_request.book_id).first()
-            if not copy:
-                conflicts.append(f"{code} (не найден)")
-                continue
-            if not copy.is_available:
-                # Находим, кому выдан
-                if copy.current_request_id:
-                    conflict_request = BookRequest.query.get(copy.current_request_id)
-                    student_name = conflict_request.student.full_name if conflict_request and conflict_request.student else "Неизвестно"
-                    conflicts.append(f"{code} (выдан студенту {student_name})")
-                else:
-                    conflicts.append(f"{code} (уже занят)")
-                continue
-            reserved_copies.append(copy)
+        if requested_count != book_request.quantity:
+            return jsonify({'success': False, 'error': f'Количество кодов ({requested_count}) не совпадает с запросом ({book_request.quantity})'}), 400
         
         # Если есть конфликты — не подтверждаем
         if conflicts:
-            conflict_msg = "; ".join(conflicts)
+            conflict_msg = "; ".join(
+                f"{c.code} (не найден)" if not c.found
+                else f"{c.code} (выдан студенту {c.holder or 'Неизвестно'})" if c.request_id
+                else f"{c.code} (уже занят)"
+                for c in conflicts
+            )
             return jsonify({'success': False, 'error': f'Невозможно выдать: {conflict_msg}'}), 400
         
-        # Всё ок — резервируем
-        for copy in reserved_copies:
-            copy.current_request_id = book_request.id
-            copy.is_available = False
-        
-        book_request.status = 'выдано'
-        book_request.issue_date = datetime.now()
-        book_request.planned_return_date = datetime.now() + timedelta(days=14)
+        # Всё ок — атомарно меняем статус и резервируем экземпляры в одной транзакции
+        change_status(book_request, 'ожидание', 'выдано',
+                      issue_date=datetime.now(),
+                      planned_return_date=datetime.now() + timedelta(days=14))
+        reserve_copies(reserved_copies, book_request)
         
         db.session.commit()
+        invalidate_book_lists(book_request.book_id)
         
         return jsonify({'success': True, 'message': 'Выдача подтверждена'})
         
+    except CirculationError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/admin/mark-returned/<int:request_id>', methods=['POST'])
+@route('/admin/mark-returned/<int:request_id>', methods=['POST'])
 @admin_required
 def mark_returned(request_id):
     try:
@@ -351,24 +359,164 @@ def mark_returned(request_id):
         if book_request.status != 'выдано':
             return jsonify({'success': False, 'error': 'Книга не была выдана'}), 400
         
-        # Освобождаем все экземпляры
-        copies = BookCopy.query.filter_by(current_request_id=book_request.id).all()
-        for copy in copies:
-            copy.is_available = True
-            copy.current_request_id = None
+        change_status(book_request, 'выдано', 'возвращено', actual_return_date=datetime.now())
         
-        book_request.status = 'возвращено'
-        book_request.actual_return_date = datetime.now()
+        # Освобождаем все экземпляры
+        release_copies(book_request)
         
         db.session.commit()
+        invalidate_book_lists(book_request.book_id)
         
         return jsonify({'success': True, 'message': 'Книга отмечена как возвращенная'})
         
+    except CirculationError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+def bulk_admin_action(action, message):
+    """Выдача/возврат отмеченных запросов ({"request_ids": [...]}) одной транзакцией"""
+    try:
+        raw_ids = (request.get_json(silent=True) or {}).get('request_ids') or []
+        request_ids = [_parse_id(request_id) for request_id in raw_ids] if isinstance(raw_ids, list) else [None]
+        if None in request_ids:
+            raise InvalidRequest("request_ids: ожидается список id запросов")
+        book_ids = action(request_ids)
+        db.session.commit()
+        invalidate_book_lists(*book_ids)
+        
+        return jsonify({'success': True, 'message': f'{message}: {len(set(request_ids))}'})
+        
+    except InvalidRequest as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except CirculationError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/admin/reject-request/<int:request_id>', methods=['POST'])
+@route('/admin/bulk-confirm-issue', methods=['POST'])
+@admin_required
+def bulk_confirm_issue():
+    return bulk_admin_action(confirm_requests, 'Выдача подтверждена, запросов')
+
+@route('/admin/bulk-mark-returned', methods=['POST'])
+@admin_required
+def bulk_mark_returned():
+    return bulk_admin_action(return_requests, 'Возврат отмечен, запросов')
+
+@route('/admin/group-issue', methods=['POST'])
+@admin_required
+def group_issue():
+    """
+    Выдача книги всей группе по потоку отсканированных кодов (JSON):
+    {"group_id": 1, "book_id": 5, "copy_codes": "001\n002,003"} — коды строкой или списком
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        codes = data.get('copy_codes') or ''
+        if isinstance(codes, list):
+            lines = [str(code) for code in codes]
+        elif isinstance(codes, (str, int)):
+            lines = str(codes).splitlines()
+        else:
+            raise InvalidRequest("copy_codes — строка или список кодов")
+        report = issue_to_group(_parse_id(data.get('group_id')), _parse_id(data.get('book_id')), lines,
+                                current_app.config['GROUP_ISSUE_CHUNK_SIZE'])
+        
+        message = f"Выдано экземпляров: {report['issued']}, конфликтов: {len(report['conflicts'])}"
+        if report['stopped']:
+            # Записанные порции остаются — отчёт нужен, чтобы видеть, кто уже получил книгу
+            message += f". Выдача остановлена, не выдано: {len(report['without_copy'])}"
+        return jsonify({'success': True, 'report': report, 'message': message})
+        
+    except InvalidRequest as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except CirculationError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@route('/admin/overdue')
+@admin_required
+def admin_overdue():
+    """
+    Просроченные (kind=overdue) и скоро возвращаемые (kind=due_soon) книги, JSON по страницам:
+    view=loans — живой список выданных книг; view=students / view=groups — сводка
+    последнего сканирования (overdue.scan). Следующая страница — ?cursor=<next_cursor>
+    """
+    view = request.args.get('view', 'loans')
+    cursor = request.args.get('cursor')
+    page_size = min(request.args.get('limit', current_app.config['OVERDUE_PAGE_SIZE'], type=int),
+                    current_app.config['OVERDUE_PAGE_SIZE'])
+    if view == 'loans':
+        kind = request.args.get('kind', 'overdue')
+        if kind not in ('overdue', 'due_soon'):
+            return jsonify({'success': False, 'error': 'kind: overdue или due_soon'}), 400
+        rows, next_cursor = loans_page(kind, cursor, page_size,
+                                       due_soon_days=current_app.config['OVERDUE_DUE_SOON_DAYS'])
+    elif view in ('students', 'groups'):
+        rows, next_cursor = digest_page(view[:-1], cursor, page_size)
+    else:
+        return jsonify({'success': False, 'error': 'view: loans, students или groups'}), 400
+    
+    return jsonify({'success': True, 'view': view, 'rows': rows, 'next_cursor': next_cursor})
+
+@route('/admin/overdue/scan', methods=['POST'])
+@admin_required
+def admin_overdue_scan():
+    """Пересчитать сводку сейчас (обычно это делает python overdue.py по расписанию)"""
+    try:
+        report = overdue_scan(due_soon_days=current_app.config['OVERDUE_DUE_SOON_DAYS'],
+                              full=request.args.get('full') == '1',
+                              overlap=timedelta(minutes=current_app.config['OVERDUE_SCAN_OVERLAP_MINUTES']))
+        return jsonify({'success': True, 'report': report})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@route('/admin/reports')
+@admin_required
+def admin_reports():
+    """Статистика выдачи (reports.py) в разрезе by=group|course|language|book, JSON"""
+    by = request.args.get('by', 'group')
+    if by not in REPORT_DIMENSIONS:
+        return jsonify({'success': False, 'error': f"by: {', '.join(REPORT_DIMENSIONS)}"}), 400
+    headers = summary_headers(by)
+    rows = [dict(zip(headers, row)) for row in db.session.execute(summary_query(by))]
+    return jsonify({'success': True, 'by': by, 'columns': headers, 'rows': rows})
+
+@route('/admin/reports/export')
+@admin_required
+def admin_reports_export():
+    """Тот же отчёт файлом: format=csv (по умолчанию) или xlsx, строки отдаются потоком"""
+    by = request.args.get('by', 'group')
+    fmt = request.args.get('format', 'csv')
+    if by not in REPORT_DIMENSIONS or fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': 'Неизвестный разрез или формат'}), 400
+    return export_response(fmt, f"circulation_{by}_{datetime.now():%Y-%m-%d}", "Выдача",
+                           summary_headers(by), summary_rows(by))
+
+@route('/admin/reports/rebuild', methods=['POST'])
+@admin_required
+def admin_reports_rebuild():
+    """Пересчитать статистику выдачи по журналу одним проходом"""
+    try:
+        pairs = rebuild_reports()
+        db.session.commit()
+        return jsonify({'success': True, 'message': f'Статистика пересчитана: {pairs} пар группа/книга'})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@route('/admin/reject-request/<int:request_id>', methods=['POST'])
 @admin_required
 def reject_request(request_id):
     try:
@@ -378,13 +526,12 @@ def reject_request(request_id):
             return jsonify({'success': False, 'error': 'Запрос уже обработан'}), 400
         
         # Очищаем привязанные экземпляры (если были)
-        BookCopy.query.filter_by(current_request_id=book_request.id).update({
-            'current_request_id': None,
-            'is_available': True
-        })
+        release_copies(book_request)
         
+        book_id = book_request.book_id
         db.session.delete(book_request)
         db.session.commit()
+        invalidate_book_lists(book_id)
         
         return jsonify({'success': True, 'message': 'Запрос отклонён'})
         
@@ -392,7 +539,7 @@ def reject_request(request_id):
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/check-status', methods=['GET', 'POST'])
+@route('/check-status', methods=['GET', 'POST'])
 def check_status():
     request_input = None
     if request.method == 'POST':
@@ -405,6 +552,19 @@ def check_status():
             request_input = request_input[1:]
         
         book_request = BookRequest.query.filter_by(request_number=request_input).first()
+        submission = None
+        if not book_request and request_input.upper().startswith('Q-'):
+            # Номер из очереди отправки: запрос уже записан — показываем его,
+            # иначе — что он ещё в обработке (или почему не прошёл проверку)
+            ticket = request_input.upper()
+            book_request = BookRequest.query.filter_by(ticket=ticket).first()
+            if not book_request:
+                submission = find_submission(ticket)
+                if submission and submission['status'] == 'done':
+                    # Записан, но уже удалён (отклонён библиотекарем)
+                    submission = None
+        if submission:
+            return render_template('status_processing.html', submission=submission)
         if not book_request:
             try:
                 request_id_int = int(request_input)
@@ -419,7 +579,22 @@ def check_status():
     
     return render_template('check_status.html')
 
-@app.route('/admin/filter', methods=['GET'])
+@route('/admin/cache-stats')
+@admin_required
+def admin_cache_stats():
+    return jsonify(cache_stats())
+
+@route('/admin/metrics')
+@admin_required
+def admin_metrics():
+    from metrics import snapshot
+    routes = snapshot()
+    if request.args.get('format') == 'json':
+        return jsonify({'enabled': current_app.config['METRICS_ENABLED'], 'routes': routes, 'cache': cache_stats()})
+    return render_template('admin_metrics.html', enabled=current_app.config['METRICS_ENABLED'],
+                           routes=routes, cache=cache_stats())
+
+@route('/admin/filter', methods=['GET'])
 @admin_required
 def admin_filter():
     date_filter = request.args.get('date', 'all')
@@ -427,54 +602,31 @@ def admin_filter():
     search_query = request.args.get('search', '').strip()
     custom_date = request.args.get('custom_date', '')
     
-    query = BookRequest.query
-    
-    if status_filter != 'all':
-        query = query.filter(BookRequest.status == status_filter)
-    
-    today_date = datetime.now().date()
-    if date_filter == 'today':
-        query = query.filter(db.func.date(BookRequest.request_date) == today_date)
-    elif date_filter == 'yesterday':
-        yesterday_date = (datetime.now() - timedelta(days=1)).date()
-        query = query.filter(db.func.date(BookRequest.request_date) == yesterday_date)
-    elif date_filter == 'custom' and custom_date:
-        try:
-            custom_date_obj = datetime.strptime(custom_date, '%Y-%m-%d').date()
-            query = query.filter(db.func.date(BookRequest.request_date) == custom_date_obj)
-        except ValueError:
-            pass
-    
-    if search_query:
-        # Поиск по полным словам в ФИО студента
-        all_requests = query.join(Student).all()
-        
-        # Фильтруем по полным словам
-        filtered_requests = [r for r in all_requests if contains_full_word(r.student.full_name, search_query)]
-        # Создаем новый запрос с отфильтрованными результатами
-        request_ids = [r.id for r in filtered_requests]
-        if request_ids:
-            query = BookRequest.query.filter(BookRequest.id.in_(request_ids))
-        else:
-            query = BookRequest.query.filter(BookRequest.id == -1)  # Нет результатов
-    
-    requests = query.order_by(BookRequest.request_date.desc()).all()
-    
-    return render_template('admin.html',
-                         requests=requests,
-                         current_status=status_filter,
-                         current_date=date_filter,
-                         search_query=search_query,
-                         custom_date=custom_date)
+    return render_journal(status_filter, date_filter, search_query, custom_date)
+
+@route('/admin/export', methods=['GET'])
+@admin_required
+def admin_export():
+    """Вся история запросов файлом (format=csv или xlsx) с теми же фильтрами, что /admin/filter; строки идут потоком"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'success': False, 'error': 'Неизвестный формат'}), 400
+    query = apply_filters(BookRequest.query,
+                          request.args.get('status', 'all'),
+                          request.args.get('date', 'all'),
+                          request.args.get('custom_date', ''),
+                          request.args.get('search', '').strip())
+    rows = export_rows(query, current_app.config['EXPORT_CHUNK_SIZE'])
+    return export_response(fmt, f"journal_{datetime.now():%Y-%m-%d}", "Журнал запросов", EXPORT_HEADERS, rows)
 
-@app.route('/get-book-by-copy-code/<copy_code>')
+@route('/get-book-by-copy-code/<copy_code>')
 def get_book_by_copy_code(copy_code):
     copy = BookCopy.query.filter_by(copy_code=copy_code).first()
     if copy and copy.book:
         return jsonify({'book_id': copy.book.id})
     return jsonify({'error': 'Not found'}), 404
 
-@app.route('/admin/scan-return/<int:request_id>', methods=['POST'])
+@route('/admin/scan-return/<int:request_id>', methods=['POST'])
 @admin_required
 def scan_return(request_id):
     try:
@@ -483,7 +635,7 @@ def scan_return(request_id):
         if not scanned_codes_str:
             return jsonify({'success': False, 'error': 'Не отсканированы коды экземпляров'}), 400
         
-        scanned_codes = [c.strip() for c in scanned_codes_str.split(',') if c.strip()]
+        scanned_codes = parse_codes(scanned_codes_str)
         
         book_request = BookRequest.query.get_or_404(request_id)
         
@@ -491,38 +643,36 @@ def scan_return(request_id):
             return jsonify({'success': False, 'error': 'Запрос не в статусе "выдано"'}), 400
         
         # Получаем коды, которые были выданы по этому запросу
-        issued_codes_str = book_request.requested_copy_codes or book_request.attached_copy_codes or ''
-        if not issued_codes_str:
+        issued_codes = requested_codes(book_request)
+        if not issued_codes:
             return jsonify({'success': False, 'error': 'У запроса нет записанных кодов экземпляров'}), 400
         
-        issued_codes = [c.strip() for c in issued_codes_str.split(',') if c.strip()]
-        
         # Сравниваем множества: количество и сами коды должны совпадать
-        if set(scanned_codes) != set(issued_codes):
+        if set(scanned_codes) != issued_codes:
             return jsonify({
                 'success': False, 
                 'error': 'Отсканированные коды не совпадают с выданными по этому запросу'
             }), 400
         
         # Всё совпадает — отмечаем возврат
-        book_request.status = 'возвращено'
-        book_request.actual_return_date = datetime.now()
+        change_status(book_request, 'выдано', 'возвращено', actual_return_date=datetime.now())
         
         # Освобождаем экземпляры
-        BookCopy.query.filter(BookCopy.current_request_id == book_request.id).update({
-            'current_request_id': None,
-            'is_available': True
-        })
+        release_copies(book_request)
         
         db.session.commit()
+        invalidate_book_lists(book_request.book_id)
         
         return jsonify({'success': True, 'message': 'Возврат подтверждён'})
         
+    except CirculationError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 409
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
     
-@app.route('/search-books')
+@route('/search-books')
 def search_books():
     query = request.args.get('q', '').strip()
     group_id = request.args.get('group_id', type=int)
@@ -530,43 +680,42 @@ def search_books():
     if not group_id:
         return jsonify([])
     
-    group = Group.query.get(group_id)
-    if not group:
-        return jsonify([])
-    
-    # Выбираем книги только по языку и курсу (без фильтра по доступности)
-    # Включаем книги для языка группы и книги для обеих языков ("both")
-    books_query = Book.query.filter(
-        or_(
-            Book.language == group.language,
-            Book.language == 'both'
-        ),
-        Book.course == group.course
-    )
+    # Результат зависит только от каталога и группы — отвечаем 304, если они не менялись
+    etag = versions_etag('groups', 'catalogue')
     
-    # Загружаем все подходящие книги (без фильтра по запросу пока)
-    books = books_query.all()
-    
-    # Фильтруем книги по запросу (если есть) и по доступности
-    available_books = []
-    for book in books:
-        # Если есть запрос, проверяем наличие полного слова в названии или авторе
+    def build():
+        group = Group.query.get(group_id)
+        if not group:
+            return []
+        
+        # Выбираем книги по языку и курсу, доступность берём из счётчика available_count
+        # Включаем книги для языка группы и книги для обеих языков ("both")
+        books_query = Book.query.filter(
+            Book.language.in_([group.language, 'both']),
+            Book.course == group.course,
+            Book.available_count > 0
+        )
+        
+        # Фильтруем книги по запросу (если есть): слово в названии или авторе начинается с запроса
         if query:
-            name_match = contains_full_word(book.name, query)
-            author_match = contains_full_word(book.author, query)
-            if not (name_match or author_match):
-                continue
+            books_query = books_query.filter(Book.id.in_(matching_ids('book', query)))
+        
+        books = books_query.order_by(Book.id).limit(current_app.config['SEARCH_BOOKS_LIMIT']).all()
         
-        # Проверяем доступность
-        if book.available_quantity > 0:
+        available_books = []
+        for book in books:
             available_books.append({
                 'id': book.id,
                 'name': book.name,
                 'author': book.author,
                 'available': book.available_quantity
             })
+        
+        return available_books
     
-    return jsonify(available_books)
+    return conditional_json(etag, build)
+
+app = create_app()
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,247 @@
+"""
+Кэш справочных данных для формы запроса книги.
+
+/get-groups и /get-books/<group_id> открывает каждый студент, а данные
+меняются редко: список групп — только при импорте, список книг группы —
+при выдаче, возврате и отклонении запроса (меняется число свободных
+экземпляров). Поэтому списки кэшируются:
+    'groups'                   — все группы (id, название, язык, курс);
+    'books:<язык>:<курс>'      — книги для групп с этим языком и курсом.
+
+Обработчики выдачи/возврата/отклонения после коммита вызывают
+invalidate_book_lists(book_id) — сбрасываются только списки, в которые
+входит эта книга, и отдельной короткой транзакцией увеличивается версия
+'catalogue' для ETag (её ошибка только пишется в лог — выдача уже записана).
+Кроме того, у записей есть срок жизни (CACHE_TTL).
+Маршруты с ETag передают ещё и версию данных (etags.versions_etag):
+запись с другой версией считается промахом.
+
+По умолчанию кэш живёт в памяти процесса (LocalCache, LRU + TTL). Если
+воркеров gunicorn несколько, сброс в одном воркере не виден остальным —
+тогда задайте CACHE_REDIS_URL, и все воркеры будут делить один кэш в Redis.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from models import db, Group, Book, bump_versions
+
+logger = logging.getLogger('library.cache')
+
+
+class LocalCache:
+    """LRU-кэш в памяти процесса со сроком жизни записей"""
+    name = 'local'
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """Общий кэш для нескольких процессов (нужен пакет redis)"""
+    name = 'redis'
+
+    def __init__(self, url, prefix='library:'):
+        import redis
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._client.set(self._prefix + key, json.dumps(value, ensure_ascii=False), px=int(ttl * 1000))
+
+    def delete(self, keys):
+        if keys:
+            self._client.delete(*[self._prefix + key for key in keys])
+
+    def clear(self):
+        for key in self._client.scan_iter(self._prefix + '*'):
+            self._client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self._client.scan_iter(self._prefix + '*'))
+
+
+class CatalogCache:
+    """Бэкенд кэша + счётчики попаданий и промахов"""
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build, version=None):
+        """
+        Значение из кэша или build(). Если передана версия данных (etags.py),
+        запись другой версии считается промахом — так воркеры с локальным
+        кэшем не отдадут устаревший список, даже если сброс был в другом воркере.
+        """
+        if self.ttl <= 0:
+            return build()
+        item = self.backend.get(key)
+        hit = item is not None and item[0] == version
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            return item[1]
+        value = build()
+        self.backend.set(key, [version, value], self.ttl)
+        return value
+
+    def invalidate(self, keys):
+        keys = list(keys)
+        self.backend.delete(keys)
+        with self._lock:
+            self.invalidations += len(keys)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': self.backend.name,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else None,
+            'invalidations': self.invalidations,
+        }
+
+
+def init_cache(app):
+    url = app.config.get('CACHE_REDIS_URL')
+    backend = RedisCache(url) if url else LocalCache(app.config['CACHE_MAX_ENTRIES'])
+    app.extensions['catalog_cache'] = CatalogCache(backend, app.config['CACHE_TTL'])
+
+
+def _cache():
+    return current_app.extensions['catalog_cache']
+
+
+def _books_key(language, course):
+    return f'books:{language}:{course}'
+
+
+def groups(version=None):
+    """Все группы: [{'id', 'name', 'language', 'course'}, ...]"""
+    return _cache().get_or_build('groups', lambda: [
+        {'id': g.id, 'name': g.name, 'language': g.language, 'course': g.course}
+        for g in Group.query.order_by(Group.id)
+    ], version)
+
+
+def find_group(group_id, version=None):
+    """Группа из кэша или, если её там ещё нет (только что создана), из базы"""
+    for group in groups(version):
+        if group['id'] == group_id:
+            return group
+    group = Group.query.get_or_404(group_id)
+    return {'id': group.id, 'name': group.name, 'language': group.language, 'course': group.course}
+
+
+def books_for(language, course, version=None):
+    """Книги со свободными экземплярами для групп с этим языком и курсом"""
+    def build():
+        # Включаем книги для языка группы и книги для обеих языков ("both")
+        books = Book.query.filter(
+            Book.language.in_([language, 'both']),
+            Book.course == course,
+            Book.available_count > 0
+        ).all()
+        return [{
+            'id': book.id,
+            'name': f"{book.name} ({book.author}, {book.year})",
+            'available': book.available_quantity
+        } for book in books]
+
+    return _cache().get_or_build(_books_key(language, course), build, version)
+
+
+def invalidate_book_lists(*book_ids):
+    """
+    Сбрасывает списки книг, в которые входят эти книги, и увеличивает версию
+    'catalogue' для ETag (вызывать после коммита).
+
+    Версия увеличивается отдельной короткой транзакцией, а не вместе с выдачей:
+    строка catalog_versions одна на весь каталог, и в транзакции выдачи её
+    блокировка (Postgres) держалась бы до коммита, выстраивая всех библиотекарей
+    в очередь. Цена — между коммитом выдачи и этим вызовом клиент ещё может
+    получить 304 со старым числом свободных экземпляров, а если процесс упадёт
+    между ними, ETag обновится только при следующем изменении каталога.
+
+    Выдача к этому моменту уже записана, поэтому ошибка здесь (например,
+    "database is locked" на SQLite) не выбрасывается, а только пишется в лог:
+    иначе обработчик ответил бы 500, а повтор — "запрос уже обработан".
+    Если не удалось и прочитать книги, сбрасывается весь кэш.
+    """
+    try:
+        bump_versions('catalogue')
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Не удалось увеличить версию 'catalogue' после коммита (книги %s)", book_ids)
+    try:
+        rows = db.session.query(Book.language, Book.course).filter(Book.id.in_(book_ids)).distinct().all()
+        keys = set()
+        for language, course in rows:
+            if language == 'both':
+                keys.update(_books_key(g['language'], course) for g in groups())
+            else:
+                keys.add(_books_key(language, course))
+    except Exception:
+        db.session.rollback()
+        logger.exception("Не удалось определить списки книг %s — кэш сброшен целиком", book_ids)
+        invalidate_all()
+        return
+    _cache().invalidate(keys)
+
+
+def invalidate_all():
+    """После импорта каталога или списка студентов"""
+    _cache().backend.clear()
+
+
+def cache_stats():
+    return _cache().stats()
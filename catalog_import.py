@@ -0,0 +1,476 @@
+# catalog_import.py
+"""
+Потоковый импорт каталога учебников из Excel.
+
+Файл читается построчно (openpyxl в режиме read_only), дубликаты
+регистрационных номеров отсекаются через множество в памяти, а книги и
+экземпляры пишутся пачками — по одному INSERT на пачку вместо запроса на
+каждую строку. Результат тот же, что давал seed.py раньше: те же книги,
+в том же порядке, с теми же экземплярами.
+
+Автор, название и язык книги определяет classify_title: заранее
+скомпилированные выражения и кэш по названию — строка книги повторяется
+в файле на каждый экземпляр, а разбирается один раз. Метки сверяются
+с эталоном: python check_catalog_labels.py.
+
+Повторная загрузка обновлённого файла — режим --sync: в базу вносится
+только разница (см. sync_catalogue), запросы и выданные экземпляры
+не трогаются.
+
+Запуск:
+    python catalog_import.py [файл.xlsx] [--chunk-size 1000] [--replace]
+    python catalog_import.py [файл.xlsx] --sync [--dry-run]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from functools import lru_cache
+
+from openpyxl import load_workbook
+from sqlalchemy import insert, select, update
+
+from models import (db, Book, BookCopy, BookRequest, request_copies,
+                    recount_available_copies, bump_versions)
+
+# Данные в листе начинаются с 4-й строки: пустая строка, заголовок, шапка таблицы
+FIRST_DATA_ROW = 4
+DEFAULT_YEAR = 2020
+CHUNK_SIZE = 1000
+
+ImportStats = namedtuple('ImportStats', ['rows', 'books', 'copies', 'duplicates', 'seconds', 'peak_memory'])
+
+
+# Признаки для разбора названий — выражения компилируются один раз при импорте модуля.
+# Каждая группа букв или ключевых слов ищется одним проходом по строке
+# вместо отдельного поиска подстроки на каждую букву и каждое слово.
+_KAZAKH_LETTERS = re.compile('[әғқңөүұһі]')
+_RUSSIAN_LETTERS = re.compile('[а-яё]')
+_LATIN_LETTERS = re.compile('[a-z]')
+# 'русск', 'для русск', 'русские группы' содержат 'русс'; 'қазақ тілі', 'қазақша' — 'қазақ';
+# 'казахский язык' — 'казах'. Поэтому достаточно корней.
+_RUSSIAN_GROUPS = re.compile(r'русс|рус\. группа')
+_KAZAKH_GROUPS = re.compile('қазақ|казах')
+_OKULYK = re.compile('оқулық|okulyk')
+_UCHEBNIK = re.compile('учебник|uchebnik')
+_EMN = re.compile('емн|emn')
+
+_AUTHOR_TITLE = re.compile(r'^(.+?)\s*\.\s+(.+)$')
+_REG_NUMBER = re.compile(r'(\d+)\s*[\(]?\s*(\d+)')
+_DIGITS = re.compile(r'(\d+)')
+
+# Сколько разных строк "Автор. Название" помнит classify_title
+TITLE_CACHE_SIZE = 4096
+
+TitleInfo = namedtuple('TitleInfo', ['author', 'title', 'language'])
+
+
+def detect_language(title):
+    """
+    Определяет язык обучения по названию книги.
+    Возвращает 'kz', 'ru', или 'both'
+    """
+    title_lower = title.lower()
+    
+    # Казахские буквы ищем в исходной строке, русские и латинские — в строчной
+    has_kazakh = _KAZAKH_LETTERS.search(title) is not None
+    has_russian = _RUSSIAN_LETTERS.search(title_lower) is not None
+    has_english = _LATIN_LETTERS.search(title_lower) is not None
+    
+    # Ключевые слова
+    has_russian_indication = _RUSSIAN_GROUPS.search(title_lower) is not None
+    has_kazakh_indication = _KAZAKH_GROUPS.search(title_lower) is not None
+    
+    if has_english and not has_russian_indication and not has_kazakh_indication:
+        if _OKULYK.search(title_lower) and _UCHEBNIK.search(title_lower):
+            return 'both'
+        if _EMN.search(title_lower) and has_kazakh and has_russian:
+            return 'both'
+    
+    if has_russian_indication and not has_kazakh_indication:
+        return 'ru'
+    
+    if has_kazakh_indication and not has_russian_indication:
+        return 'kz'
+    
+    if has_kazakh and not has_russian_indication:
+        return 'kz'
+    
+    if has_kazakh and has_russian and has_english:
+        return 'both'
+    
+    if has_kazakh and has_russian and not has_english:
+        return 'kz'
+    
+    if has_russian and not has_kazakh:
+        return 'ru'
+    
+    return 'ru'  # По умолчанию
+
+def parse_author_and_title(full_text):
+    """
+    Парсит строку "Автор. Название" и разделяет на автора и название.
+    """
+    if full_text is None or not full_text:
+        return "", ""
+    
+    full_text = str(full_text).strip()
+    
+    match = _AUTHOR_TITLE.search(full_text)
+    if match:
+        author = match.group(1).strip()
+        title = match.group(2).strip()
+        return author, title
+    
+    return "", full_text
+
+@lru_cache(maxsize=TITLE_CACHE_SIZE)
+def classify_title(author_title):
+    """
+    Автор, название и язык по строке "Автор. Название" — общий шаг импорта
+    и синхронизации. В файле строка книги повторяется на каждый экземпляр,
+    поэтому результат запоминается и разбирается один раз на название.
+    """
+    author, title = parse_author_and_title(author_title)
+    return TitleInfo(author, title, detect_language(author_title))
+
+
+def extract_number(code):
+    """Ключ сортировки регистрационного номера: '1234(5)' → (1234, 5)"""
+    code_str = str(code).strip()
+    match = _REG_NUMBER.search(code_str)
+    if match:
+        main_num = int(match.group(1))
+        sub_num = int(match.group(2))
+        return (main_num, sub_num)
+    match = _DIGITS.search(code_str)
+    if match:
+        return (int(match.group(1)), 0)
+    return (0, 0)
+
+def find_excel_file(directory='.'):
+    """Первый .xlsx файл в директории — как раньше делал seed.py"""
+    for file in sorted(os.listdir(directory)):
+        if file.endswith('.xlsx') and not file.startswith('~$'):
+            return os.path.join(directory, file)
+    raise FileNotFoundError("Excel файл не найден в текущей директории")
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+def _cell_year(value):
+    if value is None or isinstance(value, bool):
+        return DEFAULT_YEAR
+    try:
+        return int(float(str(value).strip()))
+    except ValueError:
+        return DEFAULT_YEAR
+
+def iter_catalogue_rows(path):
+    """
+    Построчно отдаёт (рег. номер, "Автор. Название", издательство, год).
+    Строки без номера или без названия пропускаются.
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        for row in sheet.iter_rows(min_row=FIRST_DATA_ROW, max_col=5, values_only=True):
+            row = tuple(row) + (None,) * (5 - len(row))
+            reg_number = _cell_text(row[1])
+            author_title = _cell_text(row[2])
+            if not reg_number or not author_title:
+                continue
+            yield reg_number, author_title, _cell_text(row[3]), _cell_year(row[4])
+    finally:
+        workbook.close()
+
+def group_books(rows):
+    """
+    Собирает строки в книги по ключу "Автор. Название" в порядке первого
+    появления. Возвращает (число строк, словарь книг).
+    """
+    books = {}
+    count = 0
+    for reg_number, author_title, publisher, year in rows:
+        count += 1
+        book = books.get(author_title)
+        if book is None:
+            info = classify_title(author_title)
+            book = books[author_title] = {
+                'author': info.author,
+                'publisher': publisher,
+                'year': year,
+                'language': info.language,
+                'copy_codes': []
+            }
+        book['copy_codes'].append(reg_number)
+    return count, books
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def plan_catalogue(books, log=print):
+    """
+    Превращает сгруппированные книги в строки для таблицы books и списки
+    кодов экземпляров. Номер экземпляра достаётся первой книге, в которой
+    он встретился. Возвращает (список (строка книги, коды), число дубликатов).
+    """
+    seen_codes = set()
+    duplicates = 0
+    planned = []
+    for author_title, data in books.items():
+        unique_codes = sorted(dict.fromkeys(data['copy_codes']), key=extract_number)
+        codes = []
+        for code in unique_codes:
+            if code in seen_codes:
+                log(f"  Пропущен дубликат copy_code: {code}")
+                duplicates += 1
+                continue
+            seen_codes.add(code)
+            codes.append(code)
+        planned.append(({
+            'name': author_title,
+            'author': data['author'] or "Не указан",
+            'year': data['year'],
+            'total_quantity': len(data['copy_codes']),
+            'language': data['language'],
+            'publisher': data['publisher'] or None
+        }, codes))
+    return planned, duplicates
+
+def _read_catalogue(path, log):
+    path = path or find_excel_file()
+    log(f"Читаю файл: {path}")
+    row_count, books = group_books(iter_catalogue_rows(path))
+    log(f"Прочитано {row_count} записей, найдено {len(books)} уникальных книг")
+    planned, duplicates = plan_catalogue(books, log)
+    return row_count, planned, duplicates
+
+def import_catalogue(path=None, chunk_size=CHUNK_SIZE, log=print):
+    """
+    Загружает каталог из Excel в пустые таблицы books / book_copies.
+    Коммит и пересборку индекса поиска делает вызывающий код.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        row_count, planned, duplicates = _read_catalogue(path, log)
+
+        copies = 0
+        for offset in range(0, len(planned), chunk_size):
+            chunk = planned[offset:offset + chunk_size]
+            book_ids = db.session.scalars(
+                insert(Book).returning(Book.id, sort_by_parameter_order=True),
+                [dict(row, course=1, available_count=len(codes)) for row, codes in chunk]
+            ).all()
+            copy_rows = [
+                {'copy_code': code, 'book_id': book_id, 'is_available': True}
+                for book_id, (row, codes) in zip(book_ids, chunk)
+                for code in codes
+            ]
+            for copy_chunk in _chunks(copy_rows, chunk_size):
+                db.session.execute(insert(BookCopy), copy_chunk)
+            copies += len(copy_rows)
+            log(f"  Записано {offset + len(chunk)} книг...")
+
+        # Core insert мимо ORM — версию каталога для ETag увеличиваем сами
+        bump_versions('catalogue')
+
+        seconds = time.perf_counter() - started
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    stats = ImportStats(row_count, len(planned), copies, duplicates, seconds, peak_memory)
+    log(f"Импорт: {stats.rows} строк за {stats.seconds:.2f} с "
+        f"({stats.rows / max(stats.seconds, 1e-9):.0f} строк/с), "
+        f"пик памяти {stats.peak_memory / 1024 / 1024:.1f} МБ")
+    return stats
+
+# Поля книги, которые синхронизация переносит из Excel (курс задаётся вручную и не трогается)
+SYNC_BOOK_FIELDS = ('author', 'year', 'total_quantity', 'language', 'publisher')
+
+SyncSummary = namedtuple('SyncSummary', [
+    'books_added', 'books_updated', 'books_restored', 'books_removed', 'books_kept',
+    'copies_added', 'copies_moved', 'copies_restored', 'copies_removed', 'copies_kept'
+])
+
+def _copies_in_use():
+    """id экземпляров, которые сейчас выданы/заняты или записаны за запросом в ожидании"""
+    held = db.session.scalars(
+        select(BookCopy.id).where(BookCopy.current_request_id.isnot(None))
+    )
+    pending = db.session.scalars(
+        select(request_copies.c.copy_id)
+        .join(BookRequest, request_copies.c.request_id == BookRequest.id)
+        .where(BookRequest.status == 'ожидание')
+    )
+    return set(held) | set(pending)
+
+def sync_catalogue(path=None, chunk_size=CHUNK_SIZE, log=print):
+    """
+    Сверяет Excel с базой и вносит только разницу: новые книги и экземпляры,
+    изменённые поля книг, перенос экземпляра к другой книге, списание
+    (is_active=False) того, чего в файле больше нет. Ключи — "Автор. Название"
+    для книг и регистрационный номер для экземпляров.
+
+    Выданные, занятые и запрошенные экземпляры не списываются и не переносятся,
+    книга с такими экземплярами остаётся в каталоге. Всё делается в текущей
+    транзакции; коммит (или откат для пробного запуска) — на вызывающем коде.
+    """
+    row_count, planned, duplicates = _read_catalogue(path, log)
+    counts = dict.fromkeys(SyncSummary._fields, 0)
+
+    # Книги: сравниваем через ORM, чтобы индекс поиска обновился сам (search_index)
+    existing_books = {}
+    for book in Book.query.order_by(Book.id):
+        existing_books.setdefault(book.name, book)
+
+    in_use = _copies_in_use()
+    copy_rows = db.session.execute(select(
+        BookCopy.id, BookCopy.copy_code, BookCopy.book_id,
+        BookCopy.is_active, BookCopy.current_request_id
+    )).all()
+    existing_copies = {row.copy_code: row for row in copy_rows}
+    books_in_use = {row.book_id for row in copy_rows if row.id in in_use}
+
+    book_by_name = {}
+    for row, codes in planned:
+        book = existing_books.get(row['name'])
+        if book is None:
+            book = Book(course=1, available_count=0, **row)
+            db.session.add(book)
+            counts['books_added'] += 1
+        else:
+            changed = False
+            for field in SYNC_BOOK_FIELDS:
+                if getattr(book, field) != row[field]:
+                    setattr(book, field, row[field])
+                    changed = True
+            if not book.is_active:
+                book.is_active = True
+                counts['books_restored'] += 1
+            elif changed:
+                counts['books_updated'] += 1
+        book_by_name[row['name']] = book
+
+    for name, book in existing_books.items():
+        if name in book_by_name or not book.is_active:
+            continue
+        if book.id in books_in_use:
+            log(f"  Книги нет в файле, но её экземпляры на руках — оставлена: {name}")
+            counts['books_kept'] += 1
+            continue
+        book.is_active = False
+        counts['books_removed'] += 1
+
+    db.session.flush()  # id новых книг
+
+    new_copies = []
+    updates = []
+    wanted = set()
+    for row, codes in planned:
+        book_id = book_by_name[row['name']].id
+        for code in codes:
+            wanted.add(code)
+            copy = existing_copies.get(code)
+            if copy is None:
+                new_copies.append({'copy_code': code, 'book_id': book_id, 'is_available': True})
+                counts['copies_added'] += 1
+                continue
+            if copy.book_id != book_id and copy.id in in_use:
+                log(f"  Экземпляр {code} перенесён к другой книге в файле, но сейчас занят — оставлен")
+                counts['copies_kept'] += 1
+                continue
+            values = {}
+            if copy.book_id != book_id:
+                values['book_id'] = book_id
+                counts['copies_moved'] += 1
+            if not copy.is_active:
+                values['is_active'] = True
+                values['is_available'] = copy.current_request_id is None
+                counts['copies_restored'] += 1
+            if values:
+                updates.append(dict(values, id=copy.id))
+
+    for code, copy in existing_copies.items():
+        if code in wanted or not copy.is_active:
+            continue
+        if copy.id in in_use:
+            counts['copies_kept'] += 1
+            continue
+        updates.append({'id': copy.id, 'is_active': False, 'is_available': False})
+        counts['copies_removed'] += 1
+
+    for chunk in _chunks(new_copies, chunk_size):
+        db.session.execute(insert(BookCopy), chunk)
+    for chunk in _chunks(updates, chunk_size):
+        db.session.execute(update(BookCopy), chunk)
+    recount_available_copies()
+
+    summary = SyncSummary(**counts)
+    log(f"Строк в файле: {row_count}, пропущено дубликатов: {duplicates}")
+    log(f"Книги: +{summary.books_added} новых, {summary.books_updated} изменено, "
+        f"{summary.books_restored} возвращено, {summary.books_removed} списано, "
+        f"{summary.books_kept} оставлено (экземпляры на руках)")
+    log(f"Экземпляры: +{summary.copies_added} новых, {summary.copies_moved} перенесено, "
+        f"{summary.copies_restored} возвращено, {summary.copies_removed} списано, "
+        f"{summary.copies_kept} оставлено (выданы или запрошены)")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт каталога учебников из Excel")
+    parser.add_argument('path', nargs='?', help="файл .xlsx (по умолчанию первый в текущей папке)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--replace', action='store_true',
+                      help="удалить существующий каталог перед импортом")
+    mode.add_argument('--sync', action='store_true',
+                      help="внести в базу только изменения из файла")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="с --sync: показать изменения и ничего не сохранять")
+    args = parser.parse_args()
+    if args.dry_run and not args.sync:
+        parser.error("--dry-run работает только вместе с --sync")
+
+    from app import app
+    from search_index import rebuild_search_index
+    from catalog_cache import invalidate_all
+
+    with app.app_context():
+        if args.sync:
+            sync_catalogue(args.path, args.chunk_size)
+            if args.dry_run:
+                db.session.rollback()
+                print("Пробный запуск: изменения не сохранены")
+            else:
+                db.session.commit()
+                invalidate_all()
+                print("✅ Каталог синхронизирован")
+            return
+
+        if db.session.query(Book.id).first() is not None:
+            if not args.replace:
+                print("Каталог не пуст. Запустите с --sync, чтобы внести изменения, "
+                      "или с --replace, чтобы загрузить его заново.")
+                sys.exit(1)
+            BookCopy.query.delete()
+            Book.query.delete()
+
+        stats = import_catalogue(args.path, args.chunk_size)
+        rebuild_search_index(['book'])
+        db.session.commit()
+        invalidate_all()
+        print(f"✅ Создано книг: {stats.books}, экземпляров: {stats.copies}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# check_catalog_labels.py
+"""
+Проверка разбора названий каталога (catalog_import.classify_title).
+
+Для каждой уникальной строки "Автор. Название" из Excel и для набора
+пограничных строк автор, название и язык должны совпадать с эталоном
+catalog_labels_golden.json. Эталон снят с прежней построчной реализации
+detect_language / parse_author_and_title, поэтому любое расхождение —
+изменение меток в каталоге. Заодно замеряется скорость разбора на всех
+строках файла: без кэша, с пустым кэшем и с заполненным.
+
+    python check_catalog_labels.py [файл.xlsx]
+    python check_catalog_labels.py [файл.xlsx] --update   # перезаписать эталон
+"""
+import sys
+import os
+import json
+import time
+import argparse
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from catalog_import import (iter_catalogue_rows, find_excel_file, classify_title,
+                            detect_language, parse_author_and_title)
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalog_labels_golden.json')
+
+# Строки, которых нет в файле, но которые проходят по всем веткам detect_language
+EXTRA_TITLES = [
+    '', 'Без автора и точки', 'Иванов И.И.Без пробела после точки', 'Петров. ', '  Сидоров .  Алгебра  ',
+    'Smith J. English Grammar in Use', 'Aбай. Okulyk uchebnik English', 'Emn. English қазақ русский',
+    'Абаев. Математика (для русских групп)', 'Абаев. Математика рус. группа', 'Абаев. Математика. Русс. яз.',
+    'Қасымов. Қазақ тілі', 'Касымов. Казахский язык', 'Касымов. Қазақша', 'Абаев. ҚАЗАҚ ӘДЕБИЕТІ',
+    'Абаев. Физика қазақ русский', 'Ахметов. Тарих оқулық учебник', 'Ахметов. History of Kazakhstan',
+    'Ахметов. Алгебра. 10 сынып', 'Ахметов. Алгебра 10 класс', 'Ахметов. Русский и қазақ',
+    'Автор. Название\nс переносом', '12345', 'Ёлкин. Ёжик',
+]
+
+# Сколько раз прогонять каждый вариант замера (берётся лучшее время)
+REPEATS = 5
+
+
+def label(text):
+    info = classify_title(text)
+    return [text, info.author, info.title, info.language]
+
+
+def write_golden(rows):
+    # По строке на название — чтобы расхождения были видны в git diff
+    with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+        f.write('[\n' + ',\n'.join(json.dumps(row, ensure_ascii=False) for row in rows) + '\n]\n')
+
+
+def check(texts):
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        golden = json.load(f)
+    expected = {row[0]: row for row in golden}
+    missing = [text for text in texts if text not in expected]
+    mismatches = [(expected[text], label(text)) for text in texts
+                  if text in expected and label(text) != expected[text]]
+
+    for text in missing:
+        print(f"❌ Нет в эталоне: {text!r} (перезапишите эталон с --update, если файл изменился)")
+    for want, got in mismatches:
+        print(f"❌ {want[0]!r}\n   эталон: {want[1:]}\n   сейчас: {got[1:]}")
+    if missing or mismatches:
+        return False
+    print(f"✅ Метки {len(texts)} названий совпадают с эталоном")
+    return True
+
+
+def best_time(func):
+    times = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def benchmark(column):
+    """Разбор всей колонки "Автор. Название" (по строке на экземпляр, как при импорте)"""
+    def uncached():
+        for text in column:
+            parse_author_and_title(text)
+            detect_language(text)
+
+    def cold():
+        classify_title.cache_clear()
+        for text in column:
+            classify_title(text)
+
+    def warm():
+        for text in column:
+            classify_title(text)
+
+    print(f"\nЗамер на {len(column)} строках ({len(set(column))} уникальных названий), лучшее из {REPEATS}:")
+    for name, func in (('без кэша', uncached), ('пустой кэш', cold), ('заполненный кэш', warm)):
+        seconds = best_time(func)
+        print(f"  {name:<16} {seconds * 1000:8.2f} мс  {len(column) / seconds:12,.0f} строк/с")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сверка меток каталога с эталоном и замер скорости")
+    parser.add_argument('path', nargs='?', help="файл .xlsx (по умолчанию первый в текущей папке)")
+    parser.add_argument('--update', action='store_true', help="перезаписать эталон текущими метками")
+    args = parser.parse_args()
+
+    column = [author_title for _, author_title, _, _ in iter_catalogue_rows(args.path or find_excel_file())]
+    texts = list(dict.fromkeys(column)) + [text for text in EXTRA_TITLES if text not in column]
+
+    if args.update:
+        write_golden([label(text) for text in texts])
+        print(f"✅ Эталон перезаписан: {len(texts)} названий -> {GOLDEN_PATH}")
+        return
+
+    ok = check(texts)
+    benchmark(column)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+# check_queries.py
+"""
+Проверка, что число SQL-запросов на страницах админки не растёт с числом строк.
+Запускается на временной базе в памяти, рабочую database.db не трогает:
+    python check_queries.py
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from app import app, db
+from models import Group, Student, Book, BookCopy, BookRequest, recount_available_copies
+
+STATUSES = ['ожидание', 'выдано', 'возвращено']
+
+
+def fill_database(rows):
+    """Создаёт rows запросов с разными студентами, группами, книгами и экземплярами"""
+    db.drop_all()
+    db.create_all()
+    
+    groups = [Group(name=f'ГР-{i}', language='kz' if i % 2 else 'ru', course=1) for i in range(5)]
+    db.session.add_all(groups)
+    db.session.flush()
+    
+    books = [Book(name=f'Книга {i}', author=f'Автор {i}', year=2020, total_quantity=rows,
+                  language='kz', course=1) for i in range(5)]
+    db.session.add_all(books)
+    db.session.flush()
+    
+    now = datetime.now()
+    for i in range(rows):
+        student = Student(full_name=f'Студент {i} Тестович', group_id=groups[i % len(groups)].id)
+        db.session.add(student)
+        db.session.flush()
+        
+        book = books[i % len(books)]
+        status = STATUSES[i % len(STATUSES)]
+        req = BookRequest(student_id=student.id, book_id=book.id, quantity=2, status=status,
+                          request_date=now - timedelta(minutes=i), request_number=f'T-{i:05d}')
+        db.session.add(req)
+        db.session.flush()
+        
+        for j in range(2):
+            issued = status == 'выдано'
+            copy = BookCopy(copy_code=f'{i}-{j}', book_id=book.id, is_available=not issued,
+                            current_request_id=req.id if issued else None)
+            db.session.add(copy)
+            req.requested_copies.append(copy)
+    
+    recount_available_copies()
+    db.session.commit()
+
+
+def count_queries(client, url):
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+    assert response.status_code == 200, f'{url}: HTTP {response.status_code}'
+    return len(statements)
+
+
+def main():
+    urls = [
+        '/admin',
+        '/admin/filter?status=all&date=all',
+        '/admin/filter?status=выдано&date=all',
+        '/admin/filter?status=all&date=all&search=студент',
+    ]
+    failed = False
+    
+    with app.app_context():
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['admin_logged_in'] = True
+        
+        results = {}
+        for rows in (6, 60):
+            fill_database(rows)
+            results[rows] = {url: count_queries(client, url) for url in urls}
+        
+        print("=== ЧИСЛО SQL-ЗАПРОСОВ НА СТРАНИЦУ ===")
+        for url in urls:
+            small, large = results[6][url], results[60][url]
+            ok = small == large
+            failed = failed or not ok
+            print(f"{'✅' if ok else '❌'} {url}: 6 строк -> {small}, 60 строк -> {large}")
+    
+    if failed:
+        print("\n❌ Число запросов растёт вместе с числом строк (N+1)")
+        sys.exit(1)
+    print("\n✅ Число запросов не зависит от числа строк")
+
+
+if __name__ == '__main__':
+    main()
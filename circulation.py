@@ -0,0 +1,496 @@
+"""
+Общая логика работы с экземплярами книг для обработчиков выдачи и возврата.
+
+Все проверки отсканированных кодов делаются одним запросом
+SELECT ... WHERE copy_code IN (...): для выдачи целого класса (30+ экземпляров)
+это один запрос вместо десятков. Там же одним JOIN подтягивается ФИО студента,
+у которого экземпляр сейчас на руках, — для сообщений о конфликтах.
+
+Проверка check_copies только готовит понятное сообщение для библиотекаря.
+Окончательное решение принимают условные UPDATE в reserve_copies и
+change_status: "занять, только если ещё свободно" с проверкой числа
+изменённых строк. Так два библиотекаря (два воркера gunicorn) не могут
+выдать один и тот же экземпляр или подтвердить один запрос дважды —
+ни на SQLite, ни на Postgres.
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from models import (db, Book, BookCopy, BookRequest, Student, RequestCounter, request_copies,
+                    recount_available_copies, upsert_insert)
+from reports import record_transition
+
+
+class CirculationError(Exception):
+    """Конфликт при параллельной обработке — транзакцию нужно откатить"""
+
+
+class CopiesUnavailable(CirculationError):
+    """Экземпляры успели занять другим запросом"""
+
+
+class RequestAlreadyProcessed(CirculationError):
+    """Статус запроса успели изменить в другом окне/воркере"""
+
+
+class InvalidRequest(Exception):
+    """Запрос студента не прошёл проверку — текст показывается студенту"""
+
+# found=False — экземпляра с таким кодом у этой книги нет;
+# found=True — экземпляр занят запросом request_id (может быть None), holder — ФИО студента
+Conflict = namedtuple('Conflict', ['code', 'found', 'request_id', 'holder'])
+
+
+def parse_codes(codes_str):
+    """'1, 2,3' -> ['1', '2', '3']; повторно отсканированный код учитывается один раз"""
+    codes = [code.strip() for code in (codes_str or '').split(',') if code.strip()]
+    return list(dict.fromkeys(codes))
+
+
+def _copies_with_holders():
+    """Экземпляры вместе с ФИО студента, у которого они сейчас (одним JOIN)"""
+    return (
+        db.session.query(BookCopy, Student.full_name)
+        .outerjoin(BookRequest, BookCopy.current_request_id == BookRequest.id)
+        .outerjoin(Student, BookRequest.student_id == Student.id)
+    )
+
+
+def _conflict(copy, holder, own_request_id):
+    if copy.is_available:
+        return None
+    # Занятый экземпляр не конфликтует, только если он привязан именно к этому запросу.
+    # Занятый без привязки (current_request_id = NULL) — всегда конфликт, в том числе для нового запроса.
+    if own_request_id is not None and copy.current_request_id == own_request_id:
+        return None
+    return Conflict(copy.copy_code, True, copy.current_request_id, holder)
+
+
+def check_copies(book_id, codes, own_request_id=None):
+    """
+    Проверяет, что все коды принадлежат книге book_id и экземпляры свободны.
+    Списанные экземпляры (is_active=False) считаются ненайденными.
+    Экземпляры, уже привязанные к own_request_id, конфликтом не считаются.
+    Возвращает (экземпляры в порядке кодов, список Conflict).
+    """
+    if not codes:
+        return [], []
+    
+    rows = (
+        _copies_with_holders()
+        .filter(
+            BookCopy.book_id == book_id,
+            BookCopy.copy_code.in_(set(codes)),
+            BookCopy.is_active == True
+        )
+        .all()
+    )
+    found = {copy.copy_code: (copy, holder) for copy, holder in rows}
+    
+    copies = []
+    conflicts = []
+    for code in codes:
+        if code not in found:
+            conflicts.append(Conflict(code, False, None, None))
+            continue
+        copy, holder = found[code]
+        conflict = _conflict(copy, holder, own_request_id)
+        if conflict:
+            conflicts.append(conflict)
+            continue
+        copies.append(copy)
+    return copies, conflicts
+
+
+def check_codes_count(copy_codes_str, quantity):
+    """Коды из формы запроса; их должно быть ровно quantity (проверка без базы)"""
+    if not copy_codes_str:
+        raise InvalidRequest("Не прикреплены экземпляры")
+    codes = parse_codes(copy_codes_str)
+    if len(codes) != quantity:
+        raise InvalidRequest(f"Прикреплено {len(codes)} экземпляров, ожидалось {quantity}")
+    return codes
+
+
+def create_request(student_id, book_id, quantity, copy_codes_str, ticket=None):
+    """
+    Проверяет запрос студента и добавляет его в сессию (без коммита).
+    Все проверки идут до первой записи: при InvalidRequest в сессии ничего не меняется,
+    поэтому очередь отправки (submission_queue.py) может собрать много запросов
+    в одну транзакцию и просто пропустить непрошедшие проверку.
+    """
+    student = db.session.get(Student, student_id) if student_id else None
+    if not student:
+        raise InvalidRequest("Студент не найден")
+    
+    book = db.session.get(Book, book_id) if book_id else None
+    if not book:
+        raise InvalidRequest("Книга не найдена")
+    
+    # Проверяем язык: книга должна быть для языка группы или для обеих языков
+    if book.language not in [student.group.language, 'both'] or book.course != student.group.course:
+        raise InvalidRequest("Эта книга не для вашей группы")
+    
+    codes_list = check_codes_count(copy_codes_str, quantity)
+    
+    # Все экземпляры должны быть свободны — проверяем одним запросом
+    copies, conflicts = check_copies(book.id, codes_list)
+    if conflicts:
+        conflict_msg = "; ".join(
+            f"{c.code} (экземпляр уже выдан)" if c.found else f"{c.code} (не найден)"
+            for c in conflicts
+        )
+        raise InvalidRequest(f"Невозможно прикрепить: {conflict_msg}")
+    
+    new_request = BookRequest(
+        student_id=student.id,
+        book_id=book.id,
+        quantity=quantity,
+        status='ожидание',
+        request_date=datetime.now(),
+        # Номер запроса из счётчика за день — атомарно, без поиска по LIKE
+        request_number=next_request_number(),
+        requested_copies=copies,  # сохраняем экземпляры в request_copies
+        ticket=ticket
+    )
+    db.session.add(new_request)
+    return new_request
+
+
+def create_requests(student_id, items):
+    """
+    Комплект учебников одной отправкой: items — [(book_id, строка кодов), ...].
+    Книги — одним запросом, все экземпляры всех книг — одним запросом,
+    номера — одним увеличением счётчика. Если хоть одна книга не прошла
+    проверку, InvalidRequest со всеми ошибками сразу и в сессии ничего не меняется.
+    Возвращает созданные запросы (без коммита).
+    """
+    student = db.session.get(Student, student_id) if student_id else None
+    if not student:
+        raise InvalidRequest("Студент не найден")
+    if not items:
+        raise InvalidRequest("Не выбрано ни одной книги")
+    
+    book_ids = [book_id for book_id, _ in items]
+    books = {book.id: book for book in Book.query.filter(Book.id.in_(book_ids))}
+    errors = []
+    wanted = []  # (книга, коды)
+    seen_books, seen_codes = set(), set()
+    for book_id, copy_codes_str in items:
+        book = books.get(book_id)
+        if not book:
+            errors.append(f"Книга #{book_id} не найдена")
+            continue
+        if book_id in seen_books:
+            errors.append(f"{book.name}: книга указана дважды")
+            continue
+        seen_books.add(book_id)
+        if book.language not in [student.group.language, 'both'] or book.course != student.group.course:
+            errors.append(f"{book.name}: эта книга не для вашей группы")
+            continue
+        codes = parse_codes(copy_codes_str)
+        if not codes:
+            errors.append(f"{book.name}: не прикреплены экземпляры")
+            continue
+        repeated = [code for code in codes if code in seen_codes]
+        if repeated:
+            errors.append(f"{book.name}: экземпляры прикреплены к другой книге запроса: {', '.join(repeated)}")
+            continue
+        seen_codes.update(codes)
+        wanted.append((book, codes))
+    
+    # Все экземпляры всех книг — одним запросом
+    found = {}
+    if wanted:
+        rows = (
+            _copies_with_holders()
+            .filter(
+                BookCopy.book_id.in_([book.id for book, _ in wanted]),
+                BookCopy.copy_code.in_(seen_codes),
+                BookCopy.is_active == True
+            )
+            .all()
+        )
+        found = {(copy.book_id, copy.copy_code): (copy, holder) for copy, holder in rows}
+    
+    checked = []
+    for book, codes in wanted:
+        copies, conflicts = [], []
+        for code in codes:
+            if (book.id, code) not in found:
+                conflicts.append(Conflict(code, False, None, None))
+                continue
+            copy, holder = found[(book.id, code)]
+            conflict = _conflict(copy, holder, None)
+            if conflict:
+                conflicts.append(conflict)
+            else:
+                copies.append(copy)
+        if conflicts:
+            errors.append(f"{book.name}: невозможно прикрепить: " + "; ".join(
+                f"{c.code} (экземпляр уже выдан)" if c.found else f"{c.code} (не найден)" for c in conflicts))
+        checked.append((book, copies))
+    
+    if errors:
+        raise InvalidRequest("\n".join(errors))
+    
+    now = datetime.now()
+    created = [
+        BookRequest(
+            student_id=student.id,
+            book_id=book.id,
+            quantity=len(copies),
+            status='ожидание',
+            request_date=now,
+            request_number=number,
+            requested_copies=copies
+        )
+        for (book, copies), number in zip(checked, next_request_numbers(len(checked), now))
+    ]
+    db.session.add_all(created)
+    return created
+
+
+def _load_requests(request_ids, expected_status, error):
+    """Запросы по id одним SELECT; InvalidRequest, если какого-то нет или статус не тот"""
+    request_ids = list(dict.fromkeys(request_ids))
+    if not request_ids:
+        raise InvalidRequest("Не выбрано ни одного запроса")
+    requests = {r.id: r for r in BookRequest.query.filter(BookRequest.id.in_(request_ids))}
+    errors = [f"#{request_id}: запрос не найден" for request_id in request_ids if request_id not in requests]
+    errors += [f"#{r.id}: {error}" for r in requests.values() if r.status != expected_status]
+    if errors:
+        raise InvalidRequest("\n".join(errors))
+    return [requests[request_id] for request_id in request_ids]
+
+
+def _change_statuses(request_ids, expected_status, new_status, **values):
+    """change_status для многих запросов одним UPDATE; если кого-то успели обработать — откат"""
+    result = db.session.execute(
+        db.update(BookRequest)
+        .where(BookRequest.id.in_(request_ids), BookRequest.status == expected_status)
+        .values(status=new_status, **values)
+    )
+    if result.rowcount != len(request_ids):
+        raise RequestAlreadyProcessed('Часть запросов уже обработана')
+    record_transition(request_ids, new_status)
+
+
+def confirm_requests(request_ids, now=None):
+    """
+    Подтверждает выдачу многих запросов одной транзакцией (без коммита).
+    Экземпляры всех запросов и их занятость — одним JOIN, статусы — одним UPDATE,
+    экземпляры — одним UPDATE, счётчики свободных — одним пересчётом.
+    Все проверки до первой записи: при InvalidRequest ничего не меняется.
+    Возвращает id затронутых книг.
+    """
+    requests = _load_requests(request_ids, 'ожидание', 'запрос уже обработан')
+    ids = [r.id for r in requests]
+    
+    rows = (
+        _copies_with_holders()
+        .add_columns(request_copies.c.request_id)
+        .join(request_copies, request_copies.c.copy_id == BookCopy.id)
+        .filter(request_copies.c.request_id.in_(ids))
+        .order_by(BookCopy.id)
+        .all()
+    )
+    by_request = {request_id: [] for request_id in ids}
+    owners = {}
+    for copy, holder, request_id in rows:
+        by_request[request_id].append((copy, holder))
+        owners.setdefault(copy.id, []).append(request_id)
+    
+    errors = []
+    for r in requests:
+        linked = by_request[r.id]
+        if not linked:
+            errors.append(f"#{r.id}: у запроса нет прикреплённых экземпляров")
+            continue
+        if len(linked) != r.quantity:
+            errors.append(f"#{r.id}: количество кодов ({len(linked)}) не совпадает с запросом ({r.quantity})")
+            continue
+        conflicts = []
+        for copy, holder in linked:
+            conflict = _conflict(copy, holder, r.id)
+            if conflict:
+                conflicts.append(f"{conflict.code} (выдан студенту {conflict.holder or 'Неизвестно'})"
+                                 if conflict.request_id else f"{conflict.code} (уже занят)")
+            elif len(owners[copy.id]) > 1:
+                others = ', '.join(f"#{other}" for other in owners[copy.id] if other != r.id)
+                conflicts.append(f"{copy.copy_code} (прикреплён и к запросу {others})")
+        if conflicts:
+            errors.append(f"#{r.id}: невозможно выдать: " + "; ".join(conflicts))
+    if errors:
+        raise InvalidRequest("\n".join(errors))
+    
+    now = now or datetime.now()
+    _change_statuses(ids, 'ожидание', 'выдано', issue_date=now, planned_return_date=now + timedelta(days=14))
+    
+    # Каждому экземпляру — его запрос (коррелированный подзапрос по request_copies)
+    copy_ids = list(owners)
+    result = db.session.execute(
+        db.update(BookCopy)
+        .where(
+            BookCopy.id.in_(copy_ids),
+            or_(BookCopy.is_available == True, BookCopy.current_request_id.in_(ids))
+        )
+        .values(
+            is_available=False,
+            current_request_id=db.select(request_copies.c.request_id)
+            .where(request_copies.c.copy_id == BookCopy.id, request_copies.c.request_id.in_(ids))
+            .scalar_subquery()
+        )
+    )
+    if result.rowcount != len(copy_ids):
+        raise CopiesUnavailable('Часть экземпляров уже выдана по другому запросу')
+    
+    book_ids = sorted({r.book_id for r in requests})
+    recount_available_copies(book_ids)
+    return book_ids
+
+
+def return_requests(request_ids, now=None):
+    """Отмечает возврат многих запросов одной транзакцией (без коммита); возвращает id книг"""
+    requests = _load_requests(request_ids, 'выдано', 'книга не была выдана')
+    ids = [r.id for r in requests]
+    
+    _change_statuses(ids, 'выдано', 'возвращено', actual_return_date=now or datetime.now())
+    db.session.execute(
+        db.update(BookCopy)
+        .where(BookCopy.current_request_id.in_(ids))
+        .values(current_request_id=None, is_available=True)
+    )
+    
+    book_ids = sorted({r.book_id for r in requests})
+    recount_available_copies(book_ids)
+    return book_ids
+
+
+def check_request_copies(book_request):
+    """
+    То же для экземпляров, уже записанных в request_copies за запросом:
+    один JOIN request_copies -> book_copies -> кто держит экземпляр.
+    """
+    rows = (
+        _copies_with_holders()
+        .join(request_copies, request_copies.c.copy_id == BookCopy.id)
+        .filter(request_copies.c.request_id == book_request.id)
+        .order_by(BookCopy.id)
+        .all()
+    )
+    copies = []
+    conflicts = []
+    for copy, holder in rows:
+        conflict = _conflict(copy, holder, book_request.id)
+        if conflict:
+            conflicts.append(conflict)
+        else:
+            copies.append(copy)
+    return copies, conflicts
+
+
+def requested_codes(book_request):
+    """Коды экземпляров, записанных за запросом"""
+    return set(db.session.scalars(
+        db.select(BookCopy.copy_code)
+        .join(request_copies, request_copies.c.copy_id == BookCopy.id)
+        .where(request_copies.c.request_id == book_request.id)
+    ))
+
+
+def reserve_copies(copies, book_request):
+    """
+    Атомарно привязывает экземпляры к запросу и пересчитывает счётчик свободных.
+    UPDATE меняет только свободные (или уже привязанные к этому запросу) экземпляры;
+    если изменено меньше строк, чем нужно, — экземпляр успели занять, CopiesUnavailable.
+    """
+    copy_ids = {copy.id for copy in copies}
+    if not copy_ids:
+        return
+    
+    result = db.session.execute(
+        db.update(BookCopy)
+        .where(
+            BookCopy.id.in_(copy_ids),
+            or_(BookCopy.is_available == True, BookCopy.current_request_id == book_request.id)
+        )
+        .values(is_available=False, current_request_id=book_request.id)
+    )
+    if result.rowcount != len(copy_ids):
+        taken = db.session.scalars(
+            db.select(BookCopy.copy_code).where(
+                BookCopy.id.in_(copy_ids),
+                BookCopy.current_request_id != book_request.id
+            )
+        ).all()
+        raise CopiesUnavailable(f"Экземпляры уже выданы по другому запросу: {', '.join(sorted(taken))}")
+    
+    recount_available_copies([book_request.book_id])
+
+
+def change_status(book_request, expected_status, new_status, **values):
+    """
+    Атомарно переводит запрос из expected_status в new_status:
+    UPDATE ... WHERE id = :id AND status = :expected_status.
+    Статистика выдачи (reports.py) обновляется в той же транзакции.
+    """
+    result = db.session.execute(
+        db.update(BookRequest)
+        .where(BookRequest.id == book_request.id, BookRequest.status == expected_status)
+        .values(status=new_status, **values)
+    )
+    if result.rowcount != 1:
+        raise RequestAlreadyProcessed('Запрос уже обработан')
+    record_transition([book_request.id], new_status)
+
+
+def release_copies(book_request):
+    """Освобождает все экземпляры, привязанные к запросу, одним UPDATE"""
+    BookCopy.query.filter(BookCopy.current_request_id == book_request.id).update({
+        'current_request_id': None,
+        'is_available': True
+    })
+    recount_available_copies([book_request.book_id])
+
+
+def next_request_number(now=None):
+    """
+    Выдаёт следующий номер запроса за день (ddmmyy-001, ddmmyy-002, ...).
+    Счётчик увеличивается одним атомарным INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+    в той же транзакции, что и создание запроса: параллельные запросы получают разные
+    номера, а откат транзакции возвращает номер обратно (без дыр в нумерации).
+    """
+    return next_request_numbers(1, now)[0]
+
+
+def next_request_numbers(count, now=None):
+    """Сразу count подряд идущих номеров за день — счётчик увеличивается на count одним запросом"""
+    day = (now or datetime.now()).strftime('%d%m%y')
+    
+    insert = upsert_insert()
+    if insert is not None:
+        stmt = (
+            insert(RequestCounter)
+            .values(day=day, last_number=count)
+            .on_conflict_do_update(
+                index_elements=[RequestCounter.day],
+                set_={'last_number': RequestCounter.last_number + count}
+            )
+            .returning(RequestCounter.last_number)
+        )
+        last = db.session.execute(stmt).scalar_one()
+    else:
+        # Прочие СУБД: UPDATE, а если строки за день ещё нет — INSERT
+        result = db.session.execute(
+            db.update(RequestCounter)
+            .where(RequestCounter.day == day)
+            .values(last_number=RequestCounter.last_number + count)
+        )
+        if result.rowcount == 0:
+            db.session.execute(db.insert(RequestCounter).values(day=day, last_number=count))
+        last = db.session.execute(
+            db.select(RequestCounter.last_number).where(RequestCounter.day == day)
+        ).scalar_one()
+    
+    return [f'{day}-{number:03d}' for number in range(last - count + 1, last + 1)]
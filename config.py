@@ -1,4 +1,5 @@
 import os
+from db_profiles import resolve_profile, engine_options
 
 class Config:
     # Секретный ключ — можно оставить или сгенерировать новый
@@ -12,4 +13,55 @@ class Config:
         basedir = os.path.abspath(os.path.dirname(__file__))
         SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(basedir, "database.db")}'
 
-    SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Профиль развёртывания (db_profiles.py): serverless, gunicorn, sqlite или auto.
+    # Размер пула для gunicorn — DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE
+    DB_PROFILE = resolve_profile(os.getenv('DB_PROFILE', 'auto'), SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(DB_PROFILE, SQLALCHEMY_DATABASE_URI)
+
+    # Сколько результатов максимум отдают поиск студентов и книг
+    SEARCH_STUDENTS_LIMIT = 20
+    SEARCH_BOOKS_LIMIT = 100
+
+    # Размер страницы журнала запросов в админ-панели
+    ADMIN_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', 50))
+
+    # Кэш списков групп и книг (catalog_cache.py): срок жизни записи в секундах
+    # (0 — выключить), размер LRU в памяти процесса. При нескольких воркерах
+    # gunicorn задайте CACHE_REDIS_URL — сбросы кэша будут видны всем воркерам
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 256))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+
+    # Замеры времени и SQL каждого запроса (metrics.py): заголовки Server-Timing,
+    # строки JSON в логе и страница /admin/metrics. По умолчанию выключены
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '').lower() in ('1', 'true', 'yes')
+
+    # Очередь отправки запросов (submission_queue.py) для дня массовой выдачи:
+    # /request-book сразу отвечает номером Q-..., запросы записывает в базу пачками
+    # фоновый обработчик (SUBMISSION_QUEUE_WORKER=0 — только отдельным процессом
+    # python submission_queue.py). Не для serverless
+    SUBMISSION_QUEUE = os.getenv('SUBMISSION_QUEUE', '').lower() in ('1', 'true', 'yes')
+    SUBMISSION_QUEUE_PATH = os.getenv('SUBMISSION_QUEUE_PATH',
+                                      os.path.join(os.path.abspath(os.path.dirname(__file__)), 'submissions.db'))
+    SUBMISSION_QUEUE_WORKER = os.getenv('SUBMISSION_QUEUE_WORKER', '1').lower() in ('1', 'true', 'yes')
+    SUBMISSION_BATCH_SIZE = int(os.getenv('SUBMISSION_BATCH_SIZE', 50))
+    SUBMISSION_POLL_INTERVAL = float(os.getenv('SUBMISSION_POLL_INTERVAL', 0.5))
+
+    # Брать шаблоны из templates_compiled/ (precompiled_templates.py), если они
+    # соответствуют исходникам в templates/
+    PRECOMPILED_TEMPLATES = os.getenv('PRECOMPILED_TEMPLATES', '1').lower() in ('1', 'true', 'yes')
+
+    # Выдача книги всей группе (group_issue.py): студентов в одной транзакции
+    GROUP_ISSUE_CHUNK_SIZE = int(os.getenv('GROUP_ISSUE_CHUNK_SIZE', 50))
+
+    # Просроченные и скоро возвращаемые книги (overdue.py): "скоро" — срок возврата
+    # в ближайшие OVERDUE_DUE_SOON_DAYS дней; размер страницы /admin/overdue
+    OVERDUE_DUE_SOON_DAYS = int(os.getenv('OVERDUE_DUE_SOON_DAYS', 3))
+    OVERDUE_PAGE_SIZE = int(os.getenv('OVERDUE_PAGE_SIZE', 100))
+    # Запас при инкрементальном сканировании: возвраты, закоммиченные позже своего времени
+    OVERDUE_SCAN_OVERLAP_MINUTES = int(os.getenv('OVERDUE_SCAN_OVERLAP_MINUTES', 5))
+
+    # Выгрузка журнала (/admin/export): по сколько строк читать из базы за раз
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
@@ -0,0 +1,91 @@
+"""
+Профили развёртывания: настройки пула соединений и движка SQLAlchemy.
+
+Профиль задаётся переменной окружения DB_PROFILE:
+    serverless — Vercel и другие бессерверные платформы. Экземпляр функции
+                 живёт недолго и может быть заморожен между вызовами, поэтому
+                 свой пул не держим (NullPool): соединение открывается на запрос
+                 и сразу закрывается. Для Postgres подключайтесь через внешний
+                 пулер (PgBouncer, Supabase/Neon pooler в режиме transaction) —
+                 тогда открытие соединения дешёвое. pre-ping проверяет соединение
+                 перед использованием.
+    gunicorn   — долгоживущие воркеры. В каждом воркере QueuePool размером
+                 DB_POOL_SIZE (+ DB_MAX_OVERFLOW сверх него при пиках), соединения
+                 пересоздаются через DB_POOL_RECYCLE секунд (до того, как их
+                 закроет сервер или балансировщик), pre-ping отбрасывает разорванные.
+    sqlite     — локальная база в файле: пул по умолчанию SQLAlchemy.
+    auto       — (по умолчанию) sqlite для SQLite, serverless на Vercel
+                 (есть переменная VERCEL), иначе gunicorn.
+
+Для любой SQLite-базы при каждом новом соединении включаются WAL (читатели не
+ждут писателя) и synchronous=NORMAL (fsync только при checkpoint, а не на
+каждый коммит; в режиме WAL это безопасно при сбое процесса).
+
+Модуль не зависит от Flask: config.py вызывает engine_options() при загрузке.
+"""
+import os
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+PROFILES = ('serverless', 'gunicorn', 'sqlite')
+
+
+def _is_sqlite(url):
+    return make_url(url).get_backend_name() == 'sqlite'
+
+
+def _is_memory(url):
+    return make_url(url).database in (None, '', ':memory:')
+
+
+def resolve_profile(name, url):
+    """Имя профиля для строки подключения; 'auto' выбирается по окружению"""
+    name = (name or 'auto').lower()
+    if name != 'auto' and name not in PROFILES:
+        raise ValueError(f"DB_PROFILE: неизвестный профиль '{name}', допустимы: auto, {', '.join(PROFILES)}")
+    if _is_sqlite(url) and _is_memory(url):
+        # База в памяти живёт, пока открыто одно соединение — только пул по умолчанию
+        return 'sqlite'
+    if name == 'auto':
+        if _is_sqlite(url):
+            return 'sqlite'
+        return 'serverless' if os.getenv('VERCEL') else 'gunicorn'
+    return name
+
+
+def engine_options(profile, url):
+    """SQLALCHEMY_ENGINE_OPTIONS для профиля"""
+    if profile == 'serverless':
+        options = {'poolclass': NullPool, 'pool_pre_ping': True}
+        if not _is_sqlite(url):
+            options['connect_args'] = {'connect_timeout': int(os.getenv('DB_CONNECT_TIMEOUT', 5))}
+        return options
+    if profile == 'gunicorn':
+        return {
+            'poolclass': QueuePool,
+            'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+            'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': True,
+        }
+    return {}
+
+
+def _sqlite_pragmas(memory):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not memory:
+            cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.close()
+    return on_connect
+
+
+def init_db_profile(app, db):
+    """Подключает настройки соединений SQLite (вызывать после db.init_app)"""
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', _sqlite_pragmas(_is_memory(engine.url)))
@@ -0,0 +1,70 @@
+"""
+Условные GET (ETag / If-None-Match) для справочных JSON-запросов формы.
+
+ETag строится из версий в таблице catalog_versions:
+    'groups'       — список групп (меняется при создании/изменении Group);
+    'catalogue'    — книги и число свободных экземпляров (recount_available_copies);
+    'group:<id>'   — студенты группы (создание/изменение/удаление Student).
+Версии увеличиваются в той же транзакции, что и сами изменения, поэтому
+новый ETag виден ровно тогда, когда видны новые данные — в любом воркере.
+Исключение — 'catalogue' при выдаче и возврате: её увеличивает
+catalog_cache.invalidate_book_lists сразу после коммита отдельной короткой
+транзакцией, чтобы выдачи не ждали друг друга на одной строке catalog_versions.
+
+Ответ проверяется по ETag до построения данных: если у клиента та же
+версия, сервер отвечает 304 после одного маленького SELECT по первичному ключу.
+
+Group, Student и Book, изменённые через ORM, увеличивают версии сами (при flush).
+Массовые операции мимо ORM (Query.delete, Core insert) события не вызывают —
+после них нужно вызвать bump_versions() с нужными областями.
+"""
+from flask import request, jsonify, current_app
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from models import db, Group, Student, Book, CatalogVersion, bump_versions
+
+
+def versions_etag(*scopes):
+    """Текущие версии областей одним запросом, например '3-17'"""
+    versions = dict(
+        db.session.query(CatalogVersion.scope, CatalogVersion.version)
+        .filter(CatalogVersion.scope.in_(scopes))
+    )
+    return '-'.join(str(versions.get(scope, 0)) for scope in scopes)
+
+
+def conditional_json(etag, build):
+    """
+    JSON-ответ с ETag. Если клиент прислал тот же ETag в If-None-Match —
+    304 без тела, build() не вызывается.
+    """
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build())
+    response.set_etag(etag)
+    # Браузер может хранить ответ, но перед использованием обязан переспросить сервер
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _student_groups(student):
+    """Группа студента и, если его перевели, прежняя группа"""
+    history = sa_inspect(student).attrs.group_id.history
+    return {group_id for group_id in (student.group_id, *history.deleted) if group_id is not None}
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_changed_versions(session, flush_context):
+    scopes = []
+    changed = list(session.new) + list(session.deleted)
+    changed += [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in changed:
+        if isinstance(obj, Group):
+            scopes.append('groups')
+        elif isinstance(obj, Student):
+            scopes.extend(f'group:{group_id}' for group_id in _student_groups(obj))
+        elif isinstance(obj, Book):
+            scopes.append('catalogue')
+    if scopes:
+        bump_versions(*scopes)
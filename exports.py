@@ -0,0 +1,119 @@
+# exports.py
+"""
+Потоковая выгрузка таблиц из админ-панели в CSV и XLSX.
+
+Строки приходят генератором (например, из запроса с yield_per) и не
+собираются в список:
+  * CSV отдаётся потоковым ответом — каждая строка уходит клиенту сразу
+    после чтения из базы; в начале BOM, чтобы Excel понял UTF-8;
+  * XLSX пишется openpyxl в режиме write_only (строки сбрасываются во
+    временный файл, а не держатся в памяти), архив собирается во временном
+    файле и отдаётся кусками по CHUNK_BYTES, после чего файл удаляется.
+    Формат XLSX — zip с оглавлением в конце, поэтому первый байт уходит,
+    только когда прочитаны все строки.
+
+openpyxl нужен только для XLSX и указан в обоих requirements (в том числе
+для развёртывания); если его всё же нет, xlsx_response возвращает 501,
+CSV работает всегда.
+"""
+import os
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from urllib.parse import quote
+from flask import Response, stream_with_context, jsonify
+
+CHUNK_BYTES = 64 * 1024
+
+FORMATS = ('csv', 'xlsx')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _disposition(filename):
+    # Кириллица в имени файла — через filename* (RFC 5987), ASCII-запасное имя для старых клиентов
+    fallback = filename.encode('ascii', 'replace').decode('ascii').replace('?', '_')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def csv_response(filename, header, rows):
+    """Потоковый CSV: строка за строкой, память не зависит от числа строк"""
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow([_cell(value) for value in row])
+            # Отдаём накопленное примерно по CHUNK_BYTES, а не по строке — меньше мелких записей в сокет
+            if buffer.tell() >= CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    return Response(stream_with_context(generate()), mimetype='text/csv; charset=utf-8',
+                    headers={'Content-Disposition': _disposition(filename)})
+
+
+def xlsx_response(filename, sheet_title, header, rows):
+    """XLSX через временный файл (openpyxl write_only); файл удаляется при закрытии ответа"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        return jsonify({'success': False, 'error': 'Выгрузка в XLSX недоступна: не установлен openpyxl'}), 501
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title[:31])
+    sheet.append(header)
+    for row in rows:
+        # Даты и числа — как есть: в XLSX они остаются датами и числами, а не текстом
+        sheet.append(list(row))
+
+    handle, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(handle)
+    try:
+        workbook.save(path)
+        size = os.path.getsize(path)
+    except BaseException:
+        os.remove(path)
+        raise
+
+    def generate():
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+
+    def cleanup():
+        # close() вызывается и тогда, когда тело не читалось (клиент отключился раньше)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    response = Response(generate(), headers={
+        'Content-Type': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'Content-Disposition': _disposition(filename),
+        'Content-Length': str(size),
+    })
+    response.call_on_close(cleanup)
+    return response
+
+
+def export_response(fmt, name, sheet_title, header, rows):
+    """CSV или XLSX по параметру format; name — имя файла без расширения"""
+    if fmt == 'xlsx':
+        return xlsx_response(f'{name}.xlsx', sheet_title, header, rows)
+    return csv_response(f'{name}.csv', header, rows)
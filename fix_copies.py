@@ -1,6 +1,6 @@
 # fix_copies.py
 from app import app, db
-from models import BookCopy, BookRequest
+from models import BookCopy, BookRequest, recount_available_copies
 
 with app.app_context():
     print("Очищаем некорректные привязки экземпляров...")
@@ -17,5 +17,6 @@ with app.app_context():
             copy.is_available = True
             cleaned += 1
     
+    recount_available_copies()
     db.session.commit()
     print(f"Готово! Очищено {cleaned} экземпляров.")
\ No newline at end of file
@@ -0,0 +1,310 @@
+# group_issue.py
+"""
+Выдача комплекта учебников всей группе.
+
+Библиотекарь выбирает группу и книгу и сканирует экземпляры подряд — коды
+идут потоком (из формы, файла или со сканера), а не по запросу на студента.
+Студенты группы (Group.students) берутся по алфавиту; каждому — следующий
+свободный экземпляр из потока. Пропускаются студенты, у которых эта книга
+уже на руках. Если у студента есть необработанный запрос на эту книгу
+(на один экземпляр), выдача идёт по нему, иначе создаётся новый запрос.
+Экземпляр, уже прикреплённый к такому запросу, выдаётся этому студенту,
+а если отсканирован другой — прежний освобождается.
+
+Запись идёт порциями по GROUP_ISSUE_CHUNK_SIZE студентов, каждая — одной
+транзакцией: проверка кодов одним запросом (check_copies), номера — одним
+увеличением счётчика, выдача — circulation.confirm_requests (условные
+UPDATE с проверкой числа строк). Код, который не найден, списан, занят или
+уже был в потоке, попадает в конфликты, а студент получает следующий код.
+Если экземпляр порции успели выдать (или запрос студента обработать)
+параллельно, порция откатывается и проверяется заново — уже записанные
+порции остаются. Если порцию не удалось записать за CHUNK_ATTEMPTS попыток,
+выдача останавливается: отчёт всё равно возвращается, причина — в
+конфликтах и в 'stopped', невыданные студенты — в without_copy.
+
+В конце — отчёт: сколько выдано, сколько экземпляров в секунду, конфликты
+и студенты, которым не хватило экземпляров.
+
+    python group_issue.py --group ИС-21 --book 12 codes.txt   # коды по строкам или через запятую
+    python group_issue.py --group ИС-21 --book 12 -           # коды со стандартного ввода
+"""
+import sys
+import time
+import argparse
+from collections import deque
+from datetime import datetime
+from models import db, Group, Book, BookCopy, BookRequest
+from circulation import (parse_codes, check_copies, confirm_requests, next_request_numbers,
+                         CirculationError, InvalidRequest)
+from catalog_cache import invalidate_book_lists
+
+# Сколько раз перепроверять порцию, экземпляры которой успели выдать параллельно
+CHUNK_ATTEMPTS = 3
+
+
+class CodeStream:
+    """Поток кодов: строки 'a, b' разбиваются, повторы отбрасываются, возвращённые коды идут первыми"""
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self._ready = deque()
+        self._seen = set()
+        self.repeated = []
+
+    def take(self, count):
+        codes = []
+        while len(codes) < count:
+            if not self._ready:
+                line = next(self._lines, None)
+                if line is None:
+                    break
+                for code in parse_codes(line):
+                    if code in self._seen:
+                        self.repeated.append(code)
+                    else:
+                        self._seen.add(code)
+                        self._ready.append(code)
+                continue
+            codes.append(self._ready.popleft())
+        return codes
+
+    def put_back(self, codes):
+        self._ready.extendleft(reversed(codes))
+
+
+def _split_students(students, book_id):
+    """
+    [(id, ФИО)] → кому выдавать [(id, ФИО)], {student_id: id необработанного запроса} и пропущенные.
+    Дальше — только id и строки: после коммита порции объекты сессии истекают.
+    """
+    requests = (
+        BookRequest.query
+        .filter(BookRequest.book_id == book_id,
+                BookRequest.student_id.in_([student_id for student_id, _ in students]),
+                BookRequest.status.in_(['ожидание', 'выдано']))
+        .all()
+    )
+    issued = {r.student_id for r in requests if r.status == 'выдано'}
+    pending = {}
+    for r in requests:
+        if r.status == 'ожидание':
+            pending.setdefault(r.student_id, []).append(r)
+
+    queue, skipped = [], []
+    for student_id, name in students:
+        own = pending.get(student_id, [])
+        if student_id in issued:
+            skipped.append({'student': name, 'reason': 'книга уже на руках'})
+        elif len(own) > 1 or any(r.quantity != 1 for r in own):
+            skipped.append({'student': name,
+                            'reason': 'есть запрос на несколько экземпляров — обработайте его отдельно'})
+        else:
+            queue.append((student_id, name))
+    return queue, {student_id: own[0].id for student_id, own in pending.items() if len(own) == 1}, skipped
+
+
+def _students_to_issue(group, book_id):
+    """Студенты группы по алфавиту — см. _split_students"""
+    students = sorted(group.students, key=lambda s: (s.full_name, s.id))
+    return _split_students([(s.id, s.full_name) for s in students], book_id)
+
+
+def _recheck_students(book_id, students, pending, skipped):
+    """
+    После отката порции: запросы её студентов могли обработать параллельно.
+    Перечитывает их, обновляет pending и skipped; возвращает, кому ещё выдавать.
+    """
+    queue, fresh_pending, fresh_skipped = _split_students(students, book_id)
+    for student_id, _ in students:
+        pending.pop(student_id, None)
+    pending.update(fresh_pending)
+    skipped.extend(fresh_skipped)
+    return queue
+
+
+def _conflict_reason(conflict):
+    if not conflict.found:
+        return 'не найден у этой книги'
+    return f'выдан студенту {conflict.holder or "Неизвестно"}' if conflict.request_id else 'уже занят'
+
+
+def _fill_chunk(book_id, students, stream, conflicts, pending):
+    """
+    Подбирает каждому студенту порции экземпляр; [((id, ФИО), экземпляр)] в порядке студентов.
+    Экземпляр, уже прикреплённый к необработанному запросу студента порции, достаётся этому
+    студенту, свободные — остальным по порядку.
+    """
+    owners = {pending[student_id]: (student_id, name) for student_id, name in students if student_id in pending}
+    assigned = {}
+    while len(assigned) < len(students):
+        codes = stream.take(len(students) - len(assigned))
+        if not codes:
+            break
+        copies, found_conflicts = check_copies(book_id, codes)
+        own = {}
+        for c in found_conflicts:
+            owner = owners.get(c.request_id)
+            if owner is not None and owner not in assigned and owner not in own.values():
+                own[c.code] = owner
+            else:
+                conflicts.append({'code': c.code, 'reason': _conflict_reason(c)})
+        if own:
+            for copy in BookCopy.query.filter(BookCopy.book_id == book_id, BookCopy.copy_code.in_(own)):
+                assigned[own[copy.copy_code]] = copy
+        free = [student for student in students if student not in assigned]
+        assigned.update(zip(free, copies))
+    return [(student, assigned[student]) for student in students if student in assigned]
+
+
+def _issue_chunk(book_id, assigned, pending, now):
+    """
+    Одна транзакция: запросы порции (новые или необработанные) и их выдача.
+    Экземпляры, прикреплённые к необработанным запросам раньше (/admin/assign-copy-ids),
+    освобождаются, если отсканирован другой.
+    """
+    pending_ids = [pending[student_id] for (student_id, _), _ in assigned if student_id in pending]
+    existing = {r.student_id: r for r in BookRequest.query.filter(BookRequest.id.in_(pending_ids))} if pending_ids else {}
+    if pending_ids:
+        # Пересчёт свободных — в confirm_requests ниже
+        db.session.execute(
+            db.update(BookCopy)
+            .where(BookCopy.current_request_id.in_(pending_ids),
+                   BookCopy.id.notin_([copy.id for _, copy in assigned]))
+            .values(current_request_id=None, is_available=True)
+        )
+    new_count = len(assigned) - len(existing)
+    numbers = iter(next_request_numbers(new_count, now) if new_count else [])
+    chunk_requests = []
+    for (student_id, _), copy in assigned:
+        book_request = existing.get(student_id)
+        if book_request is None:
+            book_request = BookRequest(student_id=student_id, book_id=book_id, quantity=1, status='ожидание',
+                                       request_date=now, request_number=next(numbers))
+            db.session.add(book_request)
+        # Необработанный запрос выдаётся отсканированным экземпляром, а не запрошенным
+        book_request.requested_copies = [copy]
+        chunk_requests.append(book_request)
+    db.session.flush()
+    confirm_requests([r.id for r in chunk_requests], now)
+    db.session.commit()
+
+
+def issue_to_group(group_id, book_id, lines, chunk_size=50):
+    """
+    Выдаёт книгу book_id студентам группы group_id по кодам из lines
+    (итерируемое строк: одна строка — один или несколько кодов через запятую).
+    Коммитит порциями по chunk_size студентов; возвращает отчёт (dict) —
+    и тогда, когда выдача остановилась на середине (report['stopped']).
+    InvalidRequest — если группа/книга не найдены или книга не для этой группы.
+    """
+    started = time.perf_counter()
+    group = db.session.get(Group, group_id) if group_id else None
+    book = db.session.get(Book, book_id) if book_id else None
+    if not group:
+        raise InvalidRequest("Группа не найдена")
+    if not book:
+        raise InvalidRequest("Книга не найдена")
+    if book.language not in [group.language, 'both'] or book.course != group.course:
+        raise InvalidRequest("Эта книга не для этой группы")
+
+    group_name = group.name
+    queue, pending, skipped = _students_to_issue(group, book_id)
+    stream = CodeStream(lines)
+    conflicts, issued, chunks = [], [], 0
+    issued_ids, waiting = set(), []
+    stopped = None
+
+    for start in range(0, len(queue), chunk_size):
+        students = queue[start:start + chunk_size]
+        assigned = []
+        for attempt in range(CHUNK_ATTEMPTS):
+            stopped = None
+            if not students:
+                break
+            assigned = _fill_chunk(book_id, students, stream, conflicts, pending)
+            if not assigned:
+                break
+            # Коды и ФИО — до коммита: после него экземпляры читались бы заново по одному
+            chunk_issued = [{'student': name, 'code': copy.copy_code} for (_, name), copy in assigned]
+            try:
+                _issue_chunk(book_id, assigned, pending, datetime.now())
+            except (CirculationError, InvalidRequest) as e:
+                # Экземпляр выдали или запрос студента обработали параллельно: порция откатывается,
+                # запросы её студентов перечитываются, а коды проверяются заново
+                db.session.rollback()
+                stream.put_back([entry['code'] for entry in chunk_issued])
+                stopped = str(e)
+                students = _recheck_students(book_id, students, pending, skipped)
+                continue
+            issued.extend(chunk_issued)
+            issued_ids.update(student_id for (student_id, _), _ in assigned)
+            chunks += 1
+            break
+        waiting.extend(student for student in students if student[0] not in issued_ids)
+        if stopped or len(assigned) < len(students):
+            # Порцию так и не удалось записать или коды закончились: записанные порции остаются,
+            # остальные студенты — в without_copy
+            waiting.extend(queue[start + chunk_size:])
+            break
+
+    if stopped:
+        conflicts.append({'code': None, 'reason': f'выдача остановлена: {stopped}'})
+    if issued:
+        invalidate_book_lists(book_id)
+
+    seconds = time.perf_counter() - started
+    conflicts.extend({'code': code, 'reason': 'отсканирован повторно'} for code in stream.repeated)
+    return {
+        'group': group_name,
+        'book_id': book_id,
+        'issued': len(issued),
+        'chunks': chunks,
+        'seconds': round(seconds, 3),
+        'copies_per_second': round(len(issued) / seconds, 1) if seconds else None,
+        'assignments': issued,
+        'conflicts': conflicts,
+        'skipped': skipped,
+        'without_copy': [name for _, name in waiting],
+        'stopped': stopped,
+    }
+
+
+def _code_lines(path):
+    if path == '-':
+        yield from sys.stdin
+        return
+    with open(path, encoding='utf-8') as f:
+        yield from f
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Выдача книги всей группе по потоку кодов')
+    parser.add_argument('--group', required=True, help='название группы')
+    parser.add_argument('--book', type=int, required=True, help='id книги')
+    parser.add_argument('--chunk-size', type=int, help='студентов в одной транзакции')
+    parser.add_argument('codes', help="файл с кодами (по строкам или через запятую), '-' — стандартный ввод")
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        group = Group.query.filter_by(name=args.group).first()
+        if group is None:
+            sys.exit(f"Группа {args.group} не найдена")
+        try:
+            report = issue_to_group(group.id, args.book, _code_lines(args.codes),
+                                    args.chunk_size or app.config['GROUP_ISSUE_CHUNK_SIZE'])
+        except InvalidRequest as e:
+            sys.exit(str(e))
+
+    print(f"✅ {report['group']}: выдано {report['issued']} экз. за {report['seconds']} с "
+          f"({report['copies_per_second']} экз./с, транзакций: {report['chunks']})")
+    for conflict in report['conflicts']:
+        print(f"  ⚠️ {conflict['code'] or '—'}: {conflict['reason']}")
+    for skipped in report['skipped']:
+        print(f"  — {skipped['student']}: {skipped['reason']}")
+    if report['without_copy']:
+        print(f"  ❌ не хватило экземпляров ({len(report['without_copy'])}): {', '.join(report['without_copy'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Журнал запросов для админ-панели.
+
+admin.html для каждой строки обращается к req.student, req.student.group,
+req.book и req.assigned_copy_codes. Если загружать запросы обычным
+BookRequest.query, каждое такое обращение — отдельный SQL-запрос (N+1).
+journal_query() подгружает всё заранее фиксированным числом запросов:
+  1. запросы + студенты + группы + книги одним JOIN;
+  2. привязанные экземпляры одним SELECT ... WHERE current_request_id IN (...);
+  3. запрошенные экземпляры одним SELECT через таблицу request_copies.
+
+Журнал показывается страницами (keyset-пагинация по request_date, id),
+а счётчики по статусам считаются одним GROUP BY.
+
+Выгрузка всей истории (export_rows) читает строки потоком через серверный
+курсор (yield_per) плоским SELECT без ORM-объектов; коды экземпляров
+подтягиваются одним SELECT на порцию строк, поэтому память не зависит
+от размера журнала.
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload, selectinload
+from models import db, BookRequest, Student, Group, Book, BookCopy, request_copies
+from search_index import matching_ids
+
+
+def journal_query(query=None):
+    """Добавляет к запросу по BookRequest жадную загрузку всего, что показывает admin.html"""
+    if query is None:
+        query = BookRequest.query
+    return query.options(
+        joinedload(BookRequest.student).joinedload(Student.group),
+        joinedload(BookRequest.book),
+        selectinload(BookRequest.assigned_copies),
+        selectinload(BookRequest.requested_copies),
+    )
+
+
+def _day_range(day):
+    """
+    Условие "запрос сделан в этот день" в виде диапазона
+    request_date >= начало дня AND request_date < начало следующего дня —
+    в отличие от date(request_date) = день, такое условие использует индекс.
+    """
+    start = datetime.combine(day, datetime.min.time())
+    return BookRequest.request_date >= start, BookRequest.request_date < start + timedelta(days=1)
+
+
+def apply_filters(query, status_filter='all', date_filter='all', custom_date='', search_query=''):
+    """Фильтры админ-панели: статус, дата запроса и поиск по ФИО студента"""
+    if status_filter != 'all':
+        query = query.filter(BookRequest.status == status_filter)
+    
+    today_date = datetime.now().date()
+    if date_filter == 'today':
+        query = query.filter(*_day_range(today_date))
+    elif date_filter == 'yesterday':
+        query = query.filter(*_day_range(today_date - timedelta(days=1)))
+    elif date_filter == 'custom' and custom_date:
+        try:
+            custom_date_obj = datetime.strptime(custom_date, '%Y-%m-%d').date()
+            query = query.filter(*_day_range(custom_date_obj))
+        except ValueError:
+            pass
+    
+    if search_query:
+        # Префиксный поиск по словам в ФИО студента через индекс
+        query = query.filter(BookRequest.student_id.in_(matching_ids('student', search_query)))
+    
+    return query
+
+
+def status_counts(query):
+    """Счётчики по статусам для отфильтрованного журнала — один GROUP BY вместо загрузки всех строк"""
+    rows = (
+        query.with_entities(BookRequest.status, db.func.count(BookRequest.id))
+        .group_by(BookRequest.status)
+        .all()
+    )
+    return dict(rows)
+
+
+def encode_cursor(book_request):
+    return f"{book_request.request_date.isoformat()}_{book_request.id}"
+
+
+def decode_cursor(cursor):
+    """Курсор вида '<request_date в ISO>_<id>'; некорректный курсор — первая страница"""
+    try:
+        date_part, id_part = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (AttributeError, ValueError):
+        return None
+
+
+def paginate(query, cursor=None, page_size=50):
+    """
+    Keyset-пагинация по (request_date, id) от новых к старым.
+    Возвращает (запросы страницы, курсор следующей страницы или None).
+    """
+    query = query.order_by(BookRequest.request_date.desc(), BookRequest.id.desc())
+    
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        query = query.filter(
+            tuple_(BookRequest.request_date, BookRequest.id) < tuple_(*position)
+        )
+    
+    # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+    rows = query.limit(page_size + 1).all()
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+EXPORT_HEADERS = [
+    'ID', 'Номер запроса', 'Статус', 'Дата запроса', 'Дата выдачи', 'Плановый возврат', 'Фактический возврат',
+    'ID студента', 'Студент', 'Группа', 'ID книги', 'Книга', 'Автор', 'Количество', 'Коды экземпляров',
+]
+
+
+def _copy_codes(request_ids):
+    """Коды экземпляров, записанных за запросами (request_copies), одним SELECT: {id запроса: 'код, код'}"""
+    codes = {}
+    for request_id, code in db.session.execute(
+            db.select(request_copies.c.request_id, BookCopy.copy_code)
+            .join(BookCopy, BookCopy.id == request_copies.c.copy_id)
+            .where(request_copies.c.request_id.in_(request_ids))
+            .order_by(request_copies.c.request_id, BookCopy.id)):
+        codes.setdefault(request_id, []).append(code)
+    return {request_id: ', '.join(values) for request_id, values in codes.items()}
+
+
+def _with_codes(chunk):
+    codes = _copy_codes([row[0] for row in chunk])
+    for row in chunk:
+        yield (*row, codes.get(row[0], ''))
+
+
+def export_rows(query, chunk_size=1000):
+    """
+    Строки выгрузки журнала (отфильтрованный query по BookRequest) в порядке журнала.
+    Генератор: строки читаются серверным курсором порциями по chunk_size,
+    к каждой порции коды экземпляров добавляются одним запросом.
+    """
+    rows = (
+        query.with_entities(
+            BookRequest.id, BookRequest.request_number, BookRequest.status,
+            BookRequest.request_date, BookRequest.issue_date,
+            BookRequest.planned_return_date, BookRequest.actual_return_date,
+            Student.id, Student.full_name, Group.name,
+            Book.id, Book.name, Book.author, BookRequest.quantity,
+        )
+        .join(Student, Student.id == BookRequest.student_id)
+        .join(Group, Group.id == Student.group_id)
+        .join(Book, Book.id == BookRequest.book_id)
+        .order_by(BookRequest.request_date.desc(), BookRequest.id.desc())
+        .yield_per(chunk_size)
+    )
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield from _with_codes(chunk)
+            chunk = []
+    if chunk:
+        yield from _with_codes(chunk)
@@ -0,0 +1,182 @@
+"""
+Замеры каждого запроса: общее время, число и время SQL-запросов, самый
+медленный SQL и время отрисовки шаблона.
+
+Включается настройкой METRICS_ENABLED (переменная окружения METRICS_ENABLED=1).
+Для каждого запроса:
+  * заголовок Server-Timing (видно во вкладке Network в DevTools браузера):
+        Server-Timing: app;dur=41.2, db;dur=12.7;desc="4 SQL", tpl;dur=18.3
+  * строка JSON в логгере 'library.metrics';
+  * гистограмма времени по маршруту — страница /admin/metrics.
+
+SQL считается через события движка SQLAlchemy (before/after_cursor_execute),
+шаблоны — через сигналы Flask before_render_template / template_rendered.
+Гистограммы хранятся в памяти процесса: у каждого воркера gunicorn свои.
+"""
+import json
+import logging
+import threading
+import time
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from models import db
+
+logger = logging.getLogger('library.metrics')
+
+# Границы корзин гистограммы, мс (последняя корзина — всё, что дольше)
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+_SLOWEST_SQL_LENGTH = 300
+
+
+class RouteStats:
+    """Гистограмма времени и суммарные SQL-счётчики одного маршрута"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.slowest_sql_ms = 0.0
+        self.slowest_sql = None
+
+    def add(self, sample):
+        self.count += 1
+        self.total_ms += sample['ms']
+        self.max_ms = max(self.max_ms, sample['ms'])
+        self.sql_count += sample['sql_count']
+        self.sql_ms += sample['sql_ms']
+        self.template_ms += sample['template_ms']
+        self.buckets[_bucket(sample['ms'])] += 1
+        if sample['slowest_sql'] and sample['slowest_sql_ms'] > self.slowest_sql_ms:
+            self.slowest_sql_ms = sample['slowest_sql_ms']
+            self.slowest_sql = sample['slowest_sql']
+
+    def quantile(self, q):
+        """Оценка квантиля по гистограмме: верхняя граница корзины, в которую он попал"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, size in enumerate(self.buckets):
+            seen += size
+            if seen >= rank:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def as_dict(self):
+        count = self.count or 1
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / count, 2),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'max_ms': round(self.max_ms, 2),
+            'avg_sql_count': round(self.sql_count / count, 2),
+            'avg_sql_ms': round(self.sql_ms / count, 2),
+            'avg_template_ms': round(self.template_ms / count, 2),
+            'slowest_sql_ms': round(self.slowest_sql_ms, 2),
+            'slowest_sql': self.slowest_sql,
+            'buckets': dict(zip([f'≤{b}' for b in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}'], self.buckets)),
+        }
+
+
+def _bucket(ms):
+    for index, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return index
+    return len(BUCKETS_MS)
+
+
+_routes = {}
+_lock = threading.Lock()
+
+
+def _before_request():
+    g.metrics = {'started': time.perf_counter(), 'sql_count': 0, 'sql_ms': 0.0,
+                 'slowest_sql_ms': 0.0, 'slowest_sql': None, 'template_ms': 0.0}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'metrics' in g:
+        context._metrics_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_metrics_started', None)
+    if started is None or not has_request_context() or 'metrics' not in g:
+        return
+    elapsed = (time.perf_counter() - started) * 1000
+    stats = g.metrics
+    stats['sql_count'] += 1
+    stats['sql_ms'] += elapsed
+    if elapsed > stats['slowest_sql_ms']:
+        stats['slowest_sql_ms'] = elapsed
+        stats['slowest_sql'] = ' '.join(statement.split())[:_SLOWEST_SQL_LENGTH]
+
+
+def _before_render(sender, template, context, **extra):
+    if 'metrics' in g:
+        g.metrics['template_started'] = time.perf_counter()
+
+
+def _rendered(sender, template, context, **extra):
+    if 'metrics' in g and 'template_started' in g.metrics:
+        g.metrics['template_ms'] += (time.perf_counter() - g.metrics.pop('template_started')) * 1000
+
+
+def _after_request(response):
+    stats = g.pop('metrics', None)
+    if stats is None:
+        return response
+    ms = (time.perf_counter() - stats['started']) * 1000
+    route = f"{request.method} {request.url_rule.rule if request.url_rule else '<404>'}"
+    sample = {
+        'route': route,
+        'path': request.full_path.rstrip('?'),
+        'status': response.status_code,
+        'ms': round(ms, 2),
+        'sql_count': stats['sql_count'],
+        'sql_ms': round(stats['sql_ms'], 2),
+        'slowest_sql_ms': round(stats['slowest_sql_ms'], 2),
+        'slowest_sql': stats['slowest_sql'],
+        'template_ms': round(stats['template_ms'], 2),
+    }
+
+    timings = [f'app;dur={ms:.1f}', f'db;dur={stats["sql_ms"]:.1f};desc="{stats["sql_count"]} SQL"']
+    if stats['template_ms']:
+        timings.append(f'tpl;dur={stats["template_ms"]:.1f}')
+    response.headers.add('Server-Timing', ', '.join(timings))
+
+    logger.info(json.dumps(sample, ensure_ascii=False))
+    with _lock:
+        _routes.setdefault(route, RouteStats()).add(sample)
+    return response
+
+
+def init_metrics(app):
+    """Подключает замеры, если они включены в конфиге"""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_rendered, app)
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+    if not logger.handlers and not logging.getLogger().handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def snapshot():
+    """Статистика по маршрутам, самые медленные (по среднему времени) — первыми"""
+    with _lock:
+        routes = {route: stats.as_dict() for route, stats in _routes.items()}
+    return dict(sorted(routes.items(), key=lambda item: item[1]['avg_ms'], reverse=True))
@@ -0,0 +1,151 @@
+# migrate_db.py
+"""
+Обновляет существующую базу до текущей схемы без потери данных.
+reset_db.py пересоздаёт базу с нуля, а этот скрипт:
+  1. создаёт недостающие таблицы;
+  2. добавляет недостающие колонки в существующие таблицы;
+  3. создаёт недостающие индексы;
+  4. заполняет новые колонки и таблицы данными и переносит данные из устаревших колонок.
+Скрипт можно запускать повторно.
+"""
+from sqlalchemy import inspect, text
+from app import app, db
+from models import BookCopy, BookRequest, RequestCounter, request_copies, recount_available_copies
+from search_index import rebuild_search_index
+from reports import rebuild as rebuild_reports
+from circulation import parse_codes
+
+
+def add_missing_columns():
+    inspector = inspect(db.engine)
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c['name'] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(db.engine.dialect)}'
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+            if not column.nullable:
+                ddl += ' NOT NULL'
+            with db.engine.begin() as conn:
+                conn.execute(text(ddl))
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+
+def create_missing_indexes():
+    created = []
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        existing = {i['name'] for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(db.engine)
+                created.append(index.name)
+    return created
+
+
+def fill_request_counters():
+    """Заполняет счётчики номеров запросов по уже существующим номерам ddmmyy-NNN"""
+    last_numbers = {}
+    for (request_number,) in db.session.query(BookRequest.request_number).filter(
+            BookRequest.request_number.isnot(None)):
+        day, _, number = request_number.partition('-')
+        if number.isdigit():
+            last_numbers[day] = max(last_numbers.get(day, 0), int(number))
+    
+    for day, last_number in last_numbers.items():
+        counter = db.session.get(RequestCounter, day)
+        if counter is None:
+            db.session.add(RequestCounter(day=day, last_number=last_number))
+        elif counter.last_number < last_number:
+            counter.last_number = last_number
+    db.session.commit()
+
+
+def move_requested_copy_codes():
+    """
+    Переносит старую колонку book_requests.requested_copy_codes (коды через запятую)
+    в таблицу request_copies и удаляет колонку. Коды, которых нет у книги запроса, пропускаются.
+    """
+    columns = {c['name'] for c in inspect(db.engine).get_columns('book_requests')}
+    if 'requested_copy_codes' not in columns:
+        return None
+    
+    rows = db.session.execute(text(
+        "SELECT id, book_id, requested_copy_codes FROM book_requests "
+        "WHERE requested_copy_codes IS NOT NULL AND requested_copy_codes != ''"
+    )).all()
+    
+    all_codes = sorted({code for _, _, codes in rows for code in parse_codes(codes)})
+    copies = {}
+    for start in range(0, len(all_codes), 500):
+        chunk = all_codes[start:start + 500]
+        for copy_id, code, book_id in db.session.query(BookCopy.id, BookCopy.copy_code, BookCopy.book_id) \
+                .filter(BookCopy.copy_code.in_(chunk)):
+            copies[code] = (copy_id, book_id)
+    
+    existing = set(db.session.execute(db.select(request_copies.c.request_id, request_copies.c.copy_id)).all())
+    links = []
+    skipped = 0
+    for request_id, book_id, codes in rows:
+        for code in parse_codes(codes):
+            copy = copies.get(code)
+            if not copy or copy[1] != book_id:
+                print(f"  Запрос #{request_id}: экземпляр {code} не найден у книги, пропущен")
+                skipped += 1
+                continue
+            if (request_id, copy[0]) not in existing:
+                links.append({'request_id': request_id, 'copy_id': copy[0]})
+                existing.add((request_id, copy[0]))
+    
+    for start in range(0, len(links), 1000):
+        db.session.execute(db.insert(request_copies), links[start:start + 1000])
+    db.session.commit()
+    
+    with db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE book_requests DROP COLUMN requested_copy_codes'))
+    return len(links), skipped
+
+
+def migrate():
+    with app.app_context():
+        print("Создаю недостающие таблицы...")
+        db.create_all()
+        
+        columns = add_missing_columns()
+        for name in columns:
+            print(f"  + колонка {name}")
+        
+        indexes = create_missing_indexes()
+        for name in indexes:
+            print(f"  + индекс {name}")
+        
+        moved = move_requested_copy_codes()
+        if moved is not None:
+            print(f"Перенесено в request_copies: {moved[0]} привязок, пропущено кодов: {moved[1]}")
+        
+        print("Пересчитываю счётчики свободных экземпляров...")
+        recount_available_copies()
+        db.session.commit()
+        
+        print("Заполняю счётчики номеров запросов...")
+        fill_request_counters()
+        
+        print("Пересчитываю статистику выдачи...")
+        rebuild_reports()
+        db.session.commit()
+        
+        print("Перестраиваю поисковый индекс...")
+        rebuild_search_index()
+        db.session.commit()
+        
+        print("✅ База данных обновлена!")
+
+
+if __name__ == '__main__':
+    migrate()
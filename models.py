@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+import importlib
 
 db = SQLAlchemy()
 
@@ -28,12 +29,22 @@ class Book(db.Model):
     language = db.Column(db.String(10), nullable=False)
     course = db.Column(db.Integer, nullable=False)
     publisher = db.Column(db.String(100), nullable=True)  # Издательство
+    # Денормализованный счётчик свободных экземпляров (см. recount_available_copies)
+    available_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # False — книги больше нет в Excel-каталоге (catalog_import.sync_catalogue);
+    # свободных экземпляров у неё не остаётся, поэтому в выдачу она не попадает
+    is_active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
     
     copies = db.relationship('BookCopy', backref='book', lazy=True, cascade="all, delete-orphan")
     
+    __table_args__ = (
+        # Списки и поиск книг для группы: WHERE language IN (...) AND course = ...
+        db.Index('ix_books_language_course', 'language', 'course'),
+    )
+    
     @property
     def available_quantity(self):
-        return len([copy for copy in self.copies if copy.is_available])
+        return self.available_count
 
     def __repr__(self):
         return f'<Book {self.name} ({self.language})>'
@@ -48,6 +59,10 @@ class Student(db.Model):
     
     book_requests = db.relationship('BookRequest', backref='student', lazy=True)
     
+    __table_args__ = (
+        db.Index('ix_students_group_id', 'group_id'),
+    )
+    
     def __repr__(self):
         return f'<Student {self.full_name}>'
 
@@ -62,13 +77,114 @@ class BookCopy(db.Model):
     
     is_available = db.Column(db.Boolean, default=True, nullable=False)
     current_request_id = db.Column(db.Integer, db.ForeignKey('book_requests.id'), nullable=True)
+    # False — экземпляр списан при синхронизации каталога (и is_available тоже False)
+    is_active = db.Column(db.Boolean, nullable=False, default=True, server_default=db.true())
     
     current_request = db.relationship('BookRequest', backref='assigned_copies', foreign_keys=[current_request_id])
     
+    __table_args__ = (
+        # Пересчёт available_count и выбор свободных экземпляров книги
+        db.Index('ix_book_copies_book_id_is_available', 'book_id', 'is_available'),
+        # Экземпляры на руках по запросу (assigned_copies, release_copies)
+        db.Index('ix_book_copies_current_request_id', 'current_request_id'),
+    )
+    
     def __repr__(self):
         status = "свободен" if self.is_available else "выдан"
         return f'<BookCopy {self.copy_code} — {status}>'
 
+class SearchToken(db.Model):
+    """Поисковый индекс: слова из ФИО студентов и названий/авторов книг (см. search_index.py)"""
+    __tablename__ = 'search_tokens'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    entity = db.Column(db.String(10), nullable=False)  # 'student' или 'book'
+    entity_id = db.Column(db.Integer, nullable=False)
+    # Побайтовое сравнение нужно для поиска по префиксу через диапазон (token >= q AND token < q + max)
+    token = db.Column(
+        db.String(200).with_variant(db.String(200, collation='C'), 'postgresql'),
+        nullable=False
+    )
+    
+    __table_args__ = (
+        db.Index('ix_search_tokens_entity_token', 'entity', 'token', 'entity_id'),
+        db.Index('ix_search_tokens_entity_id', 'entity', 'entity_id'),
+    )
+    
+    def __repr__(self):
+        return f'<SearchToken {self.entity}#{self.entity_id}: {self.token}>'
+
+class RequestCounter(db.Model):
+    """Счётчик номеров запросов по дням (номер вида ddmmyy-001)"""
+    __tablename__ = 'request_counters'
+    
+    day = db.Column(db.String(6), primary_key=True)  # ddmmyy
+    last_number = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<RequestCounter {self.day}: {self.last_number}>'
+
+class CatalogVersion(db.Model):
+    """Версии справочных данных для ETag (см. etags.py)"""
+    __tablename__ = 'catalog_versions'
+    
+    scope = db.Column(db.String(30), primary_key=True)  # 'groups', 'catalogue', 'group:<id>'
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CatalogVersion {self.scope}: {self.version}>'
+
+class JobWatermark(db.Model):
+    """Докуда обработаны данные фоновой задачей (overdue.scan)"""
+    __tablename__ = 'job_watermarks'
+    
+    name = db.Column(db.String(30), primary_key=True)
+    value = db.Column(db.DateTime, nullable=False)
+    
+    def __repr__(self):
+        return f'<JobWatermark {self.name}: {self.value}>'
+
+class LoanDigest(db.Model):
+    """Сводка просроченных и скоро возвращаемых книг по студенту или группе (см. overdue.py)"""
+    __tablename__ = 'loan_digests'
+    
+    scope = db.Column(db.String(10), primary_key=True)  # 'student' или 'group'
+    scope_id = db.Column(db.Integer, primary_key=True)
+    overdue_count = db.Column(db.Integer, nullable=False, default=0)
+    due_soon_count = db.Column(db.Integer, nullable=False, default=0)
+    oldest_due = db.Column(db.DateTime, nullable=False)  # самый ранний срок возврата среди них
+    updated_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        # Страницы сводки: сначала самые давние сроки
+        db.Index('ix_loan_digests_scope_oldest_due', 'scope', 'oldest_due', 'scope_id'),
+    )
+    
+    def __repr__(self):
+        return f'<LoanDigest {self.scope}#{self.scope_id}: {self.overdue_count}/{self.due_soon_count}>'
+
+class CirculationStat(db.Model):
+    """Сколько выдано и возвращено по группе и книге (см. reports.py); остальные отчёты — суммы по ней"""
+    __tablename__ = 'circulation_stats'
+    
+    group_id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, primary_key=True)
+    issued_requests = db.Column(db.Integer, nullable=False, default=0)
+    issued_copies = db.Column(db.Integer, nullable=False, default=0)
+    returned_requests = db.Column(db.Integer, nullable=False, default=0)
+    returned_copies = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CirculationStat {self.group_id}/{self.book_id}: {self.issued_copies}/{self.returned_copies}>'
+
+# Какие экземпляры запрошены по запросу (раньше — строка через запятую в requested_copy_codes)
+request_copies = db.Table(
+    'request_copies',
+    db.Column('request_id', db.Integer, db.ForeignKey('book_requests.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('copy_id', db.Integer, db.ForeignKey('book_copies.id'), primary_key=True),
+    db.Index('ix_request_copies_copy_id', 'copy_id'),
+)
+
 class BookRequest(db.Model):
     """Журнал запросов"""
     __tablename__ = 'book_requests'
@@ -86,20 +202,101 @@ class BookRequest(db.Model):
     
     quantity = db.Column(db.Integer, nullable=False, default=1)
     status = db.Column(db.String(20), nullable=False, default='ожидание')
-    
-    # Новое поле: коды, запрошенные студентом (строка через запятую)
-    requested_copy_codes = db.Column(db.String(500), nullable=True)
+    # Номер в очереди отправки (submission_queue.py), если запрос пришёл через очередь
+    ticket = db.Column(db.String(20), nullable=True)
     
     book = db.relationship('Book', backref='requests')
+    # Экземпляры, запрошенные студентом (или переназначенные библиотекарем)
+    requested_copies = db.relationship('BookCopy', secondary=request_copies, order_by='BookCopy.id', lazy=True)
+    
+    __table_args__ = (
+        # Keyset-пагинация журнала (journal.paginate), в том числе с фильтром по статусу
+        db.Index('ix_book_requests_request_date_id', 'request_date', 'id'),
+        db.Index('ix_book_requests_status_request_date_id', 'status', 'request_date', 'id'),
+        # Поиск в журнале по ФИО студента (student_id IN (...)) и запросы студента
+        db.Index('ix_book_requests_student_id', 'student_id'),
+        db.Index('ix_book_requests_ticket', 'ticket', unique=True),
+        # Просроченные и скоро возвращаемые (overdue.py): status = 'выдано' AND planned_return_date < ...
+        db.Index('ix_book_requests_status_planned_return_date_id', 'status', 'planned_return_date', 'id'),
+        # Возвраты после отметки последнего сканирования (overdue.scan)
+        db.Index('ix_book_requests_status_actual_return_date', 'status', 'actual_return_date'),
+    )
     
     @property
     def assigned_copy_codes(self):
         # Для ожидания — показываем запрошенные студентом
-        if self.status == 'ожидание' and self.requested_copy_codes:
-            return self.requested_copy_codes.replace(',', ', ')
+        # (requested_copies и assigned_copies подгружаются заранее в journal.journal_query)
+        if self.status == 'ожидание' and self.requested_copies:
+            return ', '.join([copy.copy_code for copy in self.requested_copies])
         # Для выданных/возвращённых — реальные привязанные
-        copies = BookCopy.query.filter_by(current_request_id=self.id).all()
+        copies = sorted(self.assigned_copies, key=lambda copy: copy.id)
         return ', '.join([copy.copy_code for copy in copies]) if copies else "-"
     
     def __repr__(self):
-        return f'<BookRequest {self.id}: {self.status}>'
\ No newline at end of file
+        return f'<BookRequest {self.id}: {self.status}>'
+
+def recount_available_copies(book_ids=None):
+    """
+    Пересчитывает books.available_count по таблице book_copies одним UPDATE.
+    Вызывается в той же транзакции, где меняется BookCopy.is_available.
+    Без аргументов пересчитывает все книги (сверка счётчиков, импорт) и сразу
+    увеличивает версию 'catalogue'. С book_ids (выдача, возврат) версию не
+    трогает: её после коммита увеличивает catalog_cache.invalidate_book_lists
+    отдельной короткой транзакцией — иначе строка catalog_versions была бы
+    заблокирована до конца каждой выдачи, и параллельные выдачи шли бы по одной.
+    """
+    if book_ids is not None:
+        book_ids = set(book_ids)
+        if not book_ids:
+            return
+    
+    available = db.select(db.func.count(BookCopy.id)).where(
+        BookCopy.book_id == Book.id,
+        BookCopy.is_available == True
+    ).scalar_subquery()
+    
+    stmt = db.update(Book).values(available_count=available)
+    if book_ids is not None:
+        stmt = stmt.where(Book.id.in_(book_ids))
+    
+    db.session.flush()
+    db.session.execute(stmt, execution_options={'synchronize_session': False})
+    if book_ids is None:
+        bump_versions('catalogue')
+
+def upsert_insert():
+    """
+    insert() с on_conflict_do_update для СУБД текущей сессии (Postgres, SQLite)
+    или None. Модуль диалекта берётся тот, что уже загрузил движок, — диалект
+    Postgres не импортируется при работе на SQLite (быстрее холодный старт).
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect not in ('postgresql', 'sqlite'):
+        return None
+    return importlib.import_module(f'sqlalchemy.dialects.{dialect}').insert
+
+def bump_versions(*scopes):
+    """
+    Увеличивает версии справочных данных в текущей транзакции — ETag ответов
+    /get-books, /search-books и т.п. меняется только после коммита.
+    """
+    insert = upsert_insert()
+    for scope in dict.fromkeys(scopes):
+        if insert is not None:
+            db.session.execute(
+                insert(CatalogVersion)
+                .values(scope=scope, version=1)
+                .on_conflict_do_update(
+                    index_elements=[CatalogVersion.scope],
+                    set_={'version': CatalogVersion.version + 1}
+                )
+            )
+            continue
+        # Прочие СУБД: UPDATE, а если строки ещё нет — INSERT
+        updated = db.session.execute(
+            db.update(CatalogVersion)
+            .where(CatalogVersion.scope == scope)
+            .values(version=CatalogVersion.version + 1)
+        ).rowcount
+        if not updated:
+            db.session.execute(db.insert(CatalogVersion).values(scope=scope, version=1))
@@ -0,0 +1,266 @@
+# overdue.py
+"""
+Просроченные и скоро возвращаемые книги.
+
+Живой список — запрос по индексу (status, planned_return_date, id):
+    просрочено:          status = 'выдано' AND planned_return_date < сейчас
+    скоро срок возврата: status = 'выдано' AND сейчас <= planned_return_date < сейчас + OVERDUE_DUE_SOON_DAYS
+Страницы — keyset по (planned_return_date, id), как журнал (journal.paginate),
+поэтому время не растёт с числом запросов в истории.
+
+Сводка для напоминаний — таблица loan_digests: по строке на студента и на
+группу, у которых есть просроченные или скоро возвращаемые книги. Её
+обновляет scan() (по расписанию: python overdue.py из cron). Отметка
+последнего сканирования хранится в job_watermarks; пересчитываются только
+студенты, у которых что-то изменилось с тех пор:
+  * срок возврата попал в окно [отметка, сейчас + окно) — книга стала
+    просроченной, скоро возвращаемой или выдана после отметки;
+  * книга возвращена после отметки.
+Оба условия — диапазоны по индексам, а не проход по всей истории.
+Время возврата обработчик ставит до своего коммита, поэтому возврат с
+временем чуть раньше отметки мог стать виден уже после сканирования.
+Отметка для условий берётся с запасом overlap (OVERDUE_SCAN_OVERLAP_MINUTES):
+такие студенты пересчитываются повторно, что ничего не портит.
+Группы пересчитываются из строк своих студентов.
+
+    python overdue.py          # пересчитать изменившееся с прошлого сканирования
+    python overdue.py --full   # пересчитать сводку целиком
+"""
+import time
+import argparse
+from datetime import datetime, timedelta
+from sqlalchemy import tuple_, case
+from sqlalchemy.orm import joinedload
+from models import db, BookRequest, Student, Group, JobWatermark, LoanDigest
+
+WATERMARK = 'overdue'
+
+# По сколько id в одном IN (...) при пересчёте
+_CHUNK = 500
+
+
+def loans_query(kind, now, due_soon_days):
+    """Выданные книги: kind='overdue' — просроченные, 'due_soon' — срок в ближайшие due_soon_days дней"""
+    query = BookRequest.query.filter(BookRequest.status == 'выдано')
+    if kind == 'overdue':
+        return query.filter(BookRequest.planned_return_date < now)
+    return query.filter(BookRequest.planned_return_date >= now,
+                        BookRequest.planned_return_date < now + timedelta(days=due_soon_days))
+
+
+def _encode(moment, row_id):
+    return f"{moment.isoformat()}_{row_id}"
+
+
+def _decode(cursor):
+    """Курсор вида '<дата в ISO>_<id>'; некорректный курсор — первая страница"""
+    try:
+        date_part, id_part = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (AttributeError, ValueError):
+        return None
+
+
+def loans_page(kind, cursor=None, page_size=50, now=None, due_soon_days=3):
+    """Страница живого списка: сначала самые давние сроки. (строки, курсор следующей страницы)"""
+    now = now or datetime.now()
+    query = (
+        loans_query(kind, now, due_soon_days)
+        .options(joinedload(BookRequest.student).joinedload(Student.group), joinedload(BookRequest.book))
+        .order_by(BookRequest.planned_return_date, BookRequest.id)
+    )
+    position = _decode(cursor) if cursor else None
+    if position:
+        query = query.filter(tuple_(BookRequest.planned_return_date, BookRequest.id) > tuple_(*position))
+
+    rows = query.limit(page_size + 1).all()
+    next_cursor = _encode(rows[page_size - 1].planned_return_date, rows[page_size - 1].id) \
+        if len(rows) > page_size else None
+    return [{
+        'request_id': r.id,
+        'request_number': r.request_number,
+        'student': r.student.full_name if r.student else None,
+        'group': r.student.group.name if r.student and r.student.group else None,
+        'book': r.book.name if r.book else None,
+        'quantity': r.quantity,
+        'issue_date': r.issue_date.isoformat() if r.issue_date else None,
+        'planned_return_date': r.planned_return_date.isoformat(),
+        'days_overdue': max((now - r.planned_return_date).days, 0),
+    } for r in rows[:page_size]], next_cursor
+
+
+def digest_page(scope, cursor=None, page_size=50):
+    """Страница сводки (scope='student' или 'group'): сначала самые давние сроки"""
+    query = LoanDigest.query.filter(LoanDigest.scope == scope).order_by(LoanDigest.oldest_due, LoanDigest.scope_id)
+    position = _decode(cursor) if cursor else None
+    if position:
+        query = query.filter(tuple_(LoanDigest.oldest_due, LoanDigest.scope_id) > tuple_(*position))
+
+    rows = query.limit(page_size + 1).all()
+    next_cursor = _encode(rows[page_size - 1].oldest_due, rows[page_size - 1].scope_id) \
+        if len(rows) > page_size else None
+    rows = rows[:page_size]
+
+    # Имена — одним запросом на страницу
+    ids = [row.scope_id for row in rows]
+    if scope == 'student':
+        names = {s.id: (s.full_name, s.group.name if s.group else None) for s in
+                 Student.query.options(joinedload(Student.group)).filter(Student.id.in_(ids))} if ids else {}
+    else:
+        names = {g.id: (g.name, None) for g in Group.query.filter(Group.id.in_(ids))} if ids else {}
+    return [{
+        'id': row.scope_id,
+        'name': names.get(row.scope_id, (None, None))[0],
+        **({'group': names.get(row.scope_id, (None, None))[1]} if scope == 'student' else {}),
+        'overdue': row.overdue_count,
+        'due_soon': row.due_soon_count,
+        'oldest_due': row.oldest_due.isoformat(),
+        'updated_at': row.updated_at.isoformat(),
+    } for row in rows], next_cursor
+
+
+def _changed_students(since, horizon):
+    """Студенты, у которых с отметки since что-то изменилось (since=None — все с книгами в окне)"""
+    window = db.select(BookRequest.student_id).where(
+        BookRequest.status == 'выдано', BookRequest.planned_return_date < horizon)
+    if since is None:
+        return set(db.session.scalars(window.distinct()))
+    changed = set(db.session.scalars(window.where(BookRequest.planned_return_date >= since).distinct()))
+    changed.update(db.session.scalars(
+        db.select(BookRequest.student_id)
+        .where(BookRequest.status == 'возвращено', BookRequest.actual_return_date >= since)
+        .distinct()
+    ))
+    return changed
+
+
+def _chunks(ids):
+    ids = sorted(ids)
+    for start in range(0, len(ids), _CHUNK):
+        yield ids[start:start + _CHUNK]
+
+
+def _rebuild_students(student_ids, now, horizon):
+    """Строки студентов: удалить старые, вставить пересчитанные (одним GROUP BY на порцию)"""
+    created = 0
+    for chunk in _chunks(student_ids):
+        db.session.execute(db.delete(LoanDigest).where(LoanDigest.scope == 'student',
+                                                        LoanDigest.scope_id.in_(chunk)))
+        rows = db.session.execute(
+            db.select(
+                BookRequest.student_id,
+                db.func.sum(case((BookRequest.planned_return_date < now, 1), else_=0)),
+                db.func.sum(case((BookRequest.planned_return_date >= now, 1), else_=0)),
+                db.func.min(BookRequest.planned_return_date),
+            )
+            .where(BookRequest.student_id.in_(chunk), BookRequest.status == 'выдано',
+                   BookRequest.planned_return_date < horizon)
+            .group_by(BookRequest.student_id)
+        ).all()
+        if rows:
+            db.session.execute(db.insert(LoanDigest), [
+                {'scope': 'student', 'scope_id': student_id, 'overdue_count': overdue,
+                 'due_soon_count': due_soon, 'oldest_due': oldest, 'updated_at': now}
+                for student_id, overdue, due_soon, oldest in rows
+            ])
+            created += len(rows)
+    return created
+
+
+def _rebuild_groups(group_ids, now):
+    """Строки групп — сумма строк их студентов"""
+    created = 0
+    for chunk in _chunks(group_ids):
+        db.session.execute(db.delete(LoanDigest).where(LoanDigest.scope == 'group',
+                                                        LoanDigest.scope_id.in_(chunk)))
+        rows = db.session.execute(
+            db.select(
+                Student.group_id,
+                db.func.sum(LoanDigest.overdue_count),
+                db.func.sum(LoanDigest.due_soon_count),
+                db.func.min(LoanDigest.oldest_due),
+            )
+            .join(Student, Student.id == LoanDigest.scope_id)
+            .where(LoanDigest.scope == 'student', Student.group_id.in_(chunk))
+            .group_by(Student.group_id)
+        ).all()
+        if rows:
+            db.session.execute(db.insert(LoanDigest), [
+                {'scope': 'group', 'scope_id': group_id, 'overdue_count': overdue,
+                 'due_soon_count': due_soon, 'oldest_due': oldest, 'updated_at': now}
+                for group_id, overdue, due_soon, oldest in rows
+            ])
+            created += len(rows)
+    return created
+
+
+def scan(now=None, due_soon_days=3, full=False, overlap=timedelta(minutes=5)):
+    """
+    Обновляет сводку loan_digests и отметку сканирования одной транзакцией (с коммитом).
+    overlap — на сколько раньше отметки искать изменения (см. описание модуля).
+    Если параллельно прошло другое сканирование (отметка уже сдвинута), ничего не меняет
+    и возвращает {'skipped': True}.
+    """
+    started = time.perf_counter()
+    now = now or datetime.now()
+    horizon = now + timedelta(days=due_soon_days)
+    watermark = db.session.get(JobWatermark, WATERMARK)
+    since = None if full or watermark is None else watermark.value
+
+    # Сначала сдвигаем отметку — условным UPDATE: параллельный запуск ждёт блокировку строки,
+    # а потом не находит старого значения и ничего не пересчитывает
+    if watermark is None:
+        db.session.add(JobWatermark(name=WATERMARK, value=now))
+        db.session.flush()
+    else:
+        result = db.session.execute(
+            db.update(JobWatermark)
+            .where(JobWatermark.name == WATERMARK, JobWatermark.value == watermark.value)
+            .values(value=now)
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            return {'skipped': True}
+
+    if since is None:
+        db.session.execute(db.delete(LoanDigest))
+    students = _changed_students(since - overlap if since else None, horizon)
+    # Группы этих студентов: у них строка могла появиться, измениться или исчезнуть
+    groups = set()
+    for chunk in _chunks(students):
+        groups.update(db.session.scalars(db.select(Student.group_id).where(Student.id.in_(chunk)).distinct()))
+
+    student_rows = _rebuild_students(students, now, horizon)
+    group_rows = _rebuild_groups(groups, now)
+    db.session.commit()
+
+    return {
+        'skipped': False,
+        'full': since is None,
+        'since': since.isoformat() if since else None,
+        'until': now.isoformat(),
+        'students_rescanned': len(students),
+        'student_rows': student_rows,
+        'group_rows': group_rows,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Пересчёт сводки просроченных и скоро возвращаемых книг')
+    parser.add_argument('--full', action='store_true', help='пересчитать сводку целиком')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        report = scan(due_soon_days=app.config['OVERDUE_DUE_SOON_DAYS'], full=args.full,
+                      overlap=timedelta(minutes=app.config['OVERDUE_SCAN_OVERLAP_MINUTES']))
+    if report['skipped']:
+        print("⚠️ Параллельно прошло другое сканирование — ничего не изменено")
+        return
+    print(f"✅ Сводка обновлена за {report['seconds']} с: пересчитано студентов {report['students_rescanned']}, "
+          f"строк студентов {report['student_rows']}, групп {report['group_rows']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# precompiled_templates.py
+"""
+Заранее скомпилированные шаблоны Jinja.
+
+При первом render_template() Jinja разбирает шаблон и генерирует из него
+Python-код — на холодном старте это десятки миллисекунд на первую страницу.
+Скрипт компилирует все шаблоны в модули каталога templates_compiled/,
+а create_app() подключает их через ModuleLoader: шаблон только импортируется.
+
+    python precompiled_templates.py      # после каждого изменения в templates/
+
+В manifest.json записаны хэши исходников и версия Jinja. Если хоть один
+шаблон изменился после компиляции (или обновилась Jinja), приложение
+предупреждает в логе и работает с обычными шаблонами из templates/ —
+устаревшая страница не отдаётся никогда.
+"""
+import os
+import sys
+import json
+import shutil
+import hashlib
+import logging
+import jinja2
+from jinja2 import ChoiceLoader, ModuleLoader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+COMPILED_DIR = os.path.join(BASE_DIR, 'templates_compiled')
+MANIFEST = 'manifest.json'
+
+logger = logging.getLogger('library.templates')
+
+
+def _fingerprint(app):
+    """Хэш исходника каждого шаблона приложения и версия Jinja"""
+    loader = app.jinja_env.loader
+    sources = {}
+    for name in loader.list_templates():
+        source, _, _ = loader.get_source(app.jinja_env, name)
+        sources[name] = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    return {'jinja2': jinja2.__version__, 'templates': sources}
+
+
+def compile_templates(app, target=COMPILED_DIR):
+    """Компилирует все шаблоны с настройками окружения приложения (autoescape и т.п.)"""
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.makedirs(target)
+    app.jinja_env.compile_templates(target, zip=None, ignore_errors=False)
+    fingerprint = _fingerprint(app)
+    with open(os.path.join(target, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(fingerprint, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return len(fingerprint['templates'])
+
+
+def use_precompiled_templates(app, source=COMPILED_DIR):
+    """Подключает скомпилированные шаблоны, если они соответствуют исходникам"""
+    try:
+        with open(os.path.join(source, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return False
+    if manifest != _fingerprint(app):
+        logger.warning('Шаблоны в %s устарели — используются исходные. '
+                       'Обновите их: python precompiled_templates.py', source)
+        return False
+    app.jinja_env.loader = ChoiceLoader([ModuleLoader(source), app.jinja_env.loader])
+    return True
+
+
+def main():
+    sys.path.append(BASE_DIR)
+    from app import create_app
+    from config import Config
+
+    class CompileConfig(Config):
+        PRECOMPILED_TEMPLATES = False
+
+    app = create_app(CompileConfig)
+    count = compile_templates(app)
+    print(f"✅ Скомпилировано шаблонов: {count} -> {os.path.relpath(COMPILED_DIR, BASE_DIR)}/")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+# recount_copies.py
+from app import app, db
+from models import Book, BookCopy, recount_available_copies
+
+with app.app_context():
+    print("Сверяем счётчики свободных экземпляров с таблицей book_copies...")
+    
+    # Фактическое число свободных экземпляров по каждой книге — одним GROUP BY
+    actual = dict(
+        db.session.query(BookCopy.book_id, db.func.count(BookCopy.id))
+        .filter(BookCopy.is_available == True)
+        .group_by(BookCopy.book_id)
+        .all()
+    )
+    
+    mismatched = 0
+    for book_id, name, stored in db.session.query(Book.id, Book.name, Book.available_count):
+        real = actual.get(book_id, 0)
+        if stored != real:
+            print(f"  Книга #{book_id} '{name}': было {stored}, на самом деле {real}")
+            mismatched += 1
+    
+    recount_available_copies()
+    db.session.commit()
+    print(f"Готово! Исправлено {mismatched} счётчиков.")
@@ -0,0 +1,148 @@
+# reports.py
+"""
+Статистика выдачи для отчётов (конец четверти, конец года).
+
+Таблица circulation_stats хранит по строке на пару (группа, книга): сколько
+запросов и экземпляров выдано и сколько возвращено. На руках = выдано −
+возвращено. Отчёты по группе, курсу, языку обучения (язык группы) и книге —
+GROUP BY по этой небольшой таблице, без чтения журнала запросов.
+
+Таблица обновляется в той же транзакции, что и статус запроса:
+circulation.change_status / _change_statuses вызывают record_transition —
+один INSERT ... SELECT ... GROUP BY ... ON CONFLICT DO UPDATE на все
+запросы пачки. rebuild() пересчитывает таблицу по журналу одним проходом
+SQL (после migrate_db.py или для сверки).
+
+    python reports.py            # пересчитать таблицу по журналу
+"""
+from sqlalchemy import case
+from models import db, BookRequest, Student, Group, Book, CirculationStat, upsert_insert
+
+# Колонки, которые увеличивает переход в статус
+_TRANSITIONS = {
+    'выдано': ('issued_requests', 'issued_copies'),
+    'возвращено': ('returned_requests', 'returned_copies'),
+}
+
+# Разрезы отчёта: колонки группировки и заголовки
+DIMENSIONS = {
+    'group': ([Group.name, Group.language, Group.course], ['Группа', 'Язык', 'Курс']),
+    'course': ([Group.course], ['Курс']),
+    'language': ([Group.language], ['Язык']),
+    'book': ([Book.id, Book.name, Book.author, Book.language, Book.course],
+             ['ID книги', 'Книга', 'Автор', 'Язык', 'Курс']),
+}
+
+COUNT_HEADERS = ['Выдано запросов', 'Выдано экз.', 'Возвращено запросов', 'Возвращено экз.', 'На руках экз.']
+
+
+def record_transition(request_ids, new_status):
+    """Добавляет запросы request_ids (уже в статусе new_status) в статистику — без коммита"""
+    columns = _TRANSITIONS.get(new_status)
+    if not columns or not request_ids:
+        return
+    requests_column, copies_column = columns
+
+    increments = (
+        db.select(
+            Student.group_id,
+            BookRequest.book_id,
+            db.func.count(BookRequest.id).label(requests_column),
+            db.func.sum(BookRequest.quantity).label(copies_column),
+        )
+        .join(Student, Student.id == BookRequest.student_id)
+        .where(BookRequest.id.in_(request_ids))
+        .group_by(Student.group_id, BookRequest.book_id)
+    )
+
+    insert = upsert_insert()
+    if insert is not None:
+        stmt = insert(CirculationStat).from_select(
+            ['group_id', 'book_id', requests_column, copies_column], increments)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[CirculationStat.group_id, CirculationStat.book_id],
+            set_={
+                requests_column: getattr(CirculationStat, requests_column) + getattr(stmt.excluded, requests_column),
+                copies_column: getattr(CirculationStat, copies_column) + getattr(stmt.excluded, copies_column),
+            }
+        ))
+        return
+
+    # Прочие СУБД: UPDATE, а если строки для пары ещё нет — INSERT
+    for group_id, book_id, requests, copies in db.session.execute(increments).all():
+        result = db.session.execute(
+            db.update(CirculationStat)
+            .where(CirculationStat.group_id == group_id, CirculationStat.book_id == book_id)
+            .values({requests_column: getattr(CirculationStat, requests_column) + requests,
+                     copies_column: getattr(CirculationStat, copies_column) + copies})
+        )
+        if result.rowcount == 0:
+            db.session.execute(db.insert(CirculationStat).values(
+                group_id=group_id, book_id=book_id, **{requests_column: requests, copies_column: copies}))
+
+
+def rebuild():
+    """Пересчитывает circulation_stats по журналу одним INSERT ... SELECT (без коммита)"""
+    issued = BookRequest.status.in_(['выдано', 'возвращено'])
+    returned = BookRequest.status == 'возвращено'
+    db.session.execute(db.delete(CirculationStat))
+    result = db.session.execute(
+        db.insert(CirculationStat).from_select(
+            ['group_id', 'book_id', 'issued_requests', 'issued_copies', 'returned_requests', 'returned_copies'],
+            db.select(
+                Student.group_id,
+                BookRequest.book_id,
+                db.func.count(BookRequest.id),
+                db.func.sum(BookRequest.quantity),
+                db.func.sum(case((returned, 1), else_=0)),
+                db.func.sum(case((returned, BookRequest.quantity), else_=0)),
+            )
+            .join(Student, Student.id == BookRequest.student_id)
+            .where(issued)
+            .group_by(Student.group_id, BookRequest.book_id)
+        )
+    )
+    return result.rowcount
+
+
+def summary_query(by):
+    """Отчёт в разрезе by (ключ DIMENSIONS): колонки разреза и пять счётчиков"""
+    dimension_columns, _ = DIMENSIONS[by]
+    issued_copies = db.func.sum(CirculationStat.issued_copies)
+    returned_copies = db.func.sum(CirculationStat.returned_copies)
+    return (
+        db.select(
+            *dimension_columns,
+            db.func.sum(CirculationStat.issued_requests),
+            issued_copies,
+            db.func.sum(CirculationStat.returned_requests),
+            returned_copies,
+            issued_copies - returned_copies,
+        )
+        .select_from(CirculationStat)
+        .join(Group, Group.id == CirculationStat.group_id)
+        .join(Book, Book.id == CirculationStat.book_id)
+        .group_by(*dimension_columns)
+        .order_by(*dimension_columns)
+    )
+
+
+def summary_headers(by):
+    return DIMENSIONS[by][1] + COUNT_HEADERS
+
+
+def summary_rows(by):
+    """Строки отчёта потоком (для выгрузки)"""
+    return db.session.execute(summary_query(by).execution_options(yield_per=1000))
+
+
+def main():
+    from app import app
+    with app.app_context():
+        rows = rebuild()
+        db.session.commit()
+    print(f"✅ Статистика выдачи пересчитана: {rows} пар группа/книга")
+
+
+if __name__ == '__main__':
+    main()
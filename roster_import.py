@@ -0,0 +1,281 @@
+# roster_import.py
+"""
+Импорт списка студентов из Excel или CSV (каждый сентябрь).
+
+Файл читается построчно: первая непустая строка — шапка, колонки ищутся по
+названию (ФИО и Группа обязательны, Язык и Курс — для новых групп и для
+смены курса у существующих). Строки обрабатываются пачками по chunk_size:
+  * группы, которых нет в базе, создаются одним INSERT; у существующих
+    обновляются язык и курс, если в файле они другие;
+  * студенты сверяются с базой по паре (ФИО, группа) одним SELECT на пачку,
+    недостающие добавляются одним INSERT. Существующие не трогаются,
+    повтор строки в файле пропускается.
+Всё пишется через Core мимо ORM, поэтому индекс поиска перестраивается один
+раз в конце, а версии для ETag ('groups', 'group:<id>') увеличиваются явно.
+
+Запуск:
+    python roster_import.py файл.xlsx|файл.csv [--chunk-size 1000] [--dry-run]
+"""
+import argparse
+import csv
+import os
+import time
+from collections import namedtuple
+
+from sqlalchemy import insert, select, update
+
+from models import db, Group, Student, bump_versions
+from search_index import rebuild_search_index
+
+CHUNK_SIZE = 1000
+
+# Названия колонок в шапке (без учёта регистра и пробелов по краям)
+COLUMNS = {
+    'full_name': ('фио', 'ф.и.о.', 'студент', 'full_name', 'name'),
+    'group': ('группа', 'group'),
+    'language': ('язык', 'язык обучения', 'language'),
+    'course': ('курс', 'course'),
+}
+
+# Начало значения в колонке "Язык" → язык группы
+LANGUAGES = {'kz': 'kz', 'kaz': 'kz', 'каз': 'kz', 'қаз': 'kz', 'ru': 'ru', 'rus': 'ru', 'рус': 'ru'}
+
+RosterRow = namedtuple('RosterRow', ['line', 'full_name', 'group', 'language', 'course'])
+
+RosterStats = namedtuple('RosterStats', [
+    'rows', 'students_added', 'students_existing', 'duplicates', 'skipped',
+    'groups_added', 'groups_updated', 'seconds'
+])
+
+
+def _text(value):
+    if value is None:
+        return ""
+    # Лишние пробелы внутри ФИО и названия группы не должны давать нового студента
+    return ' '.join(str(value).split())
+
+def _language(value):
+    text = _text(value).lower()
+    for prefix in (text[:3], text[:2]):
+        if prefix in LANGUAGES:
+            return LANGUAGES[prefix]
+    return None
+
+def _course(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(float(str(value).strip()))
+    except ValueError:
+        return None
+
+def _iter_xlsx(path):
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _iter_csv(path):
+    # utf-8-sig — CSV из Excel начинается с BOM; разделитель — запятая, точка с запятой или табуляция
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(f, dialect)
+
+def _header_positions(header):
+    names = [_text(value).lower() for value in header]
+    positions = {}
+    for field, aliases in COLUMNS.items():
+        for index, name in enumerate(names):
+            if name in aliases:
+                positions[field] = index
+                break
+    missing = [COLUMNS[field][0] for field in ('full_name', 'group') if field not in positions]
+    if missing:
+        raise ValueError(f"В шапке нет колонок: {', '.join(missing)}")
+    return positions
+
+def iter_roster_rows(path):
+    """
+    Построчно отдаёт RosterRow (номер строки в файле, ФИО, группа, язык, курс).
+    Пустые строки пропускаются; язык и курс — None, если колонки нет или значение не распознано.
+    """
+    rows = _iter_csv(path) if path.lower().endswith('.csv') else _iter_xlsx(path)
+    positions = None
+    for line, row in enumerate(rows, start=1):
+        if not any(_text(value) for value in row):
+            continue
+        if positions is None:
+            positions = _header_positions(row)
+            continue
+
+        def cell(field):
+            index = positions.get(field)
+            return row[index] if index is not None and index < len(row) else None
+
+        yield RosterRow(line, _text(cell('full_name')), _text(cell('group')),
+                        _language(cell('language')), _course(cell('course')))
+    if positions is None:
+        raise ValueError("Файл пуст")
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class _Groups:
+    """Группы по названию: создаёт недостающие и обновляет язык/курс пачкой строк"""
+
+    def __init__(self):
+        self.by_name = {name: [group_id, language, course] for group_id, name, language, course in
+                        db.session.execute(select(Group.id, Group.name, Group.language, Group.course))}
+        self.added = []
+        self.updated = set()
+        self.rejected = set()
+
+    def resolve(self, chunk, log):
+        """id группы для каждой строки пачки (None — строка пропускается)"""
+        new_groups = {}
+        updates = {}
+        for row in chunk:
+            known = self.by_name.get(row.group)
+            if known is None:
+                language, course = new_groups.get(row.group, (None, None))
+                new_groups[row.group] = (language or row.language, course or row.course)
+                continue
+            language = row.language or known[1]
+            course = row.course or known[2]
+            if (language, course) != (known[1], known[2]):
+                known[1], known[2] = language, course
+                updates[known[0]] = {'id': known[0], 'language': language, 'course': course}
+
+        creatable = {name: values for name, values in new_groups.items() if all(values)}
+        for name in new_groups.keys() - creatable.keys() - self.rejected:
+            log(f"  Группы «{name}» нет в базе, а язык или курс не указан — её строки пропущены")
+            self.rejected.add(name)
+        if creatable:
+            rows = [{'name': name, 'language': language, 'course': course}
+                    for name, (language, course) in creatable.items()]
+            group_ids = db.session.scalars(
+                insert(Group).returning(Group.id, sort_by_parameter_order=True), rows
+            ).all()
+            for group_id, row in zip(group_ids, rows):
+                self.by_name[row['name']] = [group_id, row['language'], row['course']]
+                self.added.append(group_id)
+        if updates:
+            db.session.execute(update(Group), list(updates.values()))
+            self.updated.update(updates)
+
+        return [self.by_name[row.group][0] if row.group in self.by_name else None for row in chunk]
+
+def _existing_students(pairs):
+    """Какие пары (id группы, ФИО) уже есть в базе — один SELECT на пачку"""
+    group_ids = {group_id for group_id, _ in pairs}
+    names = {full_name for _, full_name in pairs}
+    found = db.session.execute(
+        select(Student.group_id, Student.full_name)
+        .where(Student.group_id.in_(group_ids), Student.full_name.in_(names))
+    )
+    return {tuple(row) for row in found} & pairs
+
+def import_roster(path, chunk_size=CHUNK_SIZE, log=print):
+    """
+    Загружает студентов из файла: недостающие группы и студенты добавляются,
+    существующие студенты остаются как есть. Индекс поиска перестраивается
+    один раз в конце. Коммит и сброс кэша (invalidate_all) — на вызывающем коде.
+    """
+    started = time.perf_counter()
+    log(f"Читаю файл: {path}")
+    groups = _Groups()
+    seen = set()
+    changed_groups = set()
+    counts = dict.fromkeys(['rows', 'students_added', 'students_existing', 'duplicates', 'skipped'], 0)
+
+    for chunk in _chunks(iter_roster_rows(path), chunk_size):
+        counts['rows'] += len(chunk)
+        valid = []
+        for row in chunk:
+            if not row.full_name or not row.group:
+                log(f"  Строка {row.line}: не указаны ФИО или группа — пропущена")
+                counts['skipped'] += 1
+                continue
+            valid.append(row)
+
+        pairs = set()
+        for row, group_id in zip(valid, groups.resolve(valid, log)):
+            if group_id is None:
+                counts['skipped'] += 1
+                continue
+            pair = (group_id, row.full_name)
+            if pair in seen:
+                counts['duplicates'] += 1
+                continue
+            seen.add(pair)
+            pairs.add(pair)
+
+        existing = _existing_students(pairs) if pairs else set()
+        new_students = [{'group_id': group_id, 'full_name': full_name}
+                        for group_id, full_name in sorted(pairs - existing)]
+        if new_students:
+            db.session.execute(insert(Student), new_students)
+            changed_groups.update(student['group_id'] for student in new_students)
+        counts['students_added'] += len(new_students)
+        counts['students_existing'] += len(existing)
+        log(f"  Обработано {counts['rows']} строк...")
+
+    # Core insert/update мимо ORM — версии для ETag и индекс поиска обновляем сами
+    scopes = [f'group:{group_id}' for group_id in sorted(changed_groups)]
+    if groups.added or groups.updated:
+        scopes.insert(0, 'groups')
+    if scopes:
+        bump_versions(*scopes)
+    if counts['students_added']:
+        rebuild_search_index(['student'])
+
+    stats = RosterStats(**counts, groups_added=len(groups.added), groups_updated=len(groups.updated),
+                        seconds=time.perf_counter() - started)
+    log(f"Строк: {stats.rows}, пропущено: {stats.skipped}, повторов в файле: {stats.duplicates}")
+    log(f"Группы: +{stats.groups_added} новых, {stats.groups_updated} изменено")
+    log(f"Студенты: +{stats.students_added} новых, {stats.students_existing} уже были "
+        f"({stats.rows / max(stats.seconds, 1e-9):.0f} строк/с)")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт списка студентов из Excel или CSV")
+    parser.add_argument('path', help="файл .xlsx или .csv: колонки ФИО, Группа, Язык, Курс")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--dry-run', action='store_true', help="показать изменения и ничего не сохранять")
+    args = parser.parse_args()
+    if not os.path.exists(args.path):
+        parser.error(f"файл не найден: {args.path}")
+
+    from app import app
+    from catalog_cache import invalidate_all
+
+    with app.app_context():
+        try:
+            stats = import_roster(args.path, args.chunk_size)
+        except ValueError as e:
+            db.session.rollback()
+            parser.exit(1, f"❌ {e}\n")
+        if args.dry_run:
+            db.session.rollback()
+            print("Пробный запуск: изменения не сохранены")
+            return
+        db.session.commit()
+        invalidate_all()
+        print(f"✅ Добавлено студентов: {stats.students_added}, групп: {stats.groups_added}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Поисковый индекс для префиксного поиска по студентам и книгам.
+
+Каждое слово из ФИО студента и из названия/автора книги хранится в таблице
+search_tokens в нижнем регистре. Поиск "начинается ли какое-то слово с запроса"
+превращается в диапазонный запрос по индексу:
+    token >= 'ал' AND token < 'ал' + MAX_CHAR
+Это работает одинаково для казахских, русских и латинских букв, потому что
+нормализация (lower + разбиение по знакам препинания) делается в Python.
+
+Индекс обновляется автоматически при каждом flush сессии, в которой
+создаются, меняются или удаляются Student и Book. Массовые операции мимо ORM
+(Query.delete, Core insert) события не вызывают — после них нужно вызвать
+rebuild_search_index().
+"""
+import string
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+from models import db, Student, Book, SearchToken
+
+# Те же разделители, что и в старой contains_full_word
+_SEPARATORS = string.punctuation + '.,;:!?()[]{}' + '«»"\'„‚'
+_TRANSLATION = str.maketrans({char: ' ' for char in _SEPARATORS})
+
+# Верхняя граница для поиска по префиксу (максимальный символ Unicode)
+_MAX_CHAR = '\U0010ffff'
+
+_TOKEN_LENGTH = 200
+_CHUNK_SIZE = 1000
+
+# Какие поля каких моделей индексируются
+INDEXED_MODELS = {
+    Student: ('student', ('full_name',)),
+    Book: ('book', ('name', 'author')),
+}
+
+
+def tokenize(text):
+    """Разбивает текст на слова в нижнем регистре, знаки препинания считаются пробелами"""
+    if not text:
+        return []
+    return str(text).lower().translate(_TRANSLATION).split()
+
+
+def contains_full_word(text, search_word):
+    """
+    Проверяет, начинается ли какое-то слово в тексте с введенного запроса (префиксный поиск).
+    Поиск без учета регистра. Можно вводить начало слова, но нельзя пропускать буквы в начале.
+    
+    Примеры:
+    - contains_full_word("Алгебра и геометрия", "ал") -> True
+    - contains_full_word("Алгебра и геометрия", "лгебра") -> False (пропущена первая буква)
+    - contains_full_word("әскери және технологиялық", "ә") -> True
+    """
+    if not text or not search_word:
+        return False
+    prefix = str(search_word).lower()
+    return any(word.startswith(prefix) for word in tokenize(text))
+
+
+def _normalize_query(query):
+    """
+    Приводит запрос к префиксу для поиска по индексу.
+    Возвращает None, если запрос не может совпасть ни с одним словом
+    (пустой, содержит пробелы или знаки препинания) — так же вела себя contains_full_word.
+    """
+    prefix = str(query or '').lower()
+    if not prefix or tokenize(prefix) != [prefix]:
+        return None
+    return prefix
+
+
+def matching_ids(entity, query):
+    """
+    Подзапрос с id студентов/книг, у которых есть слово, начинающееся с query.
+    Используется в фильтрах вида Student.id.in_(matching_ids('student', q)).
+    """
+    stmt = db.select(SearchToken.entity_id).where(SearchToken.entity == entity)
+    prefix = _normalize_query(query)
+    if prefix is None:
+        return stmt.where(db.false())
+    return stmt.where(
+        SearchToken.token >= prefix,
+        SearchToken.token < prefix + _MAX_CHAR
+    )
+
+
+def _token_rows(entity, entity_id, texts):
+    tokens = set()
+    for text in texts:
+        tokens.update(word[:_TOKEN_LENGTH] for word in tokenize(text))
+    return [{'entity': entity, 'entity_id': entity_id, 'token': token} for token in sorted(tokens)]
+
+
+def _needs_reindex(obj, fields):
+    state = sa_inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _update_search_index(session, flush_context):
+    """Обновляет слова в индексе для записанных в этом flush студентов и книг"""
+    stale = []  # (entity, entity_id) — старые слова нужно удалить
+    rows = []
+    
+    for obj in session.new:
+        spec = INDEXED_MODELS.get(type(obj))
+        if spec:
+            entity, fields = spec
+            rows.extend(_token_rows(entity, obj.id, [getattr(obj, f) for f in fields]))
+    
+    for obj in session.dirty:
+        spec = INDEXED_MODELS.get(type(obj))
+        if spec and _needs_reindex(obj, spec[1]):
+            entity, fields = spec
+            stale.append((entity, obj.id))
+            rows.extend(_token_rows(entity, obj.id, [getattr(obj, f) for f in fields]))
+    
+    for obj in session.deleted:
+        spec = INDEXED_MODELS.get(type(obj))
+        if spec:
+            stale.append((spec[0], obj.id))
+    
+    if not stale and not rows:
+        return
+    
+    connection = session.connection()
+    for entity in {entity for entity, _ in stale}:
+        ids = [entity_id for e, entity_id in stale if e == entity]
+        connection.execute(
+            db.delete(SearchToken).where(
+                SearchToken.entity == entity,
+                SearchToken.entity_id.in_(ids)
+            )
+        )
+    if rows:
+        connection.execute(db.insert(SearchToken), rows)
+
+
+def rebuild_search_index(entities=None):
+    """
+    Полностью перестраивает индекс (или только для указанных сущностей: 'student', 'book').
+    Работает пачками через Core, не загружая объекты ORM.
+    """
+    connection = db.session.connection()
+    for model, (entity, fields) in INDEXED_MODELS.items():
+        if entities is not None and entity not in entities:
+            continue
+        
+        connection.execute(db.delete(SearchToken).where(SearchToken.entity == entity))
+        
+        columns = [model.id] + [getattr(model, f) for f in fields]
+        result = db.session.execute(db.select(*columns).execution_options(yield_per=_CHUNK_SIZE))
+        rows = []
+        for entity_id, *texts in result:
+            rows.extend(_token_rows(entity, entity_id, texts))
+            if len(rows) >= _CHUNK_SIZE:
+                connection.execute(db.insert(SearchToken), rows)
+                rows = []
+        if rows:
+            connection.execute(db.insert(SearchToken), rows)
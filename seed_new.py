@@ -1,6 +1,7 @@
 # seed.py
 from app import app, db
-from models import Group, Student, Book, BookCopy, BookRequest
+from models import Group, Student, Book, BookCopy, BookRequest, recount_available_copies
+from circulation import next_request_number
 from datetime import datetime, timedelta
 import random
 
@@ -79,6 +80,7 @@ def create_books_with_copies():
             author=author,
             year=year,
             total_quantity=50,
+            available_count=50,
             language=language,
             course=course
         )
@@ -117,7 +119,6 @@ def create_books_with_copies():
 
 def create_book_requests(students, books):
     """Создаем тестовые запросы на книги"""
-    today = datetime.now().strftime("%d%m%y")
     requests = []
     
     request_examples = [
@@ -151,7 +152,7 @@ def create_book_requests(students, books):
                 continue
             
             # Создаем запрос
-            request_number = f"{today}-{i+1:03d}"
+            request_number = next_request_number()
             request_date = datetime.now() - timedelta(days=random.randint(0, 10))
             
             if status == "выдано":
@@ -192,6 +193,7 @@ def create_book_requests(students, books):
                     copy.current_request_id = request.id
                     assigned_codes.append(copy.copy_code)
                     available_copies.remove(copy)
+                request.requested_copies = copies_to_assign
                 
                 available_copies_by_book[book.id] = available_copies
                 
@@ -199,6 +201,7 @@ def create_book_requests(students, books):
             
             requests.append(request)
     
+    recount_available_copies()
     db.session.commit()
     print(f"✅ Создано {len(requests)} запросов")
     return requests
@@ -0,0 +1,147 @@
+# startup_time.py
+"""
+Замер холодного старта: сколько проходит от запуска процесса Python до
+первого ответа приложения (так начинается каждый вызов на Vercel после простоя).
+
+Каждый прогон — новый процесс: импорт app, затем первые запросы тестовым
+клиентом (главная страница и /get-groups — с первым подключением к базе).
+Отдельно выводится время импорта по модулям (python -X importtime):
+    своё  — время выполнения самого модуля;
+    всего — вместе со всем, что он импортировал впервые.
+
+    python startup_time.py                   # 5 прогонов, копия database.db
+    python startup_time.py --runs 10 --top 30
+    python startup_time.py --no-precompiled  # сравнить с компиляцией шаблонов при первом запросе
+
+База по умолчанию — временная копия database.db (SQLALCHEMY_DATABASE_URI из окружения,
+если задана, используется как есть).
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+parser = argparse.ArgumentParser(description='Замер холодного старта приложения')
+parser.add_argument('--runs', type=int, default=5, help='прогонов (новых процессов)')
+parser.add_argument('--top', type=int, default=20, help='сколько самых медленных модулей показать')
+parser.add_argument('--no-precompiled', action='store_true',
+                    help='дополнительно замерить без скомпилированных шаблонов')
+args = parser.parse_args()
+
+# Выполняется в новом процессе
+PROBE = r'''
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+first_page = client.get('/')
+page_done = time.perf_counter()
+groups = client.get('/get-groups')
+groups_done = time.perf_counter()
+assert first_page.status_code == 200 and groups.status_code == 200
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_page_ms': (page_done - imported) * 1000,
+    'first_db_ms': (groups_done - page_done) * 1000,
+    'total_ms': (groups_done - started) * 1000,
+}))
+'''
+
+
+def database_env():
+    env = dict(os.environ)
+    if not env.get('SQLALCHEMY_DATABASE_URI'):
+        copy = os.path.join(tempfile.mkdtemp(), 'database.db')
+        shutil.copy(os.path.join(BASE_DIR, 'database.db'), copy)
+        env['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{copy}'
+    return env
+
+
+def interpreter_ms(env):
+    """Запуск и завершение пустого интерпретатора — нижняя граница холодного старта"""
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def measure(env):
+    samples = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', PROBE], cwd=BASE_DIR, env=env,
+                                capture_output=True, text=True)
+        process_ms = (time.perf_counter() - started) * 1000
+        if result.returncode != 0:
+            print(result.stderr)
+            sys.exit(1)
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        sample['process_ms'] = process_ms
+        samples.append(sample)
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def import_times(env):
+    """{модуль: (своё мкс, всего мкс)} по выводу python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, total, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own), int(total))
+    return modules
+
+
+def print_run(title, result):
+    print(f"\n=== {title} (медиана из {args.runs}) ===")
+    print(f"импорт app:                {result['import_ms']:8.1f} мс")
+    print(f"первая страница (/):       {result['first_page_ms']:8.1f} мс")
+    print(f"первый запрос к базе:      {result['first_db_ms']:8.1f} мс")
+    print(f"до первого ответа с базой: {result['total_ms']:8.1f} мс")
+    print(f"процесс целиком:           {result['process_ms']:8.1f} мс (с запуском интерпретатора)")
+
+
+def main():
+    env = database_env()
+    env['PRECOMPILED_TEMPLATES'] = '1'
+
+    modules = import_times(env)
+    own_dir = {os.path.splitext(name)[0] for name in os.listdir(BASE_DIR) if name.endswith('.py')}
+    packages = {}
+    for name, (own, _) in modules.items():
+        top = name.split('.')[0]
+        packages[top] = packages.get(top, 0) + own
+
+    print(f"=== ИМПОРТ ПО ПАКЕТАМ (своё время всех модулей пакета), всего {sum(packages.values()) / 1000:.1f} мс ===")
+    for top, own in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        mark = '*' if top in own_dir else ' '
+        print(f"{mark} {top:40} {own / 1000:8.1f} мс")
+
+    print("\n=== МОДУЛИ ПРОЕКТА (* выше) ===")
+    print(f"  {'модуль':38} {'своё':>8} {'всего':>9}")
+    for name, (own, total) in sorted(modules.items(), key=lambda item: -item[1][1]):
+        if name in own_dir:
+            print(f"  {name:38} {own / 1000:6.1f} мс {total / 1000:6.1f} мс")
+
+    python_ms = interpreter_ms(env)
+    print(f"\nПустой процесс Python: {python_ms:.1f} мс")
+    print_run('ХОЛОДНЫЙ СТАРТ', measure(env))
+    if args.no_precompiled:
+        env['PRECOMPILED_TEMPLATES'] = '0'
+        print_run('ХОЛОДНЫЙ СТАРТ БЕЗ СКОМПИЛИРОВАННЫХ ШАБЛОНОВ', measure(env))
+
+
+if __name__ == '__main__':
+    main()
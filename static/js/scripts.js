@@ -12,6 +12,24 @@ document.addEventListener('DOMContentLoaded', function() {
     let studentScanningInterval = null;
     let studentScannedCodes = new Set();
 
+    // Справочные ответы (группы, студенты группы, поиск книг) приходят с ETag:
+    // при повторном запросе отправляем If-None-Match, на 304 берём сохранённые данные
+    const etagCache = new Map();
+
+    function fetchJson(url) {
+        const cached = etagCache.get(url);
+        const headers = cached ? { 'If-None-Match': cached.etag } : {};
+        return fetch(url, { headers, cache: 'no-store' }).then(r => {
+            if (r.status === 304 && cached) return cached.data;
+            if (!r.ok) throw new Error(`HTTP ${r.status}`);
+            return r.json().then(data => {
+                const etag = r.headers.get('ETag');
+                if (etag) etagCache.set(url, { etag, data });
+                return data;
+            });
+        });
+    }
+
     // Загрузка групп
     loadGroups();
 
@@ -64,8 +82,7 @@ document.addEventListener('DOMContentLoaded', function() {
     }
 
     function loadAllStudents(groupId) {
-        fetch(`/get-students/${groupId}`)
-            .then(r => r.json())
+        fetchJson(`/get-students/${groupId}`)
             .then(students => updateStudentSuggestions(students, 'Студенты группы:'))
             .catch(() => showMessage('Ошибка загрузки студентов'));
     }
@@ -116,8 +133,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Загрузка групп
     function loadGroups() {
-        fetch('/get-groups')
-            .then(r => r.json())
+        fetchJson('/get-groups')
             .then(groups => {
                 groupSelect.innerHTML = '<option value="">-- Выберите группу --</option>';
                 groups.forEach(g => {
@@ -398,8 +414,7 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
 
-            fetch(`/search-books?q=${encodeURIComponent(query)}&group_id=${groupId}`)
-                .then(r => r.json())
+            fetchJson(`/search-books?q=${encodeURIComponent(query)}&group_id=${groupId}`)
                 .then(books => renderBookSuggestions(books))
                 .catch(err => {
                     console.error(err);
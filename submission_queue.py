@@ -0,0 +1,281 @@
+# submission_queue.py
+"""
+Очередь отправки запросов студентов — для дня массовой выдачи.
+
+Обычно /request-book проверяет запрос, выдаёт номер и делает коммит прямо
+в обработчике. Когда запрос отправляет весь класс сразу, на SQLite эти
+коммиты выстраиваются в очередь за блокировкой записи.
+
+С SUBMISSION_QUEUE=1 обработчик только проверяет форму (без базы), дописывает
+отправку в локальный журнал — отдельный SQLite-файл SUBMISSION_QUEUE_PATH
+(synchronous=FULL: принятая отправка переживает сбой питания) — и сразу
+отвечает номером вида Q-1A2B3C4D. Фоновый поток в каждом воркере забирает
+отправки пачками до SUBMISSION_BATCH_SIZE, проверяет их (circulation.create_request)
+и записывает в основную базу одной транзакцией. Не прошедшие проверку
+отправки помечаются как отклонённые с причиной; /check-status по номеру
+Q-... показывает "в обработке", причину отказа или уже записанный запрос.
+
+Отправка берётся в работу атомарно (BEGIN IMMEDIATE), поэтому воркеры gunicorn
+на одной машине не обработают её дважды. Если обработчик упал, отправка через
+STALE_AFTER секунд снова становится доступна; номер Q-... записывается в
+book_requests.ticket (уникальный индекс), так что повторная обработка уже
+записанной отправки только отмечает её выполненной.
+
+Не для serverless: там нет фоновых потоков и общего локального диска.
+Обработчик можно запустить и отдельным процессом (SUBMISSION_QUEUE_WORKER=0
+в веб-процессах):
+    python submission_queue.py            # обрабатывать очередь, пока не остановят
+    python submission_queue.py --once     # разобрать то, что есть, и выйти
+    python submission_queue.py --stats    # сколько отправок в каждом состоянии
+"""
+import os
+import json
+import time
+import logging
+import secrets
+import sqlite3
+import argparse
+import threading
+from flask import current_app
+from sqlalchemy.orm import joinedload
+from models import db, Student, Book, BookRequest
+from circulation import create_request, InvalidRequest
+
+logger = logging.getLogger('library.queue')
+
+QUEUED, PROCESSING, DONE, FAILED = 'queued', 'processing', 'done', 'failed'
+
+# Через сколько секунд отправка "в работе" считается брошенной упавшим обработчиком
+STALE_AFTER = 60
+# После стольких неудачных попыток записи (ошибки базы, не проверки) отправка отклоняется
+MAX_ATTEMPTS = 5
+
+_SCHEMA = [
+    '''CREATE TABLE IF NOT EXISTS submissions (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticket TEXT NOT NULL UNIQUE,
+        payload TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        claimed_at REAL,
+        finished_at REAL,
+        request_id INTEGER,
+        request_number TEXT,
+        error TEXT
+    )''',
+    'CREATE INDEX IF NOT EXISTS ix_submissions_status_seq ON submissions (status, seq)',
+]
+
+
+class Outbox:
+    """Журнал отправок в отдельном SQLite-файле (своё соединение на поток)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Автокоммит: транзакции открываем явно (BEGIN IMMEDIATE)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            self._local.conn = conn
+        return conn
+
+    def append(self, payload):
+        """Дописывает отправку и возвращает её номер"""
+        data = json.dumps(payload, ensure_ascii=False)
+        while True:
+            ticket = 'Q-' + secrets.token_hex(4).upper()
+            try:
+                self._conn().execute(
+                    'INSERT INTO submissions (ticket, payload, created_at) VALUES (?, ?, ?)',
+                    (ticket, data, time.time())
+                )
+                return ticket
+            except sqlite3.IntegrityError:
+                continue
+
+    def claim(self, limit):
+        """Берёт в работу до limit старейших отправок (и брошенные упавшим обработчиком)"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT ticket, payload, attempts FROM submissions '
+                'WHERE status = ? OR (status = ? AND claimed_at < ?) ORDER BY seq LIMIT ?',
+                (QUEUED, PROCESSING, now - STALE_AFTER, limit)
+            ).fetchall()
+            conn.executemany(
+                'UPDATE submissions SET status = ?, claimed_at = ?, attempts = attempts + 1 WHERE ticket = ?',
+                [(PROCESSING, now, row['ticket']) for row in rows]
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return [{'ticket': row['ticket'], 'payload': json.loads(row['payload']), 'attempts': row['attempts'] + 1}
+                for row in rows]
+
+    def finish(self, results):
+        """Отмечает результаты: [{'ticket', 'status', 'request_id'?, 'request_number'?, 'error'?}]"""
+        now = time.time()
+        self._conn().executemany(
+            'UPDATE submissions SET status = ?, finished_at = ?, request_id = ?, request_number = ?, error = ? '
+            'WHERE ticket = ?',
+            [(r['status'], now, r.get('request_id'), r.get('request_number'), r.get('error'), r['ticket'])
+             for r in results]
+        )
+
+    def release(self, tickets):
+        """Возвращает отправки в очередь (запись в основную базу не удалась)"""
+        self._conn().executemany('UPDATE submissions SET status = ?, claimed_at = NULL WHERE ticket = ?',
+                                 [(QUEUED, ticket) for ticket in tickets])
+
+    def get(self, ticket):
+        row = self._conn().execute(
+            'SELECT ticket, status, created_at, request_id, request_number, error FROM submissions WHERE ticket = ?',
+            (ticket,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def stats(self):
+        counts = dict(self._conn().execute('SELECT status, COUNT(*) FROM submissions GROUP BY status').fetchall())
+        return {status: counts.get(status, 0) for status in (QUEUED, PROCESSING, DONE, FAILED)}
+
+
+def _outbox():
+    return current_app.extensions.get('submission_queue')
+
+
+def queue_enabled():
+    return _outbox() is not None
+
+
+def enqueue(student_id, book_id, quantity, copy_codes):
+    """Принимает отправку в очередь и будит фоновый обработчик этого процесса"""
+    ticket = _outbox().append({'student_id': student_id, 'book_id': book_id,
+                               'quantity': quantity, 'copy_codes': copy_codes})
+    wakeup = current_app.extensions.get('submission_queue_wakeup')
+    if wakeup is not None:
+        wakeup.set()
+    return ticket
+
+
+def find_submission(ticket):
+    """Состояние отправки по номеру Q-... или None (очередь выключена / номера нет)"""
+    outbox = _outbox()
+    return outbox.get(ticket) if outbox is not None else None
+
+
+def process_batch(outbox, batch_size):
+    """
+    Обрабатывает до batch_size отправок: проверка каждой и одна транзакция
+    основной базы на всю пачку. Возвращает число взятых отправок.
+    """
+    items = outbox.claim(batch_size)
+    if not items:
+        return 0
+    tickets = [item['ticket'] for item in items]
+
+    try:
+        # Уже записанные (обработчик упал между коммитом и отметкой в журнале)
+        recorded = {r.ticket: r for r in BookRequest.query.filter(BookRequest.ticket.in_(tickets))}
+        # Студенты (с группами) и книги пачки — двумя запросами; дальше create_request
+        # берёт их из identity map сессии
+        student_ids = {item['payload']['student_id'] for item in items}
+        book_ids = {item['payload']['book_id'] for item in items}
+        Student.query.filter(Student.id.in_(student_ids)).options(joinedload(Student.group)).all()
+        Book.query.filter(Book.id.in_(book_ids)).all()
+
+        results, created = [], []
+        for item in items:
+            if item['ticket'] in recorded:
+                created.append((item['ticket'], recorded[item['ticket']]))
+                continue
+            payload = item['payload']
+            try:
+                created.append((item['ticket'], create_request(
+                    payload['student_id'], payload['book_id'], payload['quantity'], payload['copy_codes'],
+                    ticket=item['ticket'])))
+            except InvalidRequest as e:
+                results.append({'ticket': item['ticket'], 'status': FAILED, 'error': str(e)})
+        # id и номера — до коммита: после него объекты истекают и читались бы заново
+        db.session.flush()
+        results += [{'ticket': ticket, 'status': DONE, 'request_id': r.id, 'request_number': r.request_number}
+                    for ticket, r in created]
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        exhausted = [item['ticket'] for item in items if item['attempts'] >= MAX_ATTEMPTS]
+        outbox.release([ticket for ticket in tickets if ticket not in exhausted])
+        outbox.finish([{'ticket': ticket, 'status': FAILED, 'error': 'Не удалось записать запрос, отправьте его ещё раз'}
+                       for ticket in exhausted])
+        raise
+    finally:
+        db.session.remove()
+
+    outbox.finish(results)
+    logger.info('Очередь отправки: записано %d, отклонено %d', len(created), len(items) - len(created))
+    return len(items)
+
+
+def run_worker(app, stop=None, once=False):
+    """Цикл обработчика: пачка за пачкой, а при пустой очереди — ждать новых отправок"""
+    outbox = app.extensions['submission_queue']
+    wakeup = app.extensions['submission_queue_wakeup']
+    batch_size = app.config['SUBMISSION_BATCH_SIZE']
+    interval = app.config['SUBMISSION_POLL_INTERVAL']
+    while stop is None or not stop.is_set():
+        wakeup.clear()
+        try:
+            with app.app_context():
+                taken = process_batch(outbox, batch_size)
+        except Exception:
+            logger.exception('Очередь отправки: ошибка при записи пачки, повтор через %s с', interval)
+            taken = 0
+        if once and not taken:
+            return
+        if taken < batch_size:
+            # Отправки этого процесса будят сразу, других воркеров — не позже чем через interval
+            wakeup.wait(interval)
+
+
+def init_queue(app):
+    """Подключает очередь отправки, если она включена в конфиге"""
+    if not app.config.get('SUBMISSION_QUEUE'):
+        return
+    app.extensions['submission_queue'] = Outbox(app.config['SUBMISSION_QUEUE_PATH'])
+    app.extensions['submission_queue_wakeup'] = threading.Event()
+    if app.config['SUBMISSION_QUEUE_WORKER']:
+        threading.Thread(target=run_worker, args=(app,), name='submission-queue', daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Обработчик очереди отправки запросов')
+    parser.add_argument('--once', action='store_true', help='разобрать очередь и выйти')
+    parser.add_argument('--stats', action='store_true', help='показать число отправок по состояниям и выйти')
+    args = parser.parse_args()
+
+    # Этот процесс сам обрабатывает очередь — фоновый поток в нём не нужен
+    os.environ['SUBMISSION_QUEUE'] = '1'
+    os.environ['SUBMISSION_QUEUE_WORKER'] = '0'
+    from app import app
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+
+    if args.stats:
+        print(app.extensions['submission_queue'].stats())
+        return
+    run_worker(app, once=args.once)
+
+
+if __name__ == '__main__':
+    main()
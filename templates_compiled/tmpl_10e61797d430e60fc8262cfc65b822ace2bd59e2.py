@@ -0,0 +1,39 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'status_processing.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_submission = resolve('submission')
+    l_0_url_for = resolve('url_for')
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Статус запроса '
+    yield escape(environment.getattr((undefined(name='submission') if l_0_submission is missing else l_0_submission), 'ticket'))
+    yield ' - Библиотека KIT</title>\n    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">\n    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css">\n    <style>\n        :root {\n            --kit-orange: #ff6b00;\n            --kit-green: #4CAF50;\n        }\n        \n        body {\n            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);\n            min-height: 100vh;\n            font-family: \'Segoe UI\', Tahoma, Geneva, Verdana, sans-serif;\n        }\n        \n        .kit-header {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            padding: 1rem 0;\n            box-shadow: 0 4px 12px rgba(255, 107, 0, 0.15);\n        }\n        \n        .kit-logo {\n            font-size: 2rem;\n            font-weight: 700;\n            color: white;\n            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);\n        }\n        \n        .kit-logo span {\n            color: var(--kit-green);\n        }\n        \n        .status-card {\n            max-width: 700px;\n            margin: 0 auto;\n            padding: 2.5rem;\n            background: white;\n            border-radius: 15px;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            border-top: 5px solid var(--kit-orange);\n            animation: fadeIn 0.6s ease-out;\n        }\n        \n        @keyframes fadeIn {\n            from { opacity: 0; transform: translateY(20px); }\n            to { opacity: 1; transform: translateY(0); }\n        }\n        \n        .status-icon {\n            font-size: 4rem;\n            margin-bottom: 1.5rem;\n        }\n        \n        .status-badge {\n            font-size: 1.1rem;\n            padding: 0.6em 1.2em;\n            border-radius: 25px;\n            font-weight: 600;\n        }\n        \n        .status-processing { \n            background: linear-gradient(90deg, #ffc107 0%, #ffdb4d 100%);\n            color: #856404;\n        }\n        \n        .btn-primary {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            border: none;\n            border-radius: 10px;\n            padding: 0.75rem 1.5rem;\n            font-weight: 600;\n        }\n        \n        .btn-outline-primary {\n            border: 2px solid var(--kit-orange);\n            color: var(--kit-orange);\n            border-radius: 10px;\n            padding: 0.75rem 1.5rem;\n            font-weight: 600;\n        }\n        \n        .btn-outline-primary:hover {\n            background-color: var(--kit-orange);\n            color: white;\n        }\n    </style>\n</head>\n<body>\n    <header class="kit-header">\n        <div class="container">\n        <div class="status-card">\n            <div class="text-center mb-4">\n                <h3 style="color: var(--kit-orange);">\n                    <i class="bi bi-journal-text"></i> Запрос '
+    yield escape(environment.getattr((undefined(name='submission') if l_0_submission is missing else l_0_submission), 'ticket'))
+    yield '\n                </h3>\n                <p class="text-muted">Номер в очереди отправки</p>\n            </div>\n            \n            <div class="text-center mb-5">\n                '
+    if (environment.getattr((undefined(name='submission') if l_0_submission is missing else l_0_submission), 'status') == 'failed'):
+        pass
+        yield '\n                    <div class="status-icon text-danger">\n                        <i class="bi bi-x-circle"></i>\n                    </div>\n                    <h4><span class="badge status-badge bg-danger">Запрос не принят</span></h4>\n                    <p class="mt-3">'
+        yield escape(environment.getattr((undefined(name='submission') if l_0_submission is missing else l_0_submission), 'error'))
+        yield '</p>\n                    <p class="text-muted">Исправьте данные и отправьте запрос ещё раз.</p>\n                '
+    else:
+        pass
+        yield '\n                    <div class="status-icon" style="color: #ffc107;">\n                        <i class="bi bi-hourglass-split"></i>\n                    </div>\n                    <h4><span class="badge status-badge status-processing">В обработке</span></h4>\n                    <p class="text-muted mt-3">Запрос проверяется и через несколько секунд появится у библиотекаря</p>\n                '
+    yield '\n            </div>\n            \n            <div class="mt-4 text-center">\n                <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'check_status'))
+    yield '" class="btn btn-outline-primary me-2">\n                    <i class="bi bi-search"></i> Проверить другой запрос\n                </a>\n                <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'index'))
+    yield '" class="btn btn-primary">\n                    <i class="bi bi-house"></i> На главную\n                </a>\n            </div>\n            \n            '
+    if (environment.getattr((undefined(name='submission') if l_0_submission is missing else l_0_submission), 'status') != 'failed'):
+        pass
+        yield '\n            <div class="mt-4 text-center">\n                <div class="alert alert-info">\n                    <i class="bi bi-arrow-clockwise" style="color: var(--kit-orange);"></i>\n                    <strong>Страница обновится автоматически</strong>\n                </div>\n            </div>\n            <script>\n                setTimeout(() => location.assign("'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'check_status', request_id=environment.getattr((undefined(name='submission') if l_0_submission is missing else l_0_submission), 'ticket')))
+        yield '"), 3000);\n            </script>\n            '
+    yield '\n        </div>\n    </div>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '6=14&99=16&105=18&110=21&122=27&125=29&130=31&138=34'
\ No newline at end of file
@@ -0,0 +1,31 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'check_status.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_get_flashed_messages = resolve('get_flashed_messages')
+    l_0_url_for = resolve('url_for')
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Проверка статуса запроса - Библиотека KIT</title>\n    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">\n    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css">\n    <style>\n        :root {\n            --kit-orange: #ff6b00;\n            --kit-green: #4CAF50;\n            --kit-white: #ffffff;\n        }\n        \n        body {\n            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);\n            min-height: 100vh;\n            font-family: \'Segoe UI\', Tahoma, Geneva, Verdana, sans-serif;\n        }\n        \n        .kit-header {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            padding: 1rem 0;\n            margin-bottom: 2rem;\n            box-shadow: 0 4px 12px rgba(255, 107, 0, 0.15);\n        }\n        \n        .kit-logo {\n            font-size: 2rem;\n            font-weight: 700;\n            color: white;\n            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);\n        }\n        \n        .kit-logo span {\n            color: var(--kit-green);\n        }\n        \n        .status-container {\n            max-width: 500px;\n            margin: 0 auto;\n            padding: 2.5rem;\n            background: white;\n            border-radius: 15px;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            border-top: 5px solid var(--kit-orange);\n            animation: fadeIn 0.6s ease-out;\n        }\n        \n        @keyframes fadeIn {\n            from { opacity: 0; transform: translateY(20px); }\n            to { opacity: 1; transform: translateY(0); }\n        }\n        \n        .form-label {\n            color: #333;\n            font-weight: 600;\n            margin-bottom: 0.8rem;\n            display: flex;\n            align-items: center;\n            gap: 0.5rem;\n        }\n        \n        .form-label i {\n            color: var(--kit-orange);\n            font-size: 1.2rem;\n        }\n        \n        .form-control {\n            border: 2px solid #e0e0e0;\n            border-radius: 10px;\n            padding: 0.75rem 1rem;\n            font-size: 1rem;\n            transition: all 0.3s;\n        }\n        \n        .form-control:focus {\n            border-color: var(--kit-orange);\n            box-shadow: 0 0 0 0.25rem rgba(255, 107, 0, 0.25);\n        }\n        \n        .btn-primary {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            border: none;\n            border-radius: 10px;\n            padding: 0.75rem 2rem;\n            font-weight: 600;\n            transition: all 0.3s;\n        }\n        \n        .btn-primary:hover {\n            transform: translateY(-2px);\n            box-shadow: 0 5px 15px rgba(255, 107, 0, 0.3);\n        }\n        \n        .btn-outline-secondary {\n            border-radius: 10px;\n            padding: 0.75rem 2rem;\n            font-weight: 600;\n        }\n        \n        .info-box {\n            background: linear-gradient(135deg, rgba(255, 107, 0, 0.05) 0%, rgba(76, 175, 80, 0.05) 100%);\n            border-radius: 10px;\n            padding: 1.5rem;\n            margin-top: 2rem;\n            border-left: 4px solid var(--kit-green);\n        }\n        \n        .color-strip {\n            height: 5px;\n            background: linear-gradient(90deg, var(--kit-orange) 0%, var(--kit-green) 100%);\n            border-radius: 5px;\n            margin: 1.5rem 0;\n        }\n        \n        .alert-warning {\n            border-radius: 10px;\n            border: 2px solid #ffc107;\n            background-color: rgba(255, 193, 7, 0.1);\n        }\n    </style>\n</head>\n<body>\n    <!-- Шапка с логотипом -->\n    <header class="kit-header">\n        <div class="container">\n            <div class="row align-items-center">\n                <div class="col-12 text-center">\n                    <div class="kit-logo">\n                        <i class="bi bi-journal-bookmark-fill"></i>\n                        Библиотека <span>KIT</span> колледжа\n                    </div>\n                </div>\n            </div>\n        </div>\n    </header>\n    \n    <div class="container">\n        <div class="status-container">\n            <h2 class="text-center mb-4" style="color: var(--kit-orange);">\n                <i class="bi bi-search"></i> Проверка статуса запроса\n            </h2>\n            \n            <div class="text-center mb-4">\n                <p class="text-muted">Введите номер запроса для проверки текущего статуса</p>\n            </div>\n            \n            '
+    l_1_messages = context.call((undefined(name='get_flashed_messages') if l_0_get_flashed_messages is missing else l_0_get_flashed_messages))
+    pass
+    yield '\n                '
+    if l_1_messages:
+        pass
+        yield '\n                    <div class="alert alert-warning">\n                        <i class="bi bi-exclamation-triangle"></i> '
+        yield escape(environment.getitem(l_1_messages, 0))
+        yield '\n                    </div>\n                '
+    yield '\n            '
+    l_1_messages = missing
+    yield '\n            \n            <form method="POST" action="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'check_status'))
+    yield '">\n                <div class="mb-4">\n                    <label for="request_id" class="form-label">\n                        <i class="bi bi-hash"></i> Номер вашего запроса:\n                    </label>\n                    <input type="text" class="form-control" id="request_id" name="request_id" \n                        placeholder="Например: #17" required>\n                    <div class="form-text text-muted mt-2">\n                        <i class="bi bi-lightbulb"></i> Введите номер с # (например: #17), который вы получили при отправке запроса\n                    </div>\n                </div>\n                \n                <div class="color-strip"></div>\n                \n                <div class="d-grid gap-2">\n                    <button type="submit" class="btn btn-primary">\n                        <i class="bi bi-search"></i> Проверить статус\n                    </button>\n                    <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'index'))
+    yield '" class="btn btn-outline-secondary">\n                        <i class="bi bi-arrow-left"></i> Вернуться на главную\n                    </a>\n                </div>\n            </form>\n\n            <div class="info-box">\n                <h6 style="color: var(--kit-green);">\n                    <i class="bi bi-info-circle"></i> Как найти номер запроса?\n                </h6>\n                <ul class="small mt-2">\n                    <li>Номер появляется в сообщении после отправки заявки</li>\n                    <li>Сохраните этот номер для отслеживания</li>\n                    <li>Или обратитесь к библиотекарю</li>\n                </ul>\n            </div>\n        </div>\n    </div>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '151=17&153=20&158=25&176=27'
\ No newline at end of file
@@ -0,0 +1,91 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'admin_metrics.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_enabled = resolve('enabled')
+    l_0_cache = resolve('cache')
+    l_0_routes = resolve('routes')
+    try:
+        t_1 = environment.filters['max']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'max' found.")
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Метрики — админ-панель библиотеки</title>\n    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">\n    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css">\n    <style>\n        :root {\n            --kit-orange: #ff6b00;\n            --kit-green: #4CAF50;\n        }\n        \n        body {\n            background-color: #f8f9fa;\n            font-family: \'Segoe UI\', Tahoma, Geneva, Verdana, sans-serif;\n        }\n        \n        .kit-header {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            padding: 1rem 0;\n            box-shadow: 0 4px 12px rgba(255, 107, 0, 0.15);\n        }\n        \n        .kit-logo {\n            font-size: 1.8rem;\n            font-weight: 700;\n            color: white;\n            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);\n        }\n        \n        .kit-logo span {\n            color: var(--kit-green);\n        }\n        \n        .admin-container {\n            background: white;\n            border-radius: 15px;\n            padding: 2rem;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            margin-top: 2rem;\n            border-top: 5px solid var(--kit-green);\n        }\n        \n        .table th {\n            background-color: rgba(255, 107, 0, 0.05);\n            border-bottom: 2px solid var(--kit-orange);\n            vertical-align: middle;\n        }\n        \n        .histogram {\n            display: flex;\n            align-items: flex-end;\n            height: 40px;\n            gap: 2px;\n        }\n        \n        .histogram div {\n            width: 12px;\n            background: var(--kit-orange);\n            min-height: 1px;\n        }\n        \n        .slowest-sql {\n            font-size: 0.75rem;\n            max-width: 420px;\n            white-space: pre-wrap;\n            word-break: break-all;\n        }\n    </style>\n</head>\n<body>\n    <nav class="kit-header">\n        <div class="container">\n            <div class="d-flex justify-content-between align-items-center">\n                <span class="kit-logo">\n                    <i class="bi bi-speedometer2"></i>\n                    Метрики <span>KIT</span> библиотеки\n                </span>\n                <div>\n                    <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'admin_dashboard'))
+    yield '" class="btn btn-light btn-sm me-2">\n                        <i class="bi bi-house"></i> Главная\n                    </a>\n                    <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'admin_metrics', format='json'))
+    yield '" class="btn btn-light btn-sm">\n                        <i class="bi bi-filetype-json"></i> JSON\n                    </a>\n                </div>\n            </div>\n        </div>\n    </nav>\n    \n    <div class="container">\n        <div class="admin-container">\n            '
+    if (not (undefined(name='enabled') if l_0_enabled is missing else l_0_enabled)):
+        pass
+        yield '\n            <div class="alert alert-warning">\n                Замеры выключены. Задайте переменную окружения <code>METRICS_ENABLED=1</code> и перезапустите приложение.\n            </div>\n            '
+    yield '\n            \n            <p class="text-muted">\n                Статистика этого процесса с момента запуска (у каждого воркера gunicorn своя).\n                Кэш справочников: попаданий '
+    yield escape(environment.getattr((undefined(name='cache') if l_0_cache is missing else l_0_cache), 'hits'))
+    yield ', промахов '
+    yield escape(environment.getattr((undefined(name='cache') if l_0_cache is missing else l_0_cache), 'misses'))
+    yield ', сбросов '
+    yield escape(environment.getattr((undefined(name='cache') if l_0_cache is missing else l_0_cache), 'invalidations'))
+    yield '.\n            </p>\n            \n            <div class="table-responsive">\n                <table class="table table-sm align-middle">\n                    <thead>\n                        <tr>\n                            <th>Маршрут</th>\n                            <th>Запросов</th>\n                            <th>Среднее, мс</th>\n                            <th>p50 / p95, мс</th>\n                            <th>Макс., мс</th>\n                            <th>SQL (шт / мс)</th>\n                            <th>Шаблон, мс</th>\n                            <th>Гистограмма</th>\n                            <th>Самый медленный SQL</th>\n                        </tr>\n                    </thead>\n                    <tbody>\n                        '
+    t_2 = 1
+    for (l_1_route, l_1_stats) in context.call(environment.getattr((undefined(name='routes') if l_0_routes is missing else l_0_routes), 'items')):
+        l_1_peak = missing
+        _loop_vars = {}
+        pass
+        yield '\n                        '
+        l_1_peak = t_1(environment, context.call(environment.getattr(environment.getattr(l_1_stats, 'buckets'), 'values'), _loop_vars=_loop_vars))
+        _loop_vars['peak'] = l_1_peak
+        yield '\n                        <tr>\n                            <td><code>'
+        yield escape(l_1_route)
+        yield '</code></td>\n                            <td>'
+        yield escape(environment.getattr(l_1_stats, 'count'))
+        yield '</td>\n                            <td>'
+        yield escape(environment.getattr(l_1_stats, 'avg_ms'))
+        yield '</td>\n                            <td>≤'
+        yield escape(environment.getattr(l_1_stats, 'p50_ms'))
+        yield ' / ≤'
+        yield escape(environment.getattr(l_1_stats, 'p95_ms'))
+        yield '</td>\n                            <td>'
+        yield escape(environment.getattr(l_1_stats, 'max_ms'))
+        yield '</td>\n                            <td>'
+        yield escape(environment.getattr(l_1_stats, 'avg_sql_count'))
+        yield ' / '
+        yield escape(environment.getattr(l_1_stats, 'avg_sql_ms'))
+        yield '</td>\n                            <td>'
+        yield escape(environment.getattr(l_1_stats, 'avg_template_ms'))
+        yield '</td>\n                            <td>\n                                <div class="histogram">\n                                    '
+        for (l_2_bucket, l_2_size) in context.call(environment.getattr(environment.getattr(l_1_stats, 'buckets'), 'items'), _loop_vars=_loop_vars):
+            _loop_vars = {}
+            pass
+            yield '\n                                    <div style="height: '
+            yield escape((((l_2_size / (undefined(name='peak') if l_1_peak is missing else l_1_peak)) * 100) if (undefined(name='peak') if l_1_peak is missing else l_1_peak) else 0))
+            yield '%" title="'
+            yield escape(l_2_bucket)
+            yield ' мс: '
+            yield escape(l_2_size)
+            yield '"></div>\n                                    '
+        l_2_bucket = l_2_size = missing
+        yield '\n                                </div>\n                            </td>\n                            <td>\n                                '
+        if environment.getattr(l_1_stats, 'slowest_sql'):
+            pass
+            yield '\n                                <div class="slowest-sql"><strong>'
+            yield escape(environment.getattr(l_1_stats, 'slowest_sql_ms'))
+            yield ' мс</strong> '
+            yield escape(environment.getattr(l_1_stats, 'slowest_sql'))
+            yield '</div>\n                                '
+        yield '\n                            </td>\n                        </tr>\n                        '
+        t_2 = 0
+    l_1_route = l_1_stats = l_1_peak = missing
+    if t_2:
+        pass
+        yield '\n                        <tr>\n                            <td colspan="9" class="text-center text-muted">Пока нет данных</td>\n                        </tr>\n                        '
+    yield '\n                    </tbody>\n                </table>\n            </div>\n        </div>\n    </div>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '82=22&85=24&95=26&103=30&122=37&123=42&125=45&126=47&127=49&128=51&129=55&130=57&131=61&134=63&135=67&140=75&141=78'
\ No newline at end of file
@@ -0,0 +1,53 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'check_status_with_result.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_request_input = resolve('request_input')
+    l_0_book_request = resolve('book_request')
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <!-- То же самое что в check_status.html -->\n</head>\n<body>\n    <div class="container">\n        <div class="status-container">\n            <h2 class="text-center mb-4">\n                <i class="bi bi-search"></i> Проверка статуса запроса\n            </h2>\n            \n            <!-- Форма для нового поиска -->\n            <form method="POST" action="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'check_status'))
+    yield '">\n                <div class="mb-3">\n                    <label for="request_id" class="form-label">Номер запроса:</label>\n                    <div class="input-group">\n                        <input type="text" class="form-control" id="request_id" name="request_id" \n                               placeholder="Например: 140324-001" \n                               value="'
+    yield escape(((undefined(name='request_input') if l_0_request_input is missing else l_0_request_input) if (undefined(name='request_input') if l_0_request_input is missing else l_0_request_input) else ''))
+    yield '">\n                        <button type="submit" class="btn btn-primary">\n                            <i class="bi bi-search"></i> Проверить\n                        </button>\n                    </div>\n                </div>\n            </form>\n            \n            <!-- Результат (если есть) -->\n            '
+    if (undefined(name='book_request') if l_0_book_request is missing else l_0_book_request):
+        pass
+        yield '\n            <div class="card mt-4">\n                <div class="card-header bg-light">\n                    <h5 class="mb-0">\n                        Результат для запроса \n                        <strong>'
+        if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'request_number'):
+            pass
+            yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'id'))
+        else:
+            pass
+            yield '#'
+            yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'id'))
+        yield '</strong>\n                    </h5>\n                </div>\n                <div class="card-body">\n                    <div class="text-center mb-3">\n                        '
+        if (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'ожидание'):
+            pass
+            yield '\n                            <div class="status-icon status-waiting">\n                                <i class="bi bi-clock-history"></i>\n                            </div>\n                            <h4><span class="badge bg-warning">Ожидание подтверждения</span></h4>\n                        '
+        elif (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'выдано'):
+            pass
+            yield '\n                            <div class="status-icon status-issued">\n                                <i class="bi bi-check-circle"></i>\n                            </div>\n                            <h4><span class="badge bg-primary">Книга выдана</span></h4>\n                        '
+        elif (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'возвращено'):
+            pass
+            yield '\n                            <div class="status-icon status-returned">\n                                <i class="bi bi-arrow-return-left"></i>\n                            </div>\n                            <h4><span class="badge bg-success">Книга возвращена</span></h4>\n                        '
+        yield '\n                    </div>\n                    \n                    <table class="table table-sm">\n                        <tr>\n                            <th width="40%">Студент:</th>\n                            <td>'
+        yield escape((environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student'), 'full_name') if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student') else 'Неизвестно'))
+        yield '</td>\n                        </tr>\n                        <tr>\n                            <th>Книга:</th>\n                            <td>'
+        yield escape((environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'book'), 'name') if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'book') else 'Книга удалена'))
+        yield '</td>\n                        </tr>\n                        <tr>\n                            <th>Дата запроса:</th>\n                            <td>'
+        yield escape((context.call(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'request_date'), 'strftime'), '%d.%m.%Y %H:%M') if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'request_date') else '-'))
+        yield '</td>\n                        </tr>\n                    </table>\n                    \n                    <div class="text-center mt-3">\n                        <a href="'
+        yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'status_result', request_id=environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'id')))
+        yield '" \n                           class="btn btn-outline-primary btn-sm">\n                            <i class="bi bi-info-circle"></i> Подробнее\n                        </a>\n                    </div>\n                </div>\n            </div>\n            '
+    yield '\n            \n            <!-- Кнопки -->\n            <div class="mt-4">\n                <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'index'))
+    yield '" class="btn btn-outline-secondary">\n                    <i class="bi bi-arrow-left"></i> Вернуться на главную\n                </a>\n            </div>\n        </div>\n    </div>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '14=15&20=17&29=19&34=22&39=30&44=33&49=36&60=40&64=42&68=44&73=46&84=49'
\ No newline at end of file
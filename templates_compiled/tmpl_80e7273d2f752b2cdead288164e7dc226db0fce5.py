@@ -0,0 +1,178 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'admin.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    l_0_status_counts = resolve('status_counts')
+    l_0_search_query = resolve('search_query')
+    l_0_current_date = resolve('current_date')
+    l_0_custom_date = resolve('custom_date')
+    l_0_current_status = resolve('current_status')
+    l_0_requests = resolve('requests')
+    l_0_next_url = resolve('next_url')
+    l_0_first_url = resolve('first_url')
+    try:
+        t_1 = environment.filters['sum']
+    except KeyError:
+        @internalcode
+        def t_1(*unused):
+            raise TemplateRuntimeError("No filter named 'sum' found.")
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Админ-панель библиотеки</title>\n    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">\n    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css">\n    <script src="https://cdn.jsdelivr.net/npm/jsqr@1.4.0/dist/jsQR.js"></script>\n    <style>\n        :root {\n            --kit-orange: #ff6b00;\n            --kit-green: #4CAF50;\n            --kit-white: #ffffff;\n            --kit-gray: #f8f9fa;\n        }\n        \n        body {\n            background-color: #f8f9fa;\n            font-family: \'Segoe UI\', Tahoma, Geneva, Verdana, sans-serif;\n        }\n        \n        .kit-header {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            padding: 1rem 0;\n            box-shadow: 0 4px 12px rgba(255, 107, 0, 0.15);\n        }\n        \n        .kit-logo {\n            font-size: 1.8rem;\n            font-weight: 700;\n            color: white;\n            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);\n        }\n        \n        .kit-logo span {\n            color: var(--kit-green);\n        }\n        \n        .status-badge {\n            font-size: 0.8em;\n            padding: 0.4em 0.8em;\n            border-radius: 20px;\n            font-weight: 600;\n        }\n        \n        .status-waiting { \n            background: linear-gradient(90deg, #ffc107 0%, #ffdb4d 100%);\n            color: #856404;\n        }\n        .status-issued { \n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            color: white;\n        }\n        .status-returned { \n            background: linear-gradient(90deg, var(--kit-green) 0%, #5cb85c 100%);\n            color: white;\n        }\n        \n        .table-hover tbody tr:hover {\n            background-color: rgba(255, 107, 0, 0.05);\n        }\n        \n        .action-btn {\n            width: 40px;\n            height: 40px;\n            display: inline-flex;\n            align-items: center;\n            justify-content: center;\n            margin: 2px;\n            border-radius: 10px;\n            transition: all 0.3s;\n        }\n        \n        .action-btn:hover {\n            transform: translateY(-2px);\n            box-shadow: 0 4px 8px rgba(0,0,0,0.1);\n        }\n        \n        .admin-container {\n            background: white;\n            border-radius: 15px;\n            padding: 2rem;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            margin-top: 2rem;\n            border-top: 5px solid var(--kit-green);\n        }\n        \n        .filter-btn {\n            border-radius: 10px;\n            padding: 0.5rem 1rem;\n            margin: 0 0.25rem;\n        }\n        \n        .filter-btn.active {\n            background: var(--kit-orange);\n            color: white;\n            border-color: var(--kit-orange);\n        }\n        \n        .stats-card {\n            background: linear-gradient(135deg, rgba(255, 107, 0, 0.1) 0%, rgba(76, 175, 80, 0.1) 100%);\n            border-radius: 15px;\n            padding: 1.5rem;\n            margin-bottom: 1.5rem;\n            border-left: 5px solid var(--kit-orange);\n        }\n        \n        .table th {\n            background-color: rgba(255, 107, 0, 0.05);\n            color: #333;\n            font-weight: 600;\n            border-bottom: 2px solid var(--kit-orange);\n            vertical-align: middle;\n        }\n        \n        .table td {\n            vertical-align: middle;\n        }\n        \n        .table td:nth-child(5) {\n            text-align: center;\n        }\n        \n        .btn-logout {\n            background: rgba(255, 255, 255, 0.2);\n            border: 1px solid rgba(255, 255, 255, 0.3);\n        }\n        \n        .btn-logout:hover {\n            background: rgba(255, 255, 255, 0.3);\n            border-color: white;\n        }\n\n        /* Стили для новых кнопок фильтров */\n        .btn-check + .btn-outline-secondary:hover,\n        .btn-check:checked + .btn-outline-secondary {\n            background-color: #6c757d;\n            border-color: #6c757d;\n            color: white;\n        }\n\n        .btn-check + .btn-outline-primary:hover,\n        .btn-check:checked + .btn-outline-primary {\n            background-color: var(--kit-orange);\n            border-color: var(--kit-orange);\n            color: white;\n        }\n\n        .btn-check + .btn-outline-warning:hover,\n        .btn-check:checked + .btn-outline-warning {\n            background-color: #ffc107;\n            border-color: #ffc107;\n            color: #212529;\n        }\n\n        .btn-check + .btn-outline-info:hover,\n        .btn-check:checked + .btn-outline-info {\n            background-color: #17a2b8;\n            border-color: #17a2b8;\n            color: white;\n        }\n\n        @media (max-width: 768px) {\n            .btn-group .btn, .input-group {\n                margin-bottom: 5px;\n            }\n            \n            .col-md-6 {\n                margin-bottom: 15px;\n            }\n        }\n\n        .filter-btn.active {\n            background-color: var(--kit-orange) !important;\n            border-color: var(--kit-orange) !important;\n            color: white !important;\n        }\n\n        .btn-reset {\n            background: linear-gradient(90deg, #6c757d 0%, #495057 100%);\n            color: white;\n            border: none;\n        }\n\n        .btn-reset:hover {\n            background: linear-gradient(90deg, #495057 0%, #343a40 100%);\n            color: white;\n        }\n\n        /* QR-сканер */\n        .qr-scanner-container {\n            position: relative;\n            width: 100%;\n            max-width: 600px;\n            margin: 0 auto;\n            border: 2px solid var(--kit-orange);\n            border-radius: 10px;\n            overflow: hidden;\n        }\n\n        #qr-video {\n            width: 100%;\n            height: auto;\n        }\n\n        .scanner-overlay {\n            position: absolute;\n            top: 0;\n            left: 0;\n            width: 100%;\n            height: 100%;\n            pointer-events: none;\n            border: 2px solid rgba(255, 107, 0, 0.5);\n            box-shadow: inset 0 0 0 1000px rgba(0, 0, 0, 0.3);\n        }\n\n        /* Зеркало только на ПК и планшетах в ландшафте (ширина ≥768px) */\n        @media (min-width: 768px) {\n            #qr-video,\n            .scanner-overlay {\n                transform: scaleX(-1);\n            }\n        }\n\n        .attached-count {\n            margin-top: 1rem;\n            font-weight: bold;\n        }\n    </style>\n</head>\n<body>\n    <nav class="kit-header">\n        <div class="container">\n            <div class="d-flex justify-content-between align-items-center">\n                <span class="kit-logo">\n                    <i class="bi bi-journal-bookmark-fill"></i>\n                    Админ-панель <span>KIT</span> библиотеки\n                </span>\n                <div>\n                    <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'admin_dashboard'))
+    yield '" class="btn btn-light btn-sm me-2">\n                        <i class="bi bi-house"></i> Главная\n                    </a>\n                    <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'admin_metrics'))
+    yield '" class="btn btn-light btn-sm me-2">\n                        <i class="bi bi-speedometer2"></i> Метрики\n                    </a>\n                    <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'admin_logout'))
+    yield '" class="btn btn-logout btn-sm text-white">\n                        <i class="bi bi-box-arrow-right"></i> Выйти\n                    </a>\n                </div>\n            </div>\n        </div>\n    </nav>\n    \n    <div class="container">\n        <div class="admin-container">\n            <!-- Статистика -->\n            <div class="stats-card">\n                <div class="row">\n                    <div class="col-md-3 text-center">\n                        <h5 style="color: var(--kit-orange);">\n                            <i class="bi bi-clock-history"></i> Ожидание\n                        </h5>\n                        <h3>'
+    yield escape(context.call(environment.getattr((undefined(name='status_counts') if l_0_status_counts is missing else l_0_status_counts), 'get'), 'ожидание', 0))
+    yield '</h3>\n                    </div>\n                    <div class="col-md-3 text-center">\n                        <h5 style="color: var(--kit-orange);">\n                            <i class="bi bi-check-circle"></i> Выдано\n                        </h5>\n                        <h3>'
+    yield escape(context.call(environment.getattr((undefined(name='status_counts') if l_0_status_counts is missing else l_0_status_counts), 'get'), 'выдано', 0))
+    yield '</h3>\n                    </div>\n                    <div class="col-md-3 text-center">\n                        <h5 style="color: var(--kit-green);">\n                            <i class="bi bi-arrow-return-left"></i> Возвращено\n                        </h5>\n                        <h3>'
+    yield escape(context.call(environment.getattr((undefined(name='status_counts') if l_0_status_counts is missing else l_0_status_counts), 'get'), 'возвращено', 0))
+    yield '</h3>\n                    </div>\n                    <div class="col-md-3 text-center">\n                        <h5 style="color: #6c757d;">\n                            <i class="bi bi-journal-text"></i> Всего\n                        </h5>\n                        <h3>'
+    yield escape(t_1(environment, context.call(environment.getattr((undefined(name='status_counts') if l_0_status_counts is missing else l_0_status_counts), 'values'))))
+    yield '</h3>\n                    </div>\n                </div>\n            </div>\n            \n            <!-- Фильтры -->\n            <div class="row mb-4">\n                <div class="col-md-6 mb-3">\n                    <div class="input-group">\n                        <span class="input-group-text" style="background: rgba(255, 107, 0, 0.1);">\n                            <i class="bi bi-search" style="color: var(--kit-orange);"></i>\n                        </span>\n                        <input type="text" class="form-control" id="searchInput" placeholder="Поиск по ФИО студента..." value="'
+    yield escape((undefined(name='search_query') if l_0_search_query is missing else l_0_search_query))
+    yield '" onkeypress="handleSearchEnter(event)">\n                        <button class="btn btn-primary" type="button" onclick="applySearch()">\n                            <i class="bi bi-arrow-right"></i>\n                        </button>\n                    </div>\n                    <small class="text-muted">Нажмите Enter для поиска</small>\n                </div>\n                \n                <div class="col-md-6 mb-3">\n                    <div class="btn-group" role="group">\n                        <input type="radio" class="btn-check" name="date_filter" id="date_all" value="all" autocomplete="off" '
+    if ((undefined(name='current_date') if l_0_current_date is missing else l_0_current_date) == 'all'):
+        pass
+        yield 'checked'
+    yield ' onchange="applyDateFilter(this.value)">\n                        <label class="btn btn-outline-secondary" for="date_all"><i class="bi bi-calendar"></i> Все</label>\n                        \n                        <input type="radio" class="btn-check" name="date_filter" id="date_today" value="today" autocomplete="off" '
+    if ((undefined(name='current_date') if l_0_current_date is missing else l_0_current_date) == 'today'):
+        pass
+        yield 'checked'
+    yield ' onchange="applyDateFilter(this.value)">\n                        <label class="btn btn-outline-primary" for="date_today"><i class="bi bi-sun"></i> Сегодня</label>\n                        \n                        <input type="radio" class="btn-check" name="date_filter" id="date_yesterday" value="yesterday" autocomplete="off" '
+    if ((undefined(name='current_date') if l_0_current_date is missing else l_0_current_date) == 'yesterday'):
+        pass
+        yield 'checked'
+    yield ' onchange="applyDateFilter(this.value)">\n                        <label class="btn btn-outline-warning" for="date_yesterday"><i class="bi bi-moon"></i> Вчера</label>\n                        \n                        <div class="input-group" style="width: auto;">\n                            <input type="date" class="form-control" id="customDateInput" value="'
+    yield escape((undefined(name='custom_date') if l_0_custom_date is missing else l_0_custom_date))
+    yield '" style="max-width: 150px;" onchange="applyCustomDate()">\n                        </div>\n                    </div>\n                </div>\n            </div>\n\n            <div class="d-flex justify-content-between align-items-center mb-4">\n                <h2 style="color: var(--kit-orange);">\n                    <i class="bi bi-list-task"></i> Запросы на выдачу книг\n                    '
+    if (undefined(name='search_query') if l_0_search_query is missing else l_0_search_query):
+        pass
+        yield '\n                        <small class="text-muted fs-6">по запросу "'
+        yield escape((undefined(name='search_query') if l_0_search_query is missing else l_0_search_query))
+        yield '"</small>\n                    '
+    yield '\n                </h2>\n                \n                <div class="d-flex align-items-center gap-2">\n                    <button class="btn btn-sm btn-outline-success" onclick="bulkAction(\'bulk-confirm\')">\n                        <i class="bi bi-check2-all"></i> Выдать отмеченные\n                    </button>\n                    <button class="btn btn-sm btn-outline-warning" onclick="bulkAction(\'bulk-return\')">\n                        <i class="bi bi-arrow-return-left"></i> Вернуть отмеченные\n                    </button>\n                    <button class="btn btn-sm btn-outline-secondary" onclick="exportJournal(\'csv\')" title="Вся история с текущими фильтрами">\n                        <i class="bi bi-filetype-csv"></i> CSV\n                    </button>\n                    <button class="btn btn-sm btn-outline-secondary" onclick="exportJournal(\'xlsx\')" title="Вся история с текущими фильтрами">\n                        <i class="bi bi-file-earmark-excel"></i> XLSX\n                    </button>\n                    '
+    if ((((undefined(name='current_status') if l_0_current_status is missing else l_0_current_status) != 'all') or ((undefined(name='current_date') if l_0_current_date is missing else l_0_current_date) != 'all')) or (undefined(name='search_query') if l_0_search_query is missing else l_0_search_query)):
+        pass
+        yield '\n                    <button class="btn btn-sm btn-reset" onclick="resetAllFilters()">\n                        <i class="bi bi-x-circle"></i> Сбросить\n                    </button>\n                    '
+    yield '\n                </div>\n\n                <div class="btn-group">\n                    <button class="btn filter-btn btn-outline-primary '
+    if ((undefined(name='current_status') if l_0_current_status is missing else l_0_current_status) == 'all'):
+        pass
+        yield 'active'
+    yield '" onclick="applyStatusFilter(\'all\')">\n                        <i class="bi bi-grid"></i> Все\n                    </button>\n                    <button class="btn filter-btn btn-outline-warning '
+    if ((undefined(name='current_status') if l_0_current_status is missing else l_0_current_status) == 'ожидание'):
+        pass
+        yield 'active'
+    yield '" onclick="applyStatusFilter(\'ожидание\')">\n                        <i class="bi bi-clock"></i> Ожидание\n                    </button>\n                    <button class="btn filter-btn btn-outline-info '
+    if ((undefined(name='current_status') if l_0_current_status is missing else l_0_current_status) == 'выдано'):
+        pass
+        yield 'active'
+    yield '" onclick="applyStatusFilter(\'выдано\')">\n                        <i class="bi bi-check-circle"></i> Выдано\n                    </button>\n                    <button class="btn filter-btn btn-outline-success '
+    if ((undefined(name='current_status') if l_0_current_status is missing else l_0_current_status) == 'возвращено'):
+        pass
+        yield 'active'
+    yield '" onclick="applyStatusFilter(\'возвращено\')">\n                        <i class="bi bi-arrow-return-left"></i> Возвращено\n                    </button>\n                </div>\n            </div>\n            \n            '
+    if (undefined(name='requests') if l_0_requests is missing else l_0_requests):
+        pass
+        yield '\n            <div class="table-responsive">\n                <table class="table table-hover" id="requestsTable">\n                    <thead class="table-light">\n                        <tr>\n                            <th><i class="bi bi-hash"></i> ID</th>\n                            <th><i class="bi bi-person"></i> Студент</th>\n                            <th><i class="bi bi-people"></i> Группа</th>\n                            <th><i class="bi bi-book"></i> Книга</th>\n                            <th><i class="bi bi-hash"></i> Кол-во</th>\n                            <th><i class="bi bi-123"></i> ID экземпляров</th>\n                            <th><i class="bi bi-calendar"></i> Дата запроса</th>\n                            <th><i class="bi bi-tag"></i> Статус</th>\n                            <th><i class="bi bi-gear"></i> Действия</th>\n                        </tr>\n                    </thead>\n                    <tbody>\n                        '
+        for l_1_req in (undefined(name='requests') if l_0_requests is missing else l_0_requests):
+            _loop_vars = {}
+            pass
+            yield '\n                        <tr data-status="'
+            yield escape(environment.getattr(l_1_req, 'status'))
+            yield '">\n                            <td>\n                                <input type="checkbox" class="form-check-input me-1 bulk-select" value="'
+            yield escape(environment.getattr(l_1_req, 'id'))
+            yield '" data-status="'
+            yield escape(environment.getattr(l_1_req, 'status'))
+            yield '">\n                                <strong>#'
+            yield escape(environment.getattr(l_1_req, 'id'))
+            yield '</strong>\n                            </td>\n                            <td>'
+            yield escape((environment.getattr(environment.getattr(l_1_req, 'student'), 'full_name') if environment.getattr(l_1_req, 'student') else 'Неизвестно'))
+            yield '</td>\n                            <td>\n                                '
+            if (environment.getattr(l_1_req, 'student') and environment.getattr(environment.getattr(l_1_req, 'student'), 'group')):
+                pass
+                yield '\n                                    <span class="badge bg-secondary">\n                                        <i class="bi bi-mortarboard"></i> '
+                yield escape(environment.getattr(environment.getattr(environment.getattr(l_1_req, 'student'), 'group'), 'name'))
+                yield '\n                                    </span>\n                                '
+            else:
+                pass
+                yield '\n                                    -\n                                '
+            yield '\n                            </td>\n                            <td>\n                                '
+            if environment.getattr(l_1_req, 'book'):
+                pass
+                yield '\n                                    <strong>'
+                yield escape(environment.getattr(environment.getattr(l_1_req, 'book'), 'name'))
+                yield '</strong><br>\n                                    <small class="text-muted">'
+                yield escape(environment.getattr(environment.getattr(l_1_req, 'book'), 'author'))
+                yield '</small>\n                                '
+            else:
+                pass
+                yield '\n                                    <span class="text-danger">Книга удалена</span>\n                                '
+            yield '\n                            </td>\n                            <td>\n                                <span class="badge bg-primary">'
+            yield escape(environment.getattr(l_1_req, 'quantity'))
+            yield '</span>\n                            </td>\n                            <td>\n                                <small class="text-muted">\n                                    '
+            yield escape(environment.getattr(l_1_req, 'assigned_copy_codes'))
+            yield '\n                                </small>\n                            </td>\n                            <td>\n                                <small>\n                                    '
+            yield escape((context.call(environment.getattr(environment.getattr(l_1_req, 'request_date'), 'strftime'), '%d.%m.%Y %H:%M', _loop_vars=_loop_vars) if environment.getattr(l_1_req, 'request_date') else '-'))
+            yield '\n                                </small>\n                            </td>\n                            <td>\n                                '
+            if (environment.getattr(l_1_req, 'status') == 'ожидание'):
+                pass
+                yield '\n                                    <span class="badge status-badge status-waiting">\n                                        <i class="bi bi-clock"></i> Ожидание\n                                    </span>\n                                '
+            elif (environment.getattr(l_1_req, 'status') == 'выдано'):
+                pass
+                yield '\n                                    <span class="badge status-badge status-issued">\n                                        <i class="bi bi-check-circle"></i> Выдано\n                                    </span>\n                                '
+            elif (environment.getattr(l_1_req, 'status') == 'возвращено'):
+                pass
+                yield '\n                                    <span class="badge status-badge status-returned">\n                                        <i class="bi bi-arrow-return-left"></i> Возвращено\n                                    </span>\n                                '
+            yield '\n                            </td>\n                            <td>\n                                '
+            if (environment.getattr(l_1_req, 'status') == 'ожидание'):
+                pass
+                yield '\n                                    <button class="btn btn-success btn-sm action-btn"\n                                        data-action="confirm"\n                                        data-id="'
+                yield escape(environment.getattr(l_1_req, 'id'))
+                yield '"\n                                        title="Подтвердить выдачу"\n                                        style="background: var(--kit-green); border-color: var(--kit-green);">\n                                        <i class="bi bi-check-lg"></i>\n                                    </button>\n                                    <button class="btn btn-danger btn-sm action-btn"\n                                        data-action="reject"\n                                        data-id="'
+                yield escape(environment.getattr(l_1_req, 'id'))
+                yield '"\n                                        title="Отклонить запрос">\n                                        <i class="bi bi-x-lg"></i>\n                                    </button>\n                                '
+            elif (environment.getattr(l_1_req, 'status') == 'выдано'):
+                pass
+                yield '\n                                    <button class="btn btn-info btn-sm action-btn" \n                                        data-action="scan-return"\n                                        data-id="'
+                yield escape(environment.getattr(l_1_req, 'id'))
+                yield '"\n                                        title="Сканировать возврат">\n                                        <i class="bi bi-qr-code-scan"></i>\n                                    </button>\n                                    <button class="btn btn-primary btn-sm action-btn"\n                                        data-action="return"\n                                        data-id="'
+                yield escape(environment.getattr(l_1_req, 'id'))
+                yield '"\n                                        title="Отметить возврат вручную"\n                                        style="background: var(--kit-orange); border-color: var(--kit-orange);">\n                                        <i class="bi bi-arrow-return-left"></i>\n                                    </button>\n                                '
+            else:
+                pass
+                yield '\n                                    <span class="text-muted">Нет действий</span>\n                                '
+            yield '\n                            </td>\n                        </tr>\n                        '
+        l_1_req = missing
+        yield '\n                    </tbody>\n                </table>\n            </div>\n            \n            <!-- Постраничная навигация -->\n            '
+        if ((undefined(name='next_url') if l_0_next_url is missing else l_0_next_url) or (undefined(name='first_url') if l_0_first_url is missing else l_0_first_url)):
+            pass
+            yield '\n            <div class="d-flex justify-content-center gap-2 mt-3">\n                '
+            if (undefined(name='first_url') if l_0_first_url is missing else l_0_first_url):
+                pass
+                yield '\n                <a href="'
+                yield escape((undefined(name='first_url') if l_0_first_url is missing else l_0_first_url))
+                yield '" class="btn btn-outline-secondary btn-sm">\n                    <i class="bi bi-chevron-double-left"></i> В начало\n                </a>\n                '
+            yield '\n                '
+            if (undefined(name='next_url') if l_0_next_url is missing else l_0_next_url):
+                pass
+                yield '\n                <a href="'
+                yield escape((undefined(name='next_url') if l_0_next_url is missing else l_0_next_url))
+                yield '" class="btn btn-outline-primary btn-sm">\n                    Следующая страница <i class="bi bi-chevron-right"></i>\n                </a>\n                '
+            yield '\n            </div>\n            '
+        yield '\n            '
+    else:
+        pass
+        yield '\n            <div class="alert alert-info text-center" style="background: rgba(13, 110, 253, 0.1);">\n                <i class="bi bi-info-circle display-4" style="color: var(--kit-orange);"></i>\n                <h4 class="mt-3" style="color: var(--kit-orange);">Запросов на выдачу книг пока нет</h4>\n                <p class="text-muted">Когда студенты начнут оформлять заявки, они появятся здесь</p>\n            </div>\n            '
+    yield '\n        </div>\n    </div>\n    \n    <!-- Модальное окно для подтверждения -->\n    <div class="modal fade" id="confirmModal" tabindex="-1">\n        <div class="modal-dialog">\n            <div class="modal-content">\n                <div class="modal-header" style="background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%); color: white;">\n                    <h5 class="modal-title">\n                        <i class="bi bi-question-circle"></i> Подтверждение\n                    </h5>\n                    <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>\n                </div>\n                <div class="modal-body" id="modalBody">\n                    <!-- Сюда будет вставляться текст -->\n                </div>\n                <div class="modal-footer">\n                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">\n                        <i class="bi bi-x-circle"></i> Отмена\n                    </button>\n                    <button type="button" class="btn btn-primary" id="modalConfirmBtn" \n                            style="background: var(--kit-green); border-color: var(--kit-green);">\n                        <i class="bi bi-check-lg"></i> Подтвердить\n                    </button>\n                </div>\n            </div>\n        </div>\n    </div>\n\n    <!-- Модальное окно для QR-сканера -->\n    <div class="modal fade" id="qrScannerModal" tabindex="-1">\n        <div class="modal-dialog modal-lg">\n            <div class="modal-content">\n                <div class="modal-header" style="background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%); color: white;">\n                    <h5 class="modal-title">\n                        <i class="bi bi-qr-code-scan"></i> Сканер QR-кодов экземпляров\n                    </h5>\n                    <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal" onclick="stopScanner()"></button>\n                </div>\n                <div class="modal-body">\n                    <div class="qr-scanner-container">\n                        <video id="qr-video" playsinline></video>\n                        <div class="scanner-overlay"></div>\n                    </div>\n                    <p class="text-center mt-3">Наведите камеру на QR-коды книг. Можно сканировать несколько подряд.</p>\n                    <div class="manual-input">\n                        <label for="manualCopyIds">Ручной ввод ID (каждый в новой строке):</label>\n                        <textarea id="manualCopyIds" class="form-control" rows="5"></textarea>\n                    </div>\n                    <div class="attached-count" id="attachedCount">Прикреплено экземпляров: 0</div>\n                    <div class="attached-list border mt-2 p-2" id="attachedList"></div>\n                </div>\n                <div class="modal-footer">\n                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal" onclick="stopScanner()">\n                        <i class="bi bi-x-circle"></i> Отмена\n                    </button>\n                    <button type="button" class="btn btn-primary" id="saveCopyIdsBtn">\n                        <i class="bi bi-save"></i> Сохранить ID\n                    </button>\n                </div>\n            </div>\n        </div>\n    </div>\n    \n    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>\n    <script>\n        console.log(\'=== АДМИН-ПАНЕЛЬ ЗАГРУЖЕНА ===\');\n        \n        // Модальное окно подтверждения\n        const confirmModal = new bootstrap.Modal(document.getElementById(\'confirmModal\'));\n        const modalBody = document.getElementById(\'modalBody\');\n        const modalConfirmBtn = document.getElementById(\'modalConfirmBtn\');\n        \n        let currentRequestId = null;\n        let currentAction = \'\';\n        \n        // === QR-сканер для админа ===\n        let adminStream = null;\n        let adminScanningInterval = null;\n        let adminScannedCodes = new Set();\n        let currentScanRequestId = null;\n        let currentScanQuantity = 0;\n        \n        // Основной обработчик кликов (включает и действия, и сканер)\n        document.addEventListener(\'click\', function(event) {\n            let button = event.target;\n            if (button.tagName === \'I\') {\n                button = button.closest(\'button\');\n            }\n            \n            if (!button) return;\n            \n            const action = button.getAttribute(\'data-action\');\n            const reqId = button.getAttribute(\'data-id\');\n            \n            if (!action || !reqId) return;\n            \n            currentRequestId = reqId;\n            \n            if (action === \'scan\') {\n                // Получаем количество из строки таблицы\n                const row = button.closest(\'tr\');\n                const quantityCell = row.querySelector(\'td:nth-child(5) .badge\');\n                currentScanQuantity = parseInt(quantityCell.textContent.trim());\n                \n                // Сбрасываем сканер\n                adminScannedCodes.clear();\n                document.getElementById(\'manualCopyIds\').value = \'\';\n                document.getElementById(\'attachedCount\').textContent = `Прикреплено экземпляров: 0 из ${currentScanQuantity}`;\n                document.getElementById(\'attachedList\').innerHTML = \'\';\n                \n                currentScanRequestId = reqId;\n                \n                const qrModal = new bootstrap.Modal(document.getElementById(\'qrScannerModal\'));\n                qrModal.show();\n                startAdminScanner();\n                return;\n            }\n\n            if (action === \'scan-return\') {\n                currentScanRequestId = reqId;\n                currentScanQuantity = parseInt(button.closest(\'tr\').querySelector(\'td:nth-child(5) span.badge\').textContent.trim());\n                \n                // Очищаем предыдущие коды\n                adminScannedCodes.clear();\n                document.getElementById(\'manualCopyIds\').value = \'\';\n                updateAdminAttached();\n                \n                const qrModal = new bootstrap.Modal(document.getElementById(\'qrScannerModal\'));\n                qrModal.show();\n                startAdminScanner();\n                return;\n            }\n            \n            // Остальные действия (confirm, return, reject)\n            currentAction = action;\n            \n            if (action === \'confirm\') {\n                modalBody.innerHTML = \'<div class="text-center"><i class="bi bi-check-circle display-4" style="color: var(--kit-green);"></i><h4 class="mt-3">Подтвердить выдачу книги?</h4><p class="text-muted">Книга будет помечена как выданная студенту</p></div>\';\n                modalConfirmBtn.innerHTML = \'<i class="bi bi-check-lg"></i> Подтвердить выдачу\';\n            } else if (action === \'return\') {\n                modalBody.innerHTML = \'<div class="text-center"><i class="bi bi-arrow-return-left display-4" style="color: var(--kit-orange);"></i><h4 class="mt-3">Отметить книгу как возвращенную?</h4><p class="text-muted">Книга будет возвращена в библиотечный фонд</p></div>\';\n                modalConfirmBtn.innerHTML = \'<i class="bi bi-arrow-return-left"></i> Отметить возврат\';\n            } else if (action === \'reject\') {\n                modalBody.innerHTML = \'<div class="text-center"><i class="bi bi-x-circle display-4 text-danger"></i><h4 class="mt-3">Отклонить запрос на выдачу?</h4><p class="text-muted">Запрос будет отклонен и удален из системы</p></div>\';\n                modalConfirmBtn.innerHTML = \'<i class="bi bi-x-lg"></i> Отклонить\';\n            }\n            \n            confirmModal.show();\n        });\n        \n        // Массовые действия над отмеченными запросами — одной транзакцией\n        function bulkAction(action) {\n            const status = action === \'bulk-confirm\' ? \'ожидание\' : \'выдано\';\n            const ids = Array.from(document.querySelectorAll(\'.bulk-select:checked\'))\n                .filter(box => box.dataset.status === status)\n                .map(box => parseInt(box.value));\n            if (!ids.length) {\n                alert(action === \'bulk-confirm\' ? \'Отметьте запросы в ожидании\' : \'Отметьте выданные запросы\');\n                return;\n            }\n            currentRequestId = ids;\n            currentAction = action;\n            if (action === \'bulk-confirm\') {\n                modalBody.innerHTML = `<div class="text-center"><i class="bi bi-check2-all display-4" style="color: var(--kit-green);"></i><h4 class="mt-3">Подтвердить выдачу: ${ids.length} запр.?</h4><p class="text-muted">Если хоть один запрос выдать нельзя, не будет выдан ни один</p></div>`;\n                modalConfirmBtn.innerHTML = \'<i class="bi bi-check-lg"></i> Подтвердить выдачу\';\n            } else {\n                modalBody.innerHTML = `<div class="text-center"><i class="bi bi-arrow-return-left display-4" style="color: var(--kit-orange);"></i><h4 class="mt-3">Отметить возврат: ${ids.length} запр.?</h4><p class="text-muted">Книги будут возвращены в библиотечный фонд</p></div>`;\n                modalConfirmBtn.innerHTML = \'<i class="bi bi-arrow-return-left"></i> Отметить возврат\';\n            }\n            confirmModal.show();\n        }\n\n        // Подтверждение действий\n        modalConfirmBtn.addEventListener(\'click\', function() {\n            if (!currentRequestId || !currentAction) return;\n            \n            if (currentAction === \'bulk-confirm\' || currentAction === \'bulk-return\') {\n                const bulkUrl = currentAction === \'bulk-confirm\' ? \'/admin/bulk-confirm-issue\' : \'/admin/bulk-mark-returned\';\n                fetch(bulkUrl, {\n                    method: \'POST\',\n                    headers: { \'Content-Type\': \'application/json\' },\n                    body: JSON.stringify({ request_ids: currentRequestId })\n                })\n                    .then(r => r.json())\n                    .then(data => {\n                        if (data.success) {\n                            location.reload();\n                        } else {\n                            alert(\'Ошибка:\\n\' + data.error);\n                        }\n                    })\n                    .finally(() => confirmModal.hide());\n                return;\n            }\n\n            let url = \'\';\n            if (currentAction === \'confirm\') url = \'/admin/confirm-issue/\' + currentRequestId;\n            else if (currentAction === \'return\') url = \'/admin/mark-returned/\' + currentRequestId;\n            else if (currentAction === \'reject\') url = \'/admin/reject-request/\' + currentRequestId;\n            \n            fetch(url, { method: \'POST\' })\n                .then(r => r.json())\n                .then(data => {\n                    if (data.success) {\n                        location.reload();\n                    } else {\n                        alert(\'Ошибка: \' + data.error);\n                    }\n                })\n                .finally(() => confirmModal.hide());\n        });\n        \n        // === Функции QR-сканера ===\n        function startAdminScanner() {\n            navigator.mediaDevices.getUserMedia({ video: { facingMode: \'environment\' } })\n                .then(stream => {\n                    adminStream = stream;\n                    const video = document.getElementById(\'qr-video\');\n                    video.srcObject = stream;\n                    video.play();\n                    \n                    const canvas = document.createElement(\'canvas\');\n                    const ctx = canvas.getContext(\'2d\');\n                    \n                    adminScanningInterval = setInterval(() => {\n                        if (video.readyState === video.HAVE_ENOUGH_DATA) {\n                            canvas.height = video.videoHeight;\n                            canvas.width = video.videoWidth;\n                            ctx.drawImage(video, 0, 0, canvas.width, canvas.height);\n                            const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height);\n                            const code = jsQR(imageData.data, imageData.width, imageData.height);\n                            \n                            if (code) {\n                                const codeVal = code.data.trim();\n                                if (!adminScannedCodes.has(codeVal)) {\n                                    adminScannedCodes.add(codeVal);\n                                    const textarea = document.getElementById(\'manualCopyIds\');\n                                    textarea.value += (textarea.value ? \'\\n\' : \'\') + codeVal;\n                                    updateAdminAttached();\n                                }\n                            }\n                        }\n                    }, 300);\n                })\n                .catch(err => alert(\'Ошибка доступа к камере: \' + err));\n        }\n        \n        window.stopScanner = function() {  // Делаем глобальной, чтобы работала в onclick\n            if (adminStream) {\n                adminStream.getTracks().forEach(t => t.stop());\n                adminStream = null;\n            }\n            if (adminScanningInterval) {\n                clearInterval(adminScanningInterval);\n                adminScanningInterval = null;\n            }\n            const video = document.getElementById(\'qr-video\');\n            if (video) video.srcObject = null;\n        };\n        \n        function updateAdminAttached() {\n            const codes = Array.from(adminScannedCodes);\n            document.getElementById(\'attachedCount\').textContent = `Прикреплено экземпляров: ${codes.length} из ${currentScanQuantity}`;\n            document.getElementById(\'attachedList\').innerHTML = codes.map(c => `<div class="badge bg-success me-1 mb-1">${c}</div>`).join(\'\');\n        }\n        \n        // Ручной ввод\n        document.getElementById(\'manualCopyIds\').addEventListener(\'input\', function() {\n            const lines = this.value.trim().split(\'\\n\').map(l => l.trim()).filter(l => l);\n            adminScannedCodes = new Set(lines);\n            updateAdminAttached();\n        });\n        \n        // Сохранение кодов\n        document.getElementById(\'saveCopyIdsBtn\').addEventListener(\'click\', function() {\n            const codes = Array.from(adminScannedCodes);\n            if (codes.length !== currentScanQuantity) {\n                alert(`Нужно прикрепить ровно ${currentScanQuantity} экземпляров (сейчас: ${codes.length})`);\n                return;\n            }\n            \n            // Вместо /admin/assign-copy-ids/...\n            fetch(`/admin/scan-return/${currentScanRequestId}`, {\n                method: \'POST\',\n                headers: { \'Content-Type\': \'application/json\' },\n                body: JSON.stringify({ copy_codes: codes.join(\',\') })\n            })\n            .then(r => r.json())\n            .then(data => {\n                if (data.success) {\n                    location.reload();\n                } else {\n                    alert(\'Ошибка: \' + data.error);\n                }\n            });\n        });\n        \n        // Твои фильтры (оставляем как есть)\n        let currentParams = new URLSearchParams(window.location.search);\n        // При смене фильтров начинаем журнал с первой страницы\n        currentParams.delete(\'cursor\');\n        \n        function applyStatusFilter(status) {\n            currentParams.set(\'status\', status);\n            window.location.href = `/admin/filter?${currentParams.toString()}`;\n        }\n        \n        function applyDateFilter(dateType) {\n            currentParams.set(\'date\', dateType);\n            if (dateType !== \'custom\') currentParams.delete(\'custom_date\');\n            window.location.href = `/admin/filter?${currentParams.toString()}`;\n        }\n        \n        function applyCustomDate() {\n            const v = document.getElementById(\'customDateInput\').value;\n            if (v) {\n                currentParams.set(\'date\', \'custom\');\n                currentParams.set(\'custom_date\', v);\n                window.location.href = `/admin/filter?${currentParams.toString()}`;\n            }\n        }\n        \n        function applySearch() {\n            const v = document.getElementById(\'searchInput\').value.trim();\n            if (v) currentParams.set(\'search\', v);\n            else currentParams.delete(\'search\');\n            window.location.href = `/admin/filter?${currentParams.toString()}`;\n        }\n        \n        function handleSearchEnter(e) {\n            if (e.key === \'Enter\') applySearch();\n        }\n        \n        function exportJournal(format) {\n            const params = new URLSearchParams(currentParams);\n            params.set(\'format\', format);\n            window.location.href = `/admin/export?${params.toString()}`;\n        }\n        \n        function resetAllFilters() {\n            window.location.href = \'/admin\';\n        }\n    </script>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '241=27&244=29&247=31&264=33&270=35&276=37&282=39&294=41&304=43&307=47&310=51&314=55&323=57&324=60&341=63&349=67&352=71&355=75&358=79&364=83&381=86&382=90&384=92&385=96&387=98&389=100&391=103&398=109&399=112&400=114&406=120&410=122&415=124&419=126&423=129&427=132&434=136&437=139&444=141&448=143&451=146&457=148&473=156&475=159&476=162&480=165&481=168'
\ No newline at end of file
@@ -0,0 +1,93 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'status_result.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_book_request = resolve('book_request')
+    l_0_url_for = resolve('url_for')
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Статус запроса #'
+    yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'id'))
+    yield ' - Библиотека KIT</title>\n    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">\n    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css">\n    <style>\n        :root {\n            --kit-orange: #ff6b00;\n            --kit-green: #4CAF50;\n        }\n        \n        body {\n            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);\n            min-height: 100vh;\n            font-family: \'Segoe UI\', Tahoma, Geneva, Verdana, sans-serif;\n        }\n        \n        .kit-header {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            padding: 1rem 0;\n            box-shadow: 0 4px 12px rgba(255, 107, 0, 0.15);\n        }\n        \n        .kit-logo {\n            font-size: 2rem;\n            font-weight: 700;\n            color: white;\n            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);\n        }\n        \n        .kit-logo span {\n            color: var(--kit-green);\n        }\n        \n        .status-card {\n            max-width: 700px;\n            margin: 0 auto;\n            padding: 2.5rem;\n            background: white;\n            border-radius: 15px;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            border-top: 5px solid var(--kit-orange);\n            animation: fadeIn 0.6s ease-out;\n        }\n        \n        @keyframes fadeIn {\n            from { opacity: 0; transform: translateY(20px); }\n            to { opacity: 1; transform: translateY(0); }\n        }\n        \n        .status-icon {\n            font-size: 4rem;\n            margin-bottom: 1.5rem;\n        }\n        \n        .status-badge {\n            font-size: 1.1rem;\n            padding: 0.6em 1.2em;\n            border-radius: 25px;\n            font-weight: 600;\n        }\n        \n        .status-waiting { \n            background: linear-gradient(90deg, #ffc107 0%, #ffdb4d 100%);\n            color: #856404;\n        }\n        .status-issued { \n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            color: white;\n        }\n        .status-returned { \n            background: linear-gradient(90deg, var(--kit-green) 0%, #5cb85c 100%);\n            color: white;\n        }\n        \n        .card {\n            border: none;\n            border-radius: 12px;\n            box-shadow: 0 5px 15px rgba(0,0,0,0.05);\n            margin-bottom: 1.5rem;\n        }\n        \n        .card-header {\n            background: linear-gradient(90deg, rgba(255, 107, 0, 0.1) 0%, rgba(255, 140, 0, 0.1) 100%);\n            border-bottom: 2px solid rgba(255, 107, 0, 0.2);\n            color: var(--kit-orange);\n            font-weight: 600;\n            padding: 1rem 1.5rem;\n        }\n        \n        .table th {\n            color: var(--kit-orange);\n            font-weight: 600;\n            border-bottom: 2px solid rgba(255, 107, 0, 0.1);\n            background-color: rgba(255, 107, 0, 0.05);\n        }\n        \n        .btn-primary {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            border: none;\n            border-radius: 10px;\n            padding: 0.75rem 1.5rem;\n            font-weight: 600;\n        }\n        \n        .btn-primary:hover {\n            transform: translateY(-2px);\n            box-shadow: 0 5px 15px rgba(255, 107, 0, 0.3);\n        }\n        \n        .btn-outline-primary {\n            border: 2px solid var(--kit-orange);\n            color: var(--kit-orange);\n            border-radius: 10px;\n            padding: 0.75rem 1.5rem;\n            font-weight: 600;\n        }\n        \n        .btn-outline-primary:hover {\n            background-color: var(--kit-orange);\n            color: white;\n        }\n        \n        .timeline {\n            position: relative;\n            padding-left: 30px;\n            margin: 20px 0;\n        }\n        \n        .timeline::before {\n            content: \'\';\n            position: absolute;\n            left: 15px;\n            top: 0;\n            bottom: 0;\n            width: 3px;\n            background: linear-gradient(to bottom, var(--kit-orange) 0%, var(--kit-green) 100%);\n        }\n        \n        .timeline-item {\n            position: relative;\n            margin-bottom: 25px;\n            padding-left: 15px;\n        }\n        \n        .timeline-item::before {\n            content: \'\';\n            position: absolute;\n            left: -24px;\n            top: 5px;\n            width: 14px;\n            height: 14px;\n            border-radius: 50%;\n            background-color: #adb5bd;\n            border: 3px solid white;\n            box-shadow: 0 0 0 2px #adb5bd;\n        }\n        \n        .timeline-item.active::before {\n            background-color: var(--kit-orange);\n            box-shadow: 0 0 0 3px rgba(255, 107, 0, 0.3);\n        }\n        \n        .timeline-item.completed::before {\n            background-color: var(--kit-green);\n            box-shadow: 0 0 0 3px rgba(76, 175, 80, 0.3);\n        }\n        \n        .color-strip {\n            height: 5px;\n            background: linear-gradient(90deg, var(--kit-orange) 0%, var(--kit-green) 100%);\n            border-radius: 5px;\n            margin: 1.5rem 0;\n        }\n        \n        .copy-codes {\n            font-family: monospace;\n            font-size: 1.1em;\n            background: #f8f9fa;\n            padding: 0.75rem;\n            border-radius: 8px;\n            word-break: break-all;\n        }\n    </style>\n</head>\n<body>\n    <header class="kit-header">\n        <div class="container">\n            <div class="text-center">\n                <div class="kit-logo">\n                    <i class="bi bi-journal-bookmark-fill"></i>\n                    Библиотека <span>KIT</span> колледжа\n                </div>\n            </div>\n        </div>\n    </header>\n    \n    <div class="container">\n        <div class="status-card">\n            <div class="text-center mb-4">\n                <h3 style="color: var(--kit-orange);">\n                    <i class="bi bi-journal-text"></i> Запрос #'
+    yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'id'))
+    yield '\n                </h3>\n                <p class="text-muted">Детали вашего запроса</p>\n            </div>\n            \n            <!-- Статус -->\n            <div class="text-center mb-5">\n                '
+    if (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'ожидание'):
+        pass
+        yield '\n                    <div class="status-icon" style="color: #ffc107;">\n                        <i class="bi bi-clock-history"></i>\n                    </div>\n                    <h4><span class="badge status-badge status-waiting">Ожидание подтверждения</span></h4>\n                    <p class="text-muted">Запрос обрабатывается библиотекарем</p>\n                    \n                '
+    elif (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'выдано'):
+        pass
+        yield '\n                    <div class="status-icon" style="color: var(--kit-orange);">\n                        <i class="bi bi-check-circle"></i>\n                    </div>\n                    <h4><span class="badge status-badge status-issued">Книга выдана</span></h4>\n                    <p class="text-muted">Вы можете забрать книгу в библиотеке</p>\n                    \n                '
+    elif (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'возвращено'):
+        pass
+        yield '\n                    <div class="status-icon" style="color: var(--kit-green);">\n                        <i class="bi bi-arrow-return-left"></i>\n                    </div>\n                    <h4><span class="badge status-badge status-returned">Книга возвращена</span></h4>\n                    <p class="text-muted">Спасибо за возврат!</p>\n                '
+    yield '\n            </div>\n            \n            <div class="color-strip"></div>\n            \n            <!-- Детали запроса -->\n            <div class="card mb-4">\n                <div class="card-header">\n                    <i class="bi bi-info-circle"></i> Детали запроса\n                </div>\n                <div class="card-body">\n                    <table class="table">\n                        <tr>\n                            <th width="35%">Номер запроса:</th>\n                            <td><strong>#'
+    yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'id'))
+    yield '</strong></td>\n                        </tr>\n                        <tr>\n                            <th>Студент:</th>\n                            <td>'
+    yield escape((environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student'), 'full_name') if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student') else 'Неизвестно'))
+    yield '</td>\n                        </tr>\n                        <tr>\n                            <th>Группа:</th>\n                            <td>\n                                '
+    if (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student') and environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student'), 'group')):
+        pass
+        yield '\n                                    <span class="badge bg-secondary">\n                                        <i class="bi bi-mortarboard"></i> '
+        yield escape(environment.getattr(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'student'), 'group'), 'name'))
+        yield '\n                                    </span>\n                                '
+    else:
+        pass
+        yield '\n                                    -\n                                '
+    yield '\n                            </td>\n                        </tr>\n                        <tr>\n                            <th>Книга:</th>\n                            <td>\n                                '
+    if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'book'):
+        pass
+        yield '\n                                    <strong>'
+        yield escape(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'book'), 'name'))
+        yield '</strong><br>\n                                    <small class="text-muted">'
+        yield escape(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'book'), 'author'))
+        yield '</small>\n                                '
+    else:
+        pass
+        yield '\n                                    <span class="text-danger">Книга удалена</span>\n                                '
+    yield '\n                            </td>\n                        </tr>\n                        <tr>\n                            <th>Количество:</th>\n                            <td><span class="badge bg-primary">'
+    yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'quantity'))
+    yield '</span> экз.</td>\n                        </tr>\n                        <tr>\n                            <th>Экземпляры:</th>\n                            <td>\n                                <div class="copy-codes">\n                                    '
+    yield escape(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'assigned_copy_codes'))
+    yield '\n                                </div>\n                            </td>\n                        </tr>\n                    </table>\n                </div>\n            </div>\n            \n            <!-- Таймлайн -->\n            <div class="card">\n                <div class="card-header">\n                    <i class="bi bi-calendar-event"></i> История\n                </div>\n                <div class="card-body">\n                    <div class="timeline">\n                        <div class="timeline-item completed">\n                            <strong>Запрос создан</strong>\n                            <div class="text-muted small">\n                                '
+    yield escape(context.call(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'request_date'), 'strftime'), '%d.%m.%Y %H:%M'))
+    yield '\n                            </div>\n                        </div>\n                        \n                        '
+    if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'issue_date'):
+        pass
+        yield '\n                        <div class="timeline-item '
+        if (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'выдано'):
+            pass
+            yield 'active'
+        else:
+            pass
+            yield 'completed'
+        yield '">\n                            <strong>Книга выдана</strong>\n                            <div class="text-muted small">\n                                '
+        yield escape(context.call(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'issue_date'), 'strftime'), '%d.%m.%Y %H:%M'))
+        yield '\n                            </div>\n                            '
+        if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'planned_return_date'):
+            pass
+            yield '\n                            <div class="text-muted small">\n                                <i class="bi bi-calendar-check" style="color: var(--kit-green);"></i>\n                                Вернуть до: '
+            yield escape(context.call(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'planned_return_date'), 'strftime'), '%d.%m.%Y'))
+            yield '\n                            </div>\n                            '
+        yield '\n                        </div>\n                        '
+    yield '\n                        \n                        '
+    if environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'actual_return_date'):
+        pass
+        yield '\n                        <div class="timeline-item completed">\n                            <strong>Книга возвращена</strong>\n                            <div class="text-muted small">\n                                '
+        yield escape(context.call(environment.getattr(environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'actual_return_date'), 'strftime'), '%d.%m.%Y %H:%M'))
+        yield '\n                            </div>\n                        </div>\n                        '
+    yield '\n                    </div>\n                </div>\n            </div>\n            \n            <div class="color-strip"></div>\n            \n            <div class="mt-4 text-center">\n                <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'check_status'))
+    yield '" class="btn btn-outline-primary me-2">\n                    <i class="bi bi-search"></i> Проверить другой запрос\n                </a>\n                <a href="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'index'))
+    yield '" class="btn btn-primary">\n                    <i class="bi bi-house"></i> На главную\n                </a>\n            </div>\n            \n            '
+    if (environment.getattr((undefined(name='book_request') if l_0_book_request is missing else l_0_book_request), 'status') == 'ожидание'):
+        pass
+        yield '\n            <div class="mt-4 text-center">\n                <div class="alert alert-info">\n                    <i class="bi bi-arrow-clockwise" style="color: var(--kit-orange);"></i>\n                    <strong>Страница обновится автоматически</strong>\n                </div>\n            </div>\n            <script>\n                setTimeout(() => location.reload(), 30000);\n            </script>\n            '
+    yield '\n        </div>\n    </div>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '6=14&205=16&212=18&219=21&226=24&246=28&250=30&255=32&257=35&267=41&268=44&269=46&277=52&283=54&301=56&305=58&306=61&309=68&311=70&314=73&320=77&324=80&335=83&338=85&343=87'
\ No newline at end of file
@@ -0,0 +1,17 @@
+from jinja2.runtime import LoopContext, Macro, Markup, Namespace, TemplateNotFound, TemplateReference, TemplateRuntimeError, Undefined, escape, identity, internalcode, markup_join, missing, str_join
+name = 'index.html'
+
+def root(context, missing=missing):
+    resolve = context.resolve_or_missing
+    undefined = environment.undefined
+    concat = environment.concat
+    cond_expr_undefined = Undefined
+    if 0: yield None
+    l_0_url_for = resolve('url_for')
+    pass
+    yield '<!DOCTYPE html>\n<html lang="ru">\n<head>\n    <meta charset="UTF-8">\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">\n    <title>Библиотека - Взять книгу</title>\n    <link rel="icon" href="data:;base64,iVBORw0KGgo=">\n    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css" rel="stylesheet">\n    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css">\n    <script src="https://cdn.jsdelivr.net/npm/jsqr@1.4.0/dist/jsQR.js"></script>\n   \n    <style>\n        :root {\n            --kit-orange: #ff6b00;\n            --kit-green: #4CAF50;\n            --kit-white: #ffffff;\n            --kit-gray: #f8f9fa;\n        }\n       \n        body {\n            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);\n            min-height: 100vh;\n            font-family: \'Segoe UI\', Tahoma, Geneva, Verdana, sans-serif;\n        }\n       \n        .kit-header {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            padding: 1rem 0;\n            margin-bottom: 2rem;\n            box-shadow: 0 4px 12px rgba(255, 107, 0, 0.15);\n        }\n       \n        .kit-logo {\n            font-size: 2.5rem;\n            font-weight: 700;\n            color: white;\n            text-shadow: 2px 2px 4px rgba(0,0,0,0.2);\n        }\n       \n        .kit-logo span {\n            color: var(--kit-green);\n        }\n       \n        .main-container {\n            max-width: 800px;\n            margin: 0 auto;\n            padding: 2rem;\n        }\n       \n        .welcome-card {\n            background: white;\n            border-radius: 15px;\n            padding: 2.5rem;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            border: none;\n            margin-bottom: 2rem;\n            text-align: center;\n            border-top: 5px solid var(--kit-orange);\n        }\n       \n        .welcome-title {\n            color: var(--kit-orange);\n            font-weight: 700;\n            margin-bottom: 1rem;\n            font-size: 2rem;\n        }\n       \n        .welcome-subtitle {\n            color: #666;\n            font-size: 1.1rem;\n            max-width: 600px;\n            margin: 0 auto 2rem;\n        }\n       \n        .form-container {\n            background: white;\n            border-radius: 15px;\n            padding: 2.5rem;\n            box-shadow: 0 10px 30px rgba(0,0,0,0.08);\n            border: none;\n            border-top: 5px solid var(--kit-green);\n        }\n       \n        .form-label {\n            font-weight: 600;\n            color: #333;\n            margin-bottom: 0.8rem;\n            display: flex;\n            align-items: center;\n            gap: 0.5rem;\n        }\n       \n        .form-label i {\n            color: var(--kit-orange);\n            font-size: 1.2rem;\n        }\n       \n        .input-group {\n            position: relative;\n        }\n       \n        .form-control, .form-select {\n            border: 2px solid #e0e0e0;\n            border-radius: 10px;\n            padding: 0.75rem 1rem;\n            font-size: 1rem;\n            transition: all 0.3s;\n        }\n       \n        .form-control:focus, .form-select:focus {\n            border-color: var(--kit-orange);\n            box-shadow: 0 0 0 0.25rem rgba(255, 107, 0, 0.25);\n        }\n       \n        input[type="number"]::-webkit-inner-spin-button,\n        input[type="number"]::-webkit-outer-spin-button {\n            -webkit-appearance: none;\n            margin: 0;\n        }\n       \n        input[type="number"] {\n            -moz-appearance: textfield;\n            -webkit-appearance: textfield;\n            appearance: textfield;\n        }\n       \n        .btn-primary {\n            background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%);\n            border: none;\n            border-radius: 10px;\n            padding: 0.75rem 2rem;\n            font-weight: 600;\n            font-size: 1.1rem;\n            transition: all 0.3s;\n            margin-top: 1rem;\n        }\n       \n        .btn-primary:hover {\n            transform: translateY(-2px);\n            box-shadow: 0 5px 15px rgba(255, 107, 0, 0.3);\n        }\n       \n        .btn-info {\n            background: var(--kit-green);\n            border: none;\n            border-radius: 10px;\n            padding: 0.75rem 1rem;\n        }\n       \n        .btn-info:hover {\n            background: #45a049;\n        }\n       \n        .status-check-card {\n            background: white;\n            border-radius: 15px;\n            padding: 1.5rem;\n            box-shadow: 0 5px 15px rgba(0,0,0,0.05);\n            border: none;\n            border-left: 5px solid var(--kit-green);\n            margin-top: 2rem;\n        }\n       \n        #student-suggestions {\n            position: absolute;\n            z-index: 1000;\n            width: 100%;\n            max-height: 300px;\n            overflow-y: auto;\n            border: 2px solid var(--kit-orange);\n            border-radius: 10px;\n            box-shadow: 0 5px 15px rgba(0,0,0,0.1);\n            background: white;\n            margin-top: 0.25rem;\n        }\n       \n        #student-suggestions .list-group-item {\n            border: none;\n            padding: 0.75rem 1rem;\n            border-bottom: 1px solid #f0f0f0;\n        }\n       \n        #student-suggestions .list-group-item:hover {\n            background-color: rgba(255, 107, 0, 0.1);\n            color: var(--kit-orange);\n        }\n       \n        .form-icon {\n            color: var(--kit-orange);\n            font-size: 1.5rem;\n            margin-right: 0.5rem;\n        }\n       \n        @keyframes fadeIn {\n            from { opacity: 0; transform: translateY(10px); }\n            to { opacity: 1; transform: translateY(0); }\n        }\n       \n        .welcome-card, .form-container {\n            animation: fadeIn 0.6s ease-out;\n        }\n       \n        .kit-decoration {\n            position: fixed;\n            width: 300px;\n            height: 300px;\n            border-radius: 50%;\n            background: linear-gradient(45deg, rgba(255, 107, 0, 0.05) 0%, rgba(76, 175, 80, 0.05) 100%);\n            z-index: -1;\n        }\n       \n        .decoration-1 {\n            top: 10%;\n            right: 10%;\n        }\n       \n        .decoration-2 {\n            bottom: 10%;\n            left: 10%;\n        }\n       \n        .color-strip {\n            height: 5px;\n            background: linear-gradient(90deg, var(--kit-orange) 0%, var(--kit-green) 100%);\n            border-radius: 5px;\n            margin: 1rem 0;\n        }\n       \n        .input-group .btn-outline-secondary {\n            display: none !important;\n        }\n       \n        .input-group-text {\n            background: rgba(255, 107, 0, 0.1);\n            border-color: #e0e0e0;\n            border-right: none;\n        }\n       \n        .input-group .form-control {\n            border-left: none;\n        }\n        /* QR-сканер для студента */\n        .qr-scanner-container {\n            position: relative;\n            width: 100%;\n            max-width: 500px;\n            margin: 0 auto;\n            border: 2px solid var(--kit-orange);\n            border-radius: 10px;\n            overflow: hidden;\n        }\n        #qr-student-video {\n            width: 100%;\n            height: auto;\n        }\n\n        .scanner-overlay {\n            position: absolute;\n            top: 0;\n            left: 0;\n            width: 100%;\n            height: 100%;\n            pointer-events: none;\n            border: 2px solid rgba(255, 107, 0, 0.5);\n            box-shadow: inset 0 0 0 1000px rgba(0, 0, 0, 0.3);\n        }\n\n        /* Зеркало только на ПК (не мобильных устройствах) */\n        @media (min-width: 768px) {\n            #qr-student-video,\n            .scanner-overlay {\n                transform: scaleX(-1);\n            }\n        }\n        .attached-count {\n            margin-top: 1rem;\n            font-weight: bold;\n            color: var(--kit-orange);\n        }\n        .attached-list {\n            margin-top: 1rem;\n            max-height: 150px;\n            overflow-y: auto;\n            padding: 0.5rem;\n            background: #f8f9fa;\n            border-radius: 8px;\n            border: 1px solid #e0e0e0;\n        }\n    </style>\n</head>\n<body>\n    <!-- Декоративные элементы -->\n    <div class="kit-decoration decoration-1"></div>\n    <div class="kit-decoration decoration-2"></div>\n   \n    <!-- Шапка с логотипом -->\n    <header class="kit-header">\n        <div class="container">\n            <div class="row align-items-center">\n                <div class="col-12 text-center">\n                    <div class="kit-logo">\n                        <i class="bi bi-journal-bookmark-fill"></i>\n                        Библиотека <span>KIT</span> колледжа\n                    </div>\n                </div>\n            </div>\n        </div>\n    </header>\n   \n    <div class="main-container">\n        <!-- Форма для заявки -->\n        <div class="form-container">\n            <h3 class="mb-4" style="color: var(--kit-orange);">\n                <i class="bi bi-journal-plus"></i> Заявка на получение книги\n            </h3>\n           \n            <form method="POST" action="/request-book" id="bookRequestForm">\n                <!-- Выбор группы -->\n                <div class="mb-4">\n                    <label for="group" class="form-label">\n                        <i class="bi bi-people-fill"></i> Ваша группа:\n                    </label>\n                    <select class="form-select" id="group" name="group_id" required>\n                        <option value="">-- Выберите группу из списка --</option>\n                    </select>\n                    <input type="hidden" id="current_group_id" name="current_group_id">\n                </div>\n                <!-- Поиск студента -->\n                <div class="mb-4">\n                    <label for="student" class="form-label">\n                        <i class="bi bi-person-badge"></i> ФИО студента:\n                    </label>\n                    <div class="input-group">\n                        <span class="input-group-text" style="background: rgba(255, 107, 0, 0.1); border-color: #e0e0e0;">\n                            <i class="bi bi-person" style="color: var(--kit-orange);"></i>\n                        </span>\n                        <input type="text" class="form-control" id="student"\n                            placeholder="Например: Иванов Иван"\n                            autocomplete="off">\n                    </div>\n                    <input type="hidden" name="student_id" id="student_id" required>\n                    <div class="form-text text-muted">\n                        <i class="bi bi-lightbulb"></i> Выберите себя из появившегося списка\n                    </div>\n                   \n                    <div id="student-suggestions" class="list-group mt-2" style="display: none;">\n                    </div>\n                </div>\n               \n                <!-- Поиск и выбор книги -->\n                <div class="mb-4">\n                    <label for="bookSearch" class="form-label">\n                        <i class="bi bi-book"></i> Книга:\n                    </label>\n                    <div class="input-group">\n                        <span class="input-group-text" style="background: rgba(255, 107, 0, 0.1);">\n                            <i class="bi bi-search" style="color: var(--kit-orange);"></i>\n                        </span>\n                        <input type="text" \n                            class="form-control" \n                            id="bookSearch" \n                            placeholder="Начните вводить название или автора..." \n                            autocomplete="off">\n                    </div>\n                    <input type="hidden" name="book_id" id="book_id" required>\n                    \n                    <div class="form-text text-muted">\n                        <i class="bi bi-lightbulb"></i> Введите часть названия или автора — поиск работает по всем буквам, независимо от регистра\n                    </div>\n                    \n                    <!-- Список результатов поиска -->\n                    <div id="book-suggestions" class="list-group mt-2" style="display: none; max-height: 300px; overflow-y: auto; border: 2px solid var(--kit-orange); border-radius: 10px; box-shadow: 0 5px 15px rgba(0,0,0,0.1);">\n                    </div>\n                </div>\n               \n                <!-- Кнопка для открытия модального окна сканера -->\n                <div class="mb-4">\n                    <label class="form-label">\n                        <i class="bi bi-hash"></i> Экземпляры:\n                    </label>\n                    <button type="button" class="btn btn-info" onclick="openStudentScanner()">\n                        <i class="bi bi-qr-code-scan"></i> Отсканировать / Ввести коды\n                    </button>\n                    <div class="form-text text-muted mt-2">\n                        <i class="bi bi-info-circle"></i> Отсканируйте или введите коды экземпляров\n                    </div>\n                </div>\n               \n                <!-- Отображение прикреплённых экземпляров на основной странице -->\n                <div class="mb-4" id="mainAttachedBlock" style="display: none;">\n                    <label class="form-label">\n                        <i class="bi bi-check2-all"></i> Прикреплённые экземпляры:\n                    </label>\n                    <div class="attached-count" id="mainAttachedCount">Прикреплено экземпляров: 0</div>\n                    <div class="attached-list" id="mainAttachedList"></div>\n                </div>\n\n                <!-- Скрытое поле для кодов и количества -->\n                <input type="hidden" name="copy_codes" id="copy_codes_hidden">\n                <input type="hidden" name="quantity" id="quantity_hidden" value="0">\n               \n                <div class="color-strip"></div>\n               \n                <!-- Кнопка отправки -->\n                <div class="text-center">\n                    <button type="submit" class="btn btn-primary btn-lg">\n                        <i class="bi bi-send-check"></i> Отправить запрос\n                    </button>\n                </div>\n            </form>\n        </div>\n       \n        <!-- Проверка статуса -->\n        <div class="status-check-card">\n            <div class="row align-items-center">\n                <div class="col-md-9">\n                    <h5 class="mb-1" style="color: var(--kit-green);">\n                        <i class="bi bi-hourglass-split"></i> Уже отправили запрос?\n                    </h5>\n                    <p class="mb-0 text-muted">Проверьте статус вашей заявки на выдачу книги</p>\n                </div>\n                <div class="col-md-3 text-end">\n                    <a href="/check-status" class="btn btn-outline-success" style="border-color: var(--kit-green); color: var(--kit-green);">\n                        <i class="bi bi-search"></i> Проверить статус\n                    </a>\n                </div>\n            </div>\n        </div>\n    </div>\n\n    <!-- Модальное окно успеха -->\n    <div class="modal fade" id="successModal" tabindex="-1" aria-hidden="true">\n        <div class="modal-dialog modal-dialog-centered">\n            <div class="modal-content">\n                <div class="modal-header" style="background: linear-gradient(90deg, var(--kit-green) 0%, #5cb85c 100%); color: white;">\n                    <h5 class="modal-title">\n                        <i class="bi bi-check-circle-fill"></i> Успешно!\n                    </h5>\n                    <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>\n                </div>\n                <div class="modal-body text-center">\n                    <div class="mb-3">\n                        <i class="bi bi-journal-check display-1" style="color: var(--kit-green);"></i>\n                    </div>\n                    <h4 class="mb-3">Запрос №<span id="requestId" class="text-primary"></span> отправлен</h4>\n                    <p class="lead">Ожидайте подтверждения библиотекаря</p>\n                   \n                    <div class="alert alert-info" style="background: rgba(76, 175, 80, 0.1); border-color: var(--kit-green);">\n                        <i class="bi bi-info-circle" style="color: var(--kit-green);"></i>\n                        <strong>Сохраните номер запроса!</strong><br>\n                        Он понадобится для проверки статуса\n                    </div>\n                </div>\n                <div class="modal-footer">\n                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">\n                        <i class="bi bi-x-circle"></i> Закрыть\n                    </button>\n                    <button type="button" class="btn btn-primary" id="checkStatusBtn">\n                        <i class="bi bi-search"></i> Проверить статус\n                    </button>\n                </div>\n            </div>\n        </div>\n    </div>\n\n    <!-- Модальное окно ошибок -->\n    <div class="modal fade" id="errorModal" tabindex="-1" aria-hidden="true">\n        <div class="modal-dialog modal-dialog-centered">\n            <div class="modal-content border-0 shadow">\n                <div class="modal-header bg-danger text-white">\n                    <h5 class="modal-title">\n                        <i class="bi bi-exclamation-triangle-fill"></i> Ошибка\n                    </h5>\n                    <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>\n                </div>\n                <div class="modal-body text-center" id="errorModalBody">\n                    Произошла ошибка.\n                </div>\n                <div class="modal-footer justify-content-center">\n                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">\n                        <i class="bi bi-x-circle"></i> Закрыть\n                    </button>\n                </div>\n            </div>\n        </div>\n    </div>\n\n    <!-- Модальное окно QR-сканера для студента (теперь с ручным вводом) -->\n    <div class="modal fade" id="qrStudentScannerModal" tabindex="-1">\n        <div class="modal-dialog modal-lg">\n            <div class="modal-content">\n                <div class="modal-header" style="background: linear-gradient(90deg, var(--kit-orange) 0%, #ff8c00 100%); color: white;">\n                    <h5 class="modal-title">\n                        <i class="bi bi-qr-code-scan"></i> Сканирование / Ввод кодов экземпляров\n                    </h5>\n                    <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal" onclick="stopStudentScanner()"></button>\n                </div>\n                <div class="modal-body">\n                    <div class="qr-scanner-container">\n                        <video id="qr-student-video" playsinline></video>\n                        <div class="scanner-overlay"></div>\n                    </div>\n                    <p class="text-center mt-3">Наведите камеру на QR-коды книг или введите коды вручную ниже</p>\n                    \n                    <!-- Ручной ввод (теперь здесь) -->\n                    <div class="mt-3">\n                        <label for="manualStudentCodes" class="form-label">\n                            <i class="bi bi-pencil-square"></i> Ручной ввод кодов (по одному на строку):\n                        </label>\n                        <textarea id="manualStudentCodes" class="form-control" rows="4" placeholder="Например:&#10;1-01&#10;1-02"></textarea>\n                    </div>\n                    \n                    <!-- Счётчик и список прикреплённых -->\n                    <div class="attached-count mt-3" id="studentAttachedCount">Прикреплено экземпляров: 0</div>\n                    <div class="attached-list mt-2" id="studentAttachedList"></div>\n                </div>\n                <div class="modal-footer">\n                    <button type="button" class="btn btn-primary" onclick="closeStudentScanner()">\n                        <i class="bi bi-check-circle"></i> Далее\n                    </button>\n                </div>\n            </div>\n        </div>\n    </div>\n\n    <!-- Модальное окно подтверждения количества -->\n    <div class="modal fade" id="confirmQuantityModal" tabindex="-1">\n        <div class="modal-dialog modal-dialog-centered">\n            <div class="modal-content">\n                <div class="modal-header bg-info text-white">\n                    <h5 class="modal-title">\n                        <i class="bi bi-question-circle"></i> Подтверждение\n                    </h5>\n                    <button type="button" class="btn-close btn-close-white" data-bs-dismiss="modal"></button>\n                </div>\n                <div class="modal-body text-center">\n                    <h4 id="confirmMessage">Вы хотите привязать N книг к своему запросу?</h4>\n                </div>\n                <div class="modal-footer">\n                    <button type="button" class="btn btn-secondary" data-bs-dismiss="modal">\n                        <i class="bi bi-x-circle"></i> Отмена\n                    </button>\n                    <button type="button" class="btn btn-primary" id="confirmQuantityBtn">\n                        <i class="bi bi-check-lg"></i> Подтвердить\n                    </button>\n                </div>\n            </div>\n        </div>\n    </div>\n\n    <!-- Bootstrap JS -->\n    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js"></script>\n   \n    <!-- Основной скрипт -->\n    <script src="'
+    yield escape(context.call((undefined(name='url_for') if l_0_url_for is missing else l_0_url_for), 'static', filename='js/scripts.js'))
+    yield '"></script>\n</body>\n</html>'
+
+blocks = {}
+debug_info = '555=13'
\ No newline at end of file